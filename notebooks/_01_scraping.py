@@ -1,47 +1,231 @@
 # original_scraper_update.py (Ini adalah file scraper awal Anda yang dimodifikasi)
 
 import os
+import argparse
+import asyncio
 import requests
 import re
 import time
-from bs4 import BeautifulSoup
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from urllib.parse import urljoin
+from bs4 import BeautifulSoup, SoupStrainer
+
+from throttle import AdaptiveConcurrency, HostRateLimiter, RetryBudget, backoff_delay, is_retryable_status
+from crawl_manifest import CrawlManifest
+from crawl_frontier import LISTING, CrawlFrontier
+from html_archive import HtmlArchive
+from raw_store import RAW_STORE_KINDS, open_raw_store
+from text_normalizer import normalize
+from crawl_metrics import CrawlMetrics, TimedHTTPAdapter, connection_timings, reset_connection_timings
 
 BASE_PAGE = "https://putusan3.mahkamahagung.go.id/direktori/index/kategori/senjata-api-2"
+CATEGORY_ROOTS = [BASE_PAGE] # Root kategori default; tambahkan kategori lain lewat --category
 SAVE_DIR = "../data/raw"
 LOG_FILE = "../logs/cleaning.log"
+METRICS_FILE = "../logs/crawl_metrics.jsonl" # Metrik per request (JSON lines) + ringkasan per eksekusi
+MANIFEST_FILE = os.path.join(SAVE_DIR, "manifest.jsonl")
+ARCHIVE_DIR = "../data/archive"
+REQUEST_DELAY = 4 # Jeda (detik) antar request pada mode sync
+REQUEST_TIMEOUT = 30 # Batas waktu (detik) per request
+MAX_RETRIES = 4 # Retry maksimum per URL untuk 429/5xx/timeout (dengan backoff + jitter)
+HTML_PARSER = "html.parser" # Backend parser BeautifulSoup; "lxml" jauh lebih cepat jika terpasang
+PARTIAL_PARSE = True # Hanya bangun subtree yang diekstrak (lihat CaseSectionStrainer)
+RAW_STORE_KIND = "txt" # "txt" = satu file per kasus di SAVE_DIR; "shards" = raw store ber-shard (raw_store.py)
+
+_raw_store = None
+_metrics = None
 
 os.makedirs(SAVE_DIR, exist_ok=True)
 os.makedirs(os.path.dirname(LOG_FILE), exist_ok=True)
 
-def get_links(max_pages=2):
+def get_raw_store():
+    """Raw store tujuan penulisan kasus, dibuka sekali sesuai RAW_STORE_KIND."""
+    global _raw_store
+    if _raw_store is None:
+        _raw_store = open_raw_store(RAW_STORE_KIND, SAVE_DIR if RAW_STORE_KIND == "txt" else None)
+    return _raw_store
+
+def get_metrics():
+    """Perekam telemetri crawl (lihat crawl_metrics.py), dibuka sekali per eksekusi."""
+    global _metrics
+    if _metrics is None:
+        _metrics = CrawlMetrics(METRICS_FILE)
+    return _metrics
+
+def make_session(pool_size=10):
+    """
+    Membuat requests.Session bersama dengan koneksi keep-alive.
+    Pool koneksi dibuat cukup besar agar setiap worker dapat memakai ulang koneksinya.
+    Adapter mencatat waktu DNS/connect untuk telemetri.
+    """
+    session = requests.Session()
+    adapter = TimedHTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+def fetch_page(session, url, archive=None):
+    """
+    GET satu halaman; jika arsip aktif, respons mentahnya ikut disimpan untuk replay offline.
+    Rincian waktu (DNS, connect, TTFB, download) dan ukuran respons disimpan di res.crawl_metrics.
+    """
+    reset_connection_timings()
+    started = time.perf_counter()
+    res = session.get(url, timeout=REQUEST_TIMEOUT, stream=True)
+    headers_at = time.perf_counter()
+    body = res.content # Unduh seluruh badan respons di sini agar waktu download terukur
+    done = time.perf_counter()
+    timings = connection_timings()
+    res.crawl_metrics = {
+        "status": res.status_code,
+        "bytes": len(body),
+        "dns_ms": round(timings["dns_ms"], 2),
+        "connect_ms": round(timings["connect_ms"], 2),
+        "ttfb_ms": round((headers_at - started) * 1000 - timings["dns_ms"] - timings["connect_ms"], 2),
+        "download_ms": round((done - headers_at) * 1000, 2),
+        "total_ms": round((done - started) * 1000, 2),
+        "reused_connection": not timings["new_connection"],
+    }
+    if archive is not None and not is_retryable_status(res.status_code):
+        archive.append(url, res.status_code, res.text)
+    return res
+
+def retry_reason(res):
+    """Mengembalikan (error, retry_after) untuk respons yang perlu di-retry, atau (None, None)."""
+    if is_retryable_status(res.status_code):
+        return requests.HTTPError(f"HTTP {res.status_code} untuk {res.url}", response=res), res.headers.get("Retry-After")
+    return None, None
+
+def raise_for_status(res):
+    """
+    Respons non-2xx yang tidak di-retry (403 dari WAF, 404, 410, ...) bukan halaman putusan:
+    dilaporkan sebagai error agar tidak disimpan dan dicoba lagi saat resume.
+    """
+    if not 200 <= res.status_code < 300:
+        raise requests.HTTPError(f"HTTP {res.status_code} untuk {res.url}", response=res)
+
+def record_fetch(url, attempt, res=None, error=None, retrying=False):
+    """Menulis satu record telemetri untuk satu percobaan fetch."""
+    metrics = get_metrics()
+    record = {
+        "type": "fetch",
+        "page": "detail" if "/putusan/" in url else "listing",
+        "url": url,
+        "attempt": attempt,
+        "outcome": "retry" if retrying else ("error" if error is not None else "ok"),
+    }
+    if res is not None:
+        record.update(res.crawl_metrics)
+        metrics.observe("fetch", res.crawl_metrics["total_ms"])
+    if error is not None:
+        record["error"] = str(error)
+    metrics.emit(record)
+
+def fetch_with_retry(session, url, archive=None, budget=None):
+    """
+    Versi sync dari fetch dengan retry: 429/5xx/timeout di-retry dengan exponential
+    backoff + jitter, paling banyak MAX_RETRIES kali dan selama anggaran retry masih ada.
+    """
+    if budget is not None:
+        budget.deposit()
+    attempt = 0
+    while True:
+        res = None
+        try:
+            res = fetch_page(session, url, archive)
+            error, retry_after = retry_reason(res)
+            if error is None:
+                record_fetch(url, attempt, res)
+                res.retries = attempt
+                return res
+        except (requests.Timeout, requests.ConnectionError) as e:
+            error, retry_after = e, None
+        if attempt >= MAX_RETRIES or (budget is not None and not budget.try_withdraw()):
+            record_fetch(url, attempt, res, error)
+            raise error
+        record_fetch(url, attempt, res, error, retrying=True)
+        delay = backoff_delay(attempt, retry_after=retry_after)
+        print(f"[!] {url}: {error} - retry {attempt + 1} dalam {delay:.1f} detik")
+        time.sleep(delay)
+        attempt += 1
+
+def listing_url(page, base_page=BASE_PAGE):
+    if page == 1:
+        return f"{base_page}.html"
+    return f"{base_page}/page/{page}.html"
+
+def parse_listing(html, page_url):
+    """Mengambil semua link /putusan/ dari satu halaman daftar putusan."""
+    return parse_listing_page(html, page_url)[0]
+
+def parse_listing_page(html, page_url, base_page=None):
+    """
+    Mengambil link /putusan/ dan nomor halaman terakhir kategori dari satu halaman daftar.
+    Nomor halaman terakhir dibaca dari link paginasi `{base_page}/page/N.html`
+    (None jika base_page tidak diberikan atau halaman tidak memiliki paginasi).
+    """
+    soup = BeautifulSoup(html, 'html.parser')
+    links = []
+    for a in soup.select('div.entry-c strong a'):
+        href = a.get("href")
+        if href and "/putusan/" in str(href):
+            links.append(urljoin(page_url, str(href)))
+    last_page = None
+    if base_page is not None:
+        pattern = re.compile(re.escape(base_page) + r"/page/(\d+)\.html")
+        for a in soup.find_all('a', href=True):
+            match = pattern.match(urljoin(page_url, str(a["href"])))
+            if match:
+                last_page = max(last_page or 1, int(match.group(1)))
+    return links, last_page
+
+def is_known_page(page_links, manifest):
+    """
+    Halaman daftar yang semua putusannya sudah OK/SKIPPED di manifest menandakan paginasi bisa
+    dihentikan. Hanya berlaku jika pass sebelumnya atas kategori ini selesai penuh (lihat
+    CrawlManifest.start_pass); link ERROR atau yang baru direservasi tidak dihitung sudah dikenal.
+    """
+    return manifest is not None and all(manifest.is_done(link) for link in page_links)
+
+def get_links(max_pages=2, base_page=BASE_PAGE, session=None, manifest=None, archive=None, budget=None):
+    """
+    Mengambil link putusan dari halaman daftar. max_pages=None berarti tanpa batas.
+    Jika manifest diberikan, paginasi berhenti pada halaman pertama yang hanya berisi link yang sudah selesai.
+    Jumlah halaman kategori dideteksi dari link paginasi halaman pertama dan menjadi batas tambahan.
+    Mengembalikan (links, reached_end): reached_end False jika paginasi dipotong oleh max_pages
+    sebelum halaman terakhir kategori.
+    """
+    session = session or make_session(1)
     links = []
-    for page in range(1, max_pages + 1):
-        if page == 1:
-            url = f"{BASE_PAGE}.html"
-        else:
-            url = f"{BASE_PAGE}/page/{page}.html"
+    page = 1
+    last_page = None
+    while max_pages is None or page <= max_pages:
+        url = listing_url(page, base_page)
 
         print(f"[+] Fetching page {page}: {url}")
-        res = requests.get(url)
-        soup = BeautifulSoup(res.text, 'html.parser')
-        entries = soup.select('div.entry-c strong a')
-
-        for a in entries:
-            href = a.get("href")
-            if href and "/putusan/" in str(href):
-                links.append(str(href))
+        res = fetch_with_retry(session, url, archive, budget)
+        if not 200 <= res.status_code < 300:
+            print(f"[X] Halaman daftar {url} membalas HTTP {res.status_code}, paginasi dihentikan.")
+            return links, False
+        page_links, page_count = parse_listing_page(res.text, url, base_page)
+        if not page_links:
+            return links, True
+        if page == 1 and page_count:
+            last_page = page_count
+            print(f"[=] Kategori {base_page} memiliki {last_page} halaman daftar.")
+            max_pages = min(max_pages or last_page, last_page)
+        links.extend(page_links)
+        if is_known_page(page_links, manifest):
+            print(f"[=] Halaman {page} hanya berisi putusan yang sudah dikenal, paginasi dihentikan.")
+            return links, True
+        page += 1
     
-    return links
+    return links, last_page is not None and page > last_page
 
 def clean_text(text):
-    # Membersihkan teks secara umum
-    text = re.sub(r'\s+', ' ', text) # Normalisasi spasi
-    # Hapus karakter non-alfanumerik kecuali yang penting untuk teks hukum (.,:()–-)
-    text = re.sub(r'[^\w\s.,:()–-]', '', text) 
-    text = text.strip().lower() # Ubah ke huruf kecil
-    if text.endswith(';'): # Hapus semicolon di akhir jika ada
-        text = text[:-1]
-    return text
+    # Membersihkan teks secara umum: normalisasi spasi, hapus karakter non-alfanumerik kecuali
+    # yang penting untuk teks hukum (.,:()–-), huruf kecil. Lihat text_normalizer.py.
+    return normalize(text)
 
 def extract_table_text(soup):
     """Mengekstrak teks dari tabel metadata sidebar."""
@@ -94,47 +278,471 @@ def extract_main_body_text(soup):
     # Fallback jika tidak ada pola yang cocok ditemukan
     return "" 
 
-def save_case(link, idx, log):
+class CaseSectionStrainer(SoupStrainer):
+    """
+    Strainer untuk parsing parsial halaman detail: hanya subtree yang dipakai
+    extract_table_text dan extract_main_body_text yang dibangun
+    (#popular-post-list-sidebar, div.col-md-9 dan div.box-content).
+    Elemen lain (header, menu, footer, script) dibuang saat parsing.
+    """
+    SECTION_ID = "popular-post-list-sidebar"
+    SECTION_CLASSES = {"col-md-9", "box-content"}
+
+    def __init__(self):
+        # Aturan nama dasar agar string di luar subtree terpilih ikut dibuang;
+        # keputusan sebenarnya dibuat di _wanted.
+        super().__init__(name="div")
+
+    @classmethod
+    def _wanted(cls, name, attrs):
+        attrs = dict(attrs or {})
+        if attrs.get("id") == cls.SECTION_ID:
+            return True
+        classes = attrs.get("class") or []
+        if isinstance(classes, str):
+            classes = classes.split()
+        return name == "div" and not cls.SECTION_CLASSES.isdisjoint(classes)
+
+    def allow_tag_creation(self, nsprefix, name, attrs): # bs4 >= 4.13
+        return self._wanted(name, attrs)
+
+    def search_tag(self, markup_name=None, markup_attrs={}): # bs4 < 4.13
+        if isinstance(markup_name, str) and self._wanted(markup_name, markup_attrs):
+            return markup_name
+        return None
+
+def make_case_soup(html, parser=None, partial=None):
+    """
+    Mem-parse HTML halaman detail. partial=True hanya membangun bagian yang diekstrak
+    (lihat CaseSectionStrainer); partial=False mem-parse seluruh dokumen seperti semula.
+    Nilai None berarti memakai pengaturan modul HTML_PARSER / PARTIAL_PARSE.
+    """
+    parser = parser or HTML_PARSER
+    if PARTIAL_PARSE if partial is None else partial:
+        return BeautifulSoup(html, parser, parse_only=CaseSectionStrainer())
+    return BeautifulSoup(html, parser)
+
+def build_case_text(html, parser=None, partial=None):
+    """
+    Mengubah HTML halaman detail putusan menjadi teks kasus yang sudah dibersihkan.
+    Mengembalikan (teks_bersih, jumlah_kata_bersih, jumlah_kata_mentah, rasio).
+    """
+    soup = make_case_soup(html, parser, partial)
+
+    judul, table_text = extract_table_text(soup) # Metadata dari sidebar tabel
+    main_body_text = extract_main_body_text(soup) # Teks badan putusan utama
+
+    # Gabungkan kedua teks. Teks utama putusan lebih diprioritaskan.
+    # Tambahkan pemisah yang jelas untuk mempermudah debugging dan pemahaman struktur file mentah
+    full_raw_content = f"=== JUDUL: {judul} ===\n\n"
+    full_raw_content += f"=== METADATA TABLE ===\n{table_text}\n\n"
+    full_raw_content += f"=== MAIN JUDGMENT BODY ===\n{main_body_text}\n\n" # Tambah newline untuk persiapan bersih-bersih
+
+    # Bersihkan seluruh konten gabungan
+    cleaned_combined_text = clean_text(full_raw_content)
+
+    raw_word_count = len(full_raw_content.split())
+    cleaned_word_count = len(cleaned_combined_text.split())
+    ratio = cleaned_word_count / raw_word_count if raw_word_count > 0 else 0
+    return cleaned_combined_text, cleaned_word_count, raw_word_count, ratio
+
+def parse_case(html, parser=None, partial=None):
+    """build_case_text yang juga mengembalikan lama parsing (ms); dipakai juga oleh process pool."""
+    started = time.perf_counter()
+    case_text = build_case_text(html, parser, partial)
+    return case_text, (time.perf_counter() - started) * 1000
+
+def store_case(link, idx, log, html, manifest=None, retries=0):
+    """Membersihkan HTML satu putusan lalu menyimpannya sebagai case_NNN.txt jika lolos validasi."""
+    case_text, parse_ms = parse_case(html)
+    write_case(link, idx, log, case_text, manifest, parse_ms, retries)
+
+def write_case(link, idx, log, case_text, manifest=None, parse_ms=None, retries=0):
+    """Menulis hasil build_case_text ke disk, log dan manifest, lalu mencatat telemetrinya."""
+    started = time.perf_counter()
+    cleaned_combined_text, cleaned_word_count, raw_word_count, ratio = case_text
+
+    # Validasi bahwa teks yang dibersihkan masih memiliki proporsi yang cukup
+    if ratio >= 0.8 and cleaned_word_count > 50: # Tambah cek minimal kata
+        # Tulis teks yang sudah digabung dan dibersihkan
+        filename = get_raw_store().put(f"case_{idx:03}", cleaned_combined_text)
+
+        log.write(f"case_{idx:03}.txt: OK ({cleaned_word_count}/{raw_word_count} = {ratio:.2%})\n")
+        print(f"[✓] Disimpan: {filename} ({ratio:.2%})")
+        if manifest is not None:
+            manifest.record(link, "OK", cleaned_combined_text)
+    else:
+        log.write(f"case_{idx:03}.txt: SKIPPED ({cleaned_word_count}/{raw_word_count} = {ratio:.2%}) - terlalu sedikit teks.\n")
+        print(f"[!] Lewatkan: {link} - ({ratio:.2%}) konten tersedia, terlalu sedikit teks setelah dibersihkan.")
+        if manifest is not None:
+            manifest.record(link, "SKIPPED", cleaned_combined_text)
+
+    write_ms = (time.perf_counter() - started) * 1000
+    metrics = get_metrics()
+    if parse_ms is not None:
+        metrics.observe("parse", parse_ms)
+    metrics.observe("write", write_ms)
+    metrics.emit({
+        "type": "case",
+        "url": link,
+        "case_id": f"case_{idx:03}",
+        "status": "OK" if ratio >= 0.8 and cleaned_word_count > 50 else "SKIPPED",
+        "parse_ms": round(parse_ms, 2) if parse_ms is not None else None,
+        "write_ms": round(write_ms, 2),
+        "raw_words": raw_word_count,
+        "clean_words": cleaned_word_count,
+        "clean_ratio": round(ratio, 4),
+        "retries": retries,
+    })
+
+def record_error(link, idx, log, error, manifest=None):
+    log.write(f"case_{idx:03}.txt: ERROR - {str(error)}\n")
+    print(f"[X] Gagal pada {link}: {error}")
+    if manifest is not None:
+        manifest.record(link, "ERROR")
+
+def save_case(link, idx, log, session=None, manifest=None, archive=None, budget=None):
     try:
-        res = requests.get(link)
-        soup = BeautifulSoup(res.text, "html.parser")
-
-        judul, table_text = extract_table_text(soup) # Metadata dari sidebar tabel
-        main_body_text = extract_main_body_text(soup) # Teks badan putusan utama
-
-        # Gabungkan kedua teks. Teks utama putusan lebih diprioritaskan.
-        # Tambahkan pemisah yang jelas untuk mempermudah debugging dan pemahaman struktur file mentah
-        full_raw_content = f"=== JUDUL: {judul} ===\n\n"
-        full_raw_content += f"=== METADATA TABLE ===\n{table_text}\n\n"
-        full_raw_content += f"=== MAIN JUDGMENT BODY ===\n{main_body_text}\n\n" # Tambah newline untuk persiapan bersih-bersih
-
-        # Bersihkan seluruh konten gabungan
-        cleaned_combined_text = clean_text(full_raw_content)
-
-        raw_word_count = len(full_raw_content.split())
-        cleaned_word_count = len(cleaned_combined_text.split())
-        ratio = cleaned_word_count / raw_word_count if raw_word_count > 0 else 0
-
-        # Validasi bahwa teks yang dibersihkan masih memiliki proporsi yang cukup
-        if ratio >= 0.8 and cleaned_word_count > 50: # Tambah cek minimal kata
-            filename = os.path.join(SAVE_DIR, f"case_{idx:03}.txt")
-            with open(filename, "w", encoding="utf-8") as f:
-                f.write(cleaned_combined_text) # Tulis teks yang sudah digabung dan dibersihkan
-
-            log.write(f"case_{idx:03}.txt: OK ({cleaned_word_count}/{raw_word_count} = {ratio:.2%})\n")
-            print(f"[✓] Disimpan: {filename} ({ratio:.2%})")
-        else:
-            log.write(f"case_{idx:03}.txt: SKIPPED ({cleaned_word_count}/{raw_word_count} = {ratio:.2%}) - terlalu sedikit teks.\n")
-            print(f"[!] Lewatkan: {link} - ({ratio:.2%}) konten tersedia, terlalu sedikit teks setelah dibersihkan.")
+        res = fetch_with_retry(session or make_session(1), link, archive, budget)
+        raise_for_status(res)
+        store_case(link, idx, log, res.text, manifest, res.retries)
     except Exception as e:
-        log.write(f"case_{idx:03}.txt: ERROR - {str(e)}\n")
-        print(f"[X] Gagal pada {link}: {e}")
+        record_error(link, idx, log, e, manifest)
 
-if __name__ == "__main__":
-    links = get_links(max_pages=2) # Atau lebih banyak halaman jika perlu
-    print(f"\n[=] Total putusan ditemukan: {len(links)}\n")
+def pending_links(links, manifest, resume=True):
+    """
+    Memberi case_id stabil dari manifest ke setiap link, dan (jika resume)
+    melewatkan halaman detail yang sudah tersimpan pada eksekusi sebelumnya.
+    """
+    pending = []
+    for link in dict.fromkeys(links): # Buang duplikat, pertahankan urutan
+        if resume and manifest.is_done(link):
+            continue
+        pending.append((manifest.case_id_for(link), link))
+    skipped = len(set(links)) - len(pending)
+    if skipped:
+        print(f"[=] {skipped} putusan sudah ada di manifest dan dilewati.")
+    return pending
+
+def finish_passes(manifest, complete_listings):
+    """
+    Menandai pass kategori selesai jika paginasinya sampai akhir dan semua putusannya OK/SKIPPED;
+    kategori dengan putusan ERROR di-crawl penuh lagi pada eksekusi berikutnya agar link itu ditemukan ulang.
+    """
+    for category, links in complete_listings.items():
+        if all(manifest.is_done(link) for link in links):
+            manifest.finish_pass(category)
+
+def open_archive(use_archive):
+    return HtmlArchive(ARCHIVE_DIR) if use_archive else None
+
+def as_categories(categories):
+    """Menerima satu URL kategori atau daftar URL kategori."""
+    return [categories] if isinstance(categories, str) else list(categories)
+
+def crawl_sync(categories=CATEGORY_ROOTS, max_pages=None, resume=True, use_archive=True):
+    """Mode crawl lama: satu request per waktu dengan jeda tetap REQUEST_DELAY detik, kategori demi kategori."""
+    start = time.perf_counter()
+    session = make_session(1)
+    fetched = []
+    session.hooks["response"].append(lambda res, *args, **kwargs: fetched.append(res.url))
+    archive = open_archive(use_archive)
+    budget = RetryBudget()
+    with CrawlManifest(MANIFEST_FILE) as manifest:
+        links = []
+        complete_listings = {} # kategori -> link putusannya, untuk kategori yang paginasinya sampai akhir
+        for base_page in as_categories(categories):
+            # Berhenti di halaman yang sudah dikenal hanya jika pass sebelumnya selesai penuh
+            stop_early = manifest.start_pass(base_page) and resume
+            category_links, reached_end = get_links(max_pages=max_pages, base_page=base_page, session=session,
+                                                    manifest=manifest if stop_early else None, archive=archive,
+                                                    budget=budget)
+            links.extend(category_links)
+            if reached_end:
+                complete_listings[base_page] = category_links
+        links = list(dict.fromkeys(links)) # Putusan yang muncul di beberapa kategori cukup diambil sekali
+        print(f"\n[=] Total putusan ditemukan: {len(links)}\n")
+        todo = pending_links(links, manifest, resume)
+
+        with open(LOG_FILE, "a", encoding="utf-8") as log:
+            for i, link in todo:
+                save_case(link, i, log, session=session, manifest=manifest, archive=archive, budget=budget)
+                time.sleep(REQUEST_DELAY) # Beri jeda untuk menghindari pemblokiran IP
+        finish_passes(manifest, complete_listings)
+    if archive is not None:
+        archive.close()
+    report_throughput(len(fetched), time.perf_counter() - start)
+    get_metrics().summary({"fetch": 1, "parse": 1, "write": 1})
+
+async def crawl_async(categories=CATEGORY_ROOTS, max_pages=None, workers=4, rate=0.25, resume=True,
+                      use_archive=True, parse_workers=None, adaptive=True):
+    """
+    Mode crawl asyncio berbentuk pipeline bertahap yang saling tumpang tindih:
 
-    with open(LOG_FILE, "w", encoding="utf-8") as log:
-        for i, link in enumerate(links, 1):
-            save_case(link, i, log)
-            time.sleep(4) # Beri jeda untuk menghindari pemblokiran IP
+        frontier (halaman daftar + detail) -> fetch -> parse/clean -> tulis ke disk
+
+    Semua root kategori dijadwalkan dalam satu CrawlFrontier: jumlah halaman tiap kategori
+    dideteksi dari paginasi halaman pertamanya, dan halaman daftar serta detail diambil
+    berdasarkan prioritas (halaman terbaru lebih dulu, bergantian antar kategori).
+    `workers` worker fetch berbagi satu session keep-alive dan satu pembatas laju global
+    per host (`rate` request/detik), sehingga semua kategori memakai satu anggaran politeness.
+    Request HTTP (blocking) dijalankan di thread pool, sedangkan parsing dijalankan di
+    process pool (`parse_workers` proses) agar tidak menahan I/O jaringan.
+
+    Jika `adaptive`, jumlah request yang berjalan bersamaan diatur AdaptiveConcurrency
+    (naik selama latensi dan status sehat, turun saat 429/5xx/timeout) dengan `workers`
+    sebagai batas atas; request yang gagal di-retry dengan backoff + jitter dalam batas RetryBudget.
+    """
+    start = time.perf_counter()
+    loop = asyncio.get_running_loop()
+    limiter = HostRateLimiter(rate)
+    session = make_session(workers)
+    executor = ThreadPoolExecutor(max_workers=workers)
+    parse_workers = parse_workers or os.cpu_count() or 1
+    parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+    archive = open_archive(use_archive)
+    manifest = CrawlManifest(MANIFEST_FILE)
+    frontier = CrawlFrontier(max_pages)
+    parse_queue = asyncio.Queue(maxsize=parse_workers * 2)
+    write_queue = asyncio.Queue(maxsize=64)
+    controller = AdaptiveConcurrency(workers) if adaptive else AdaptiveConcurrency(workers, min_limit=workers, initial=workers)
+    budget = RetryBudget()
+    stats = {"pages": 0, "links": 0, "skipped": 0, "retries": 0, "first_case": None}
+    category_links = {} # kategori -> jumlah link putusan yang ditemukan
+    listing_links = {} # kategori -> semua link putusan di halaman daftarnya
+    stop_early = {} # kategori -> boleh berhenti di halaman yang sudah dikenal (pass sebelumnya selesai penuh)
+    complete_listings = set() # kategori yang paginasinya sampai akhir
+    seen = set()
+
+    async def fetch(url):
+        budget.deposit()
+        attempt = 0
+        while True:
+            await limiter.acquire(url)
+            async with controller:
+                started = time.perf_counter()
+                res = None
+                try:
+                    res = await loop.run_in_executor(executor, fetch_page, session, url, archive)
+                    stats["pages"] += 1
+                    error, retry_after = retry_reason(res)
+                except (requests.Timeout, requests.ConnectionError) as e:
+                    error, retry_after = e, None
+                if error is None:
+                    controller.on_success(time.perf_counter() - started)
+                    record_fetch(url, attempt, res)
+                    res.retries = attempt
+                    return res
+                controller.on_throttle()
+            if attempt >= MAX_RETRIES or not budget.try_withdraw():
+                record_fetch(url, attempt, res, error)
+                raise error
+            record_fetch(url, attempt, res, error, retrying=True)
+            stats["retries"] += 1
+            await asyncio.sleep(backoff_delay(attempt, retry_after=retry_after))
+            attempt += 1
+
+    async def crawl_listing(category, page):
+        url = listing_url(page, category)
+        print(f"[+] Fetching page {page}: {url}")
+        try:
+            res = await fetch(url)
+        except Exception as e:
+            print(f"[X] Gagal mengambil halaman daftar {url}: {e}")
+            return
+        if not 200 <= res.status_code < 300:
+            print(f"[X] Halaman daftar {url} membalas HTTP {res.status_code}, paginasi dihentikan.")
+            return
+        page_links, last_page = parse_listing_page(res.text, url, category)
+        if not page_links:
+            complete_listings.add(category)
+            return
+        if page == 1:
+            frontier.set_page_count(category, last_page)
+            print(f"[=] Kategori {category}: {last_page or '?'} halaman daftar terdeteksi")
+        listing_links.setdefault(category, []).extend(page_links)
+        known_page = stop_early[category] and is_known_page(page_links, manifest)
+        for position, link in enumerate(page_links):
+            if link in seen:
+                continue
+            seen.add(link)
+            stats["links"] += 1
+            category_links[category] = category_links.get(category, 0) + 1
+            if resume and manifest.is_done(link):
+                stats["skipped"] += 1
+                continue
+            frontier.push_detail(category, page, position, link, manifest.case_id_for(link))
+        if known_page:
+            # Halaman daftar diurutkan dari yang terbaru, jadi halaman berikutnya juga sudah dikenal
+            print(f"[=] Halaman {page} dari {category} hanya berisi putusan yang sudah dikenal, paginasi dihentikan.")
+            complete_listings.add(category)
+            return
+        if not frontier.schedule_next_page(category, page) and page >= (frontier.page_counts.get(category) or page + 1):
+            complete_listings.add(category) # Halaman terakhir kategori, bukan batas --max-pages
+
+    async def crawl_detail(idx, link):
+        try:
+            res = await fetch(link)
+            raise_for_status(res)
+            await parse_queue.put((idx, link, res.text, res.retries))
+        except Exception as e:
+            record_error(link, idx, log, e, manifest)
+
+    async def crawler():
+        while (item := await frontier.get()) is not None:
+            kind, category, page, link, idx = item
+            try:
+                if kind == LISTING:
+                    await crawl_listing(category, page)
+                else:
+                    await crawl_detail(idx, link)
+            finally:
+                frontier.task_done()
+
+    async def parser():
+        while (item := await parse_queue.get()) is not None:
+            idx, link, html, retries = item
+            try:
+                # Pengaturan parser diteruskan eksplisit karena proses anak tidak melihat
+                # perubahan variabel modul dari argumen CLI.
+                case_text, parse_ms = await loop.run_in_executor(parse_pool, parse_case, html, HTML_PARSER, PARTIAL_PARSE)
+                await write_queue.put((idx, link, case_text, parse_ms, retries))
+            except Exception as e:
+                record_error(link, idx, log, e, manifest)
+
+    async def writer():
+        while (item := await write_queue.get()) is not None:
+            idx, link, case_text, parse_ms, retries = item
+            try:
+                write_case(link, idx, log, case_text, manifest, parse_ms, retries)
+            except Exception as e:
+                record_error(link, idx, log, e, manifest)
+            if stats["first_case"] is None:
+                stats["first_case"] = time.perf_counter() - start
+
+    async def close_stage(tasks, queue):
+        for _ in tasks:
+            await queue.put(None)
+        await asyncio.gather(*tasks)
+
+    try:
+        with open(LOG_FILE, "a", encoding="utf-8") as log:
+            for category in as_categories(categories):
+                stop_early[category] = manifest.start_pass(category) and resume
+                frontier.add_category(category)
+            crawlers = [asyncio.create_task(crawler()) for _ in range(workers)]
+            parsers = [asyncio.create_task(parser()) for _ in range(parse_workers)]
+            writers = [asyncio.create_task(writer())]
+            try:
+                # Worker frontier berhenti sendiri saat frontier kosong dan tidak ada item yang diproses
+                await asyncio.gather(*crawlers)
+            finally:
+                # Tutup tahap satu per satu dari hulu ke hilir agar semua item terproses
+                for task in crawlers:
+                    task.cancel()
+                await close_stage(parsers, parse_queue)
+                await close_stage(writers, write_queue)
+            finish_passes(manifest, {category: listing_links.get(category, []) for category in complete_listings})
+    finally:
+        executor.shutdown(wait=False)
+        parse_pool.shutdown()
+        session.close()
+        manifest.close()
+        if archive is not None:
+            archive.close()
+
+    print(f"\n[=] Total putusan ditemukan: {stats['links']}")
+    for category in frontier.categories:
+        print(f"    {category}: {category_links.get(category, 0)} putusan, "
+              f"{frontier.page_counts.get(category) or '?'} halaman terdeteksi")
+    if stats["skipped"]:
+        print(f"[=] {stats['skipped']} putusan sudah ada di manifest dan dilewati.")
+    if stats["first_case"] is not None:
+        print(f"[=] Kasus pertama tersimpan setelah {stats['first_case']:.1f} detik")
+    print(f"[=] Konkurensi: akhir {int(controller.limit)}, puncak {int(controller.peak_limit)} dari maks {workers}; "
+          f"{controller.throttle_events} sinyal throttle, {stats['retries']} retry")
+    report_throughput(stats["pages"], time.perf_counter() - start)
+    get_metrics().summary({"fetch": workers, "parse": parse_workers, "write": 1})
+
+def replay_archive():
+    """
+    Mode replay: menjalankan ulang ekstraksi dan clean_text dari arsip HTML lokal
+    tanpa akses jaringan, lalu menulis ulang case_NNN.txt sesuai case_id di manifest.
+    """
+    start = time.perf_counter()
+    replayed = failed = 0
+    with HtmlArchive(ARCHIVE_DIR) as archive, CrawlManifest(MANIFEST_FILE) as manifest, \
+            open(LOG_FILE, "a", encoding="utf-8") as log:
+        print(f"[+] Replay {len(archive)} record dari arsip {ARCHIVE_DIR}")
+        for url, status, html in archive.iter_records():
+            if "/putusan/" not in url:
+                continue # Halaman daftar hanya diarsipkan, tidak diekstrak
+            if status != 200:
+                failed += 1 # Halaman error (403/404/...) tidak diekstrak; entri manifestnya dibiarkan
+                continue
+            idx = manifest.case_id_for(url)
+            try:
+                store_case(url, idx, log, html, manifest)
+            except Exception as e:
+                record_error(url, idx, log, e, manifest)
+            replayed += 1
+    elapsed = time.perf_counter() - start
+    rate = replayed / elapsed if elapsed > 0 else 0.0
+    print(f"\n[=] {replayed} putusan diekstrak ulang dari arsip dalam {elapsed:.1f} detik ({rate:.2f} putusan/detik)")
+    if failed:
+        print(f"[=] {failed} record arsip dengan status HTTP non-200 dilewati.")
+    get_metrics().summary({"parse": 1, "write": 1})
+
+def report_throughput(pages, elapsed):
+    rate = pages / elapsed if elapsed > 0 else 0.0
+    print(f"\n[=] {pages} halaman diambil dalam {elapsed:.1f} detik ({rate:.2f} halaman/detik)")
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Tahap 1: scraping dan pembersihan awal putusan.")
+    parser.add_argument("--mode", choices=["sync", "async", "replay"], default="sync",
+                        help="sync = satu per satu dengan jeda tetap; async = worker paralel dengan rate limiter; "
+                             "replay = ekstraksi ulang dari arsip HTML lokal tanpa jaringan")
+    parser.add_argument("--category", "--base-page", dest="categories", action="append", default=None,
+                        help="URL root kategori (tanpa .html); bisa diulang untuk beberapa kategori sekaligus "
+                             "dan bisa diarahkan ke server stub lokal untuk pengujian (default: CATEGORY_ROOTS)")
+    parser.add_argument("--max-pages", type=int, default=0,
+                        help="Jumlah maksimum halaman daftar per kategori (0 = sesuai jumlah halaman yang terdeteksi, "
+                             "atau sampai halaman yang sudah dikenal)")
+    parser.add_argument("--workers", type=int, default=4,
+                        help="Jumlah worker fetch pada mode async (batas atas konkurensi adaptif)")
+    parser.add_argument("--no-adaptive", action="store_true",
+                        help="Matikan konkurensi adaptif; selalu pakai --workers request bersamaan")
+    parser.add_argument("--parse-workers", type=int, default=None,
+                        help="Jumlah proses parsing pada mode async (default: jumlah core CPU)")
+    parser.add_argument("--rate", type=float, default=1 / REQUEST_DELAY,
+                        help="Batas request per detik per host pada mode async (0 = tanpa batas)")
+    parser.add_argument("--no-resume", action="store_true",
+                        help="Abaikan status di manifest dan ambil ulang semua putusan (case_id tetap dari manifest)")
+    parser.add_argument("--no-archive", action="store_true",
+                        help="Jangan simpan HTML mentah ke arsip data/archive")
+    parser.add_argument("--parser", default=HTML_PARSER,
+                        help="Backend parser BeautifulSoup (html.parser atau lxml)")
+    parser.add_argument("--raw-store", choices=RAW_STORE_KINDS, default=RAW_STORE_KIND,
+                        help="txt = satu file case_NNN.txt per putusan; shards = shard terkompresi di data/raw_store")
+    parser.add_argument("--full-parse", action="store_true",
+                        help="Parse seluruh dokumen HTML, bukan hanya bagian yang diekstrak")
+    return parser.parse_args()
+
+if __name__ == "__main__":
+    args = parse_args()
+    HTML_PARSER = args.parser
+    PARTIAL_PARSE = not args.full_parse
+    RAW_STORE_KIND = args.raw_store
+    categories = args.categories or CATEGORY_ROOTS
+    max_pages = args.max_pages or None
+    resume = not args.no_resume
+    use_archive = not args.no_archive
+    if args.mode == "replay":
+        replay_archive()
+    elif args.mode == "async":
+        asyncio.run(crawl_async(categories, max_pages, args.workers, args.rate, resume, use_archive,
+                                args.parse_workers, not args.no_adaptive))
+    else:
+        crawl_sync(categories, max_pages, resume, use_archive)
+    get_raw_store().close()
+    get_metrics().close()
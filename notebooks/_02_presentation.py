@@ -1,14 +1,34 @@
 # 02_representation.py
 
 import os
-import re
+import sys
+import time
+import argparse
 import pandas as pd
 import json
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import resource
+except ImportError: # Windows tidak punya modul resource; peak RSS tidak dilaporkan
+    resource = None
+
+from raw_store import RAW_STORE_KINDS, open_raw_store
+from near_dup import DEFAULT_NUM_PERM, DEFAULT_SHINGLE_SIZE, DEFAULT_THRESHOLD, MinHashLSH, find_near_duplicates
+from crawl_manifest import content_hash
+from representation_state import RepresentationState
+from section_scanner import scan_judgment
+from case_db import CASE_DB_PATH, build_case_db
+from outcome_fields import amar_text, extract_outcome
+from case_store import (CASE_COLUMNS, CASE_STORE_FORMATS, CaseWriter, append_cases, cases_exist, iter_cases,
+                        read_cases_exact, write_cases)
 
 # Direktori tempat file .txt dari Tahap 1 disimpan
 DATA_RAW_DIR = "../data/raw"
 DATA_PROCESSED_DIR = "../data/processed"
-CASES_CSV_PATH = os.path.join(DATA_PROCESSED_DIR, "cases.csv")
+CHUNK_SIZE = 32 # Jumlah kasus per tugas yang dikirim ke satu proses worker
+BATCH_SIZE = 500 # Jumlah baris per batch yang ditulis ke case base pada mode streaming
 
 # Pastikan direktori output ada
 os.makedirs(DATA_PROCESSED_DIR, exist_ok=True)
@@ -17,177 +37,371 @@ def extract_metadata(text_content, filename_as_id):
     """
     Ekstrak metadata dan fitur kunci dari teks putusan yang sudah dibersihkan.
     Parameter filename_as_id digunakan untuk memastikan konsistensi case_id.
+    Semua field diambil dari satu kali pemindaian teks (lihat section_scanner.scan_judgment);
+    field hasil putusan bertipe diambil dari amar lengkap (lihat outcome_fields.extract_outcome).
     """
-    metadata = {
-        'case_id': filename_as_id, # Langsung gunakan ID berdasarkan nama file
-        'no_perkara': None,
-        'tanggal': None,
-        'jenis_perkara': None,
-        'pasal': None,
-        'pihak': None,
-        'judul_putusan_bersih': "Judul putusan tidak dapat diekstraksi.", # Kolom baru untuk judul bersih
-        'ringkasan_fakta': "Ringkasan fakta tidak dapat diekstraksi secara spesifik.", # Default jika tidak ditemukan
-        'argumen_hukum_utama': "Argumen hukum utama tidak dapat diekstraksi secara spesifik.", # Default
-        'solusi': "Solusi tidak dapat diekstraksi secara spesifik.", # Default
-        'text_full': text_content # Seluruh teks bersih untuk vectorization
-    }
-
-    # Pisahkan bagian-bagian konten berdasarkan pemisah yang kita tambahkan di scraper
-    parts = re.split(r'===\s*(?:JUDUL:|METADATA TABLE|MAIN JUDGMENT BODY)\s*===', text_content, flags=re.IGNORECASE)
-    
-    judul_raw = ""
-    table_content_raw = ""
-    main_body_raw = ""
-
-    # Ekstraksi konten berdasarkan struktur yang diharapkan dari scraper
-    # Asumsi: urutan parts[1] (judul), parts[2] (metadata table), parts[3] (main body)
-    if len(parts) > 1:
-        # Mencari judul yang diawali dengan "JUDUL:"
-        judul_match = re.search(r'judul:\s*(.*?)(?=\n|$)', text_content, re.IGNORECASE | re.DOTALL)
-        if judul_match:
-            judul_raw = judul_match.group(1).strip()
-            # Bersihkan judul dan simpan di kolom baru
-            metadata['judul_putusan_bersih'] = re.sub(r'\s+', ' ', judul_raw).strip().lower()
-        
-        # Cari konten tabel metadata
-        table_match = re.search(r'===\s*METADATA TABLE\s*===\s*(.*?)(?=\n\s*===\s*MAIN JUDGMENT BODY\s*===|\Z)', text_content, re.IGNORECASE | re.DOTALL)
-        if table_match:
-            table_content_raw = table_match.group(1).strip()
-
-        # Cari badan putusan utama
-        body_match = re.search(r'===\s*MAIN JUDGMENT BODY\s*===\s*(.*)', text_content, re.IGNORECASE | re.DOTALL)
-        if body_match:
-            main_body_raw = body_match.group(1).strip()
-    else: # Fallback jika format baru tidak ditemukan, gunakan seluruh text_content
-        main_body_raw = text_content # Ini akan menjadi text_content lama yang mungkin hanya metadata.
-        # Jika tidak ada pemisah yang ditemukan, coba ambil judul dari baris pertama sebagai fallback
-        first_line = text_content.split('\n', 1)[0].strip()
-        if first_line.startswith('==='): # Jika ada format header lama dari scraper
-             metadata['judul_putusan_bersih'] = re.sub(r'^===\s*(.*?)\s*===.*', r'\1', first_line).strip().lower()
-        else:
-             metadata['judul_putusan_bersih'] = first_line.lower()
-
-
-    # --- Ekstraksi Metadata Dasar dari Table Content (atau main_body_raw jika tidak ada table) ---
-    # Gunakan table_content_raw untuk metadata yang berasal dari tabel
-    source_for_metadata = table_content_raw if table_content_raw else main_body_raw
-
-    match = re.search(r'nomor:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
-    if match: metadata['no_perkara'] = match.group(1).strip()
-    
-    match = re.search(r'tanggal register:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
-    if match: metadata['tanggal'] = match.group(1).strip()
-        
-    match = re.search(r'jenis perkara:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
-    if match: metadata['jenis_perkara'] = match.group(1).strip()
-        
-    match = re.search(r'pasal:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
-    if match: metadata['pasal'] = match.group(1).strip()
-        
-    penggugat_match = re.search(r'penggugat:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
-    tergugat_match = re.search(r'tergugat:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
-    if penggugat_match and tergugat_match:
-        metadata['pihak'] = f"{penggugat_match.group(1).strip()} vs. {tergugat_match.group(1).strip()}"
-    elif penggugat_match:
-        metadata['pihak'] = penggugat_match.group(1).strip()
-    elif tergugat_match:
-        metadata['pihak'] = tergugat_match.group(1).strip()
-
-
-    # --- Peningkatan Ekstraksi Solusi (Amar Putusan) dan Argumen Hukum Utama ---
-    # Prioritaskan pencarian di main_body_raw, atau fallback ke table_content_raw
-    source_for_solusi_argumen = main_body_raw if main_body_raw else source_for_metadata
-
-    # Cari kata kunci putusan di sumber yang lebih kaya
-    # Pola yang lebih agresif untuk menangkap seluruh blok solusi/amar
-    solusi_match = re.search(
-        r'(MENGADILI|MEMUTUSKAN|MENETAPKAN)\s*:?\s*(.*?)(?=\n\s*(?:tanggal musyawarah|tanggal dibacakan|kaidah|abstrak|putusan|penuntut umum|terdakwa|\Z)|$)',
-        source_for_solusi_argumen, re.IGNORECASE | re.DOTALL
-    )
-    
-    if solusi_match:
-        extracted_solusi = solusi_match.group(2).strip()
-        # Batasi panjang solusi yang diekstrak jika terlalu panjang
-        if len(extracted_solusi.split()) > 200: 
-            extracted_solusi = ' '.join(extracted_solusi.split()[:200]) + "..."
-        metadata['solusi'] = extracted_solusi
-        metadata['argumen_hukum_utama'] = extracted_solusi # Asumsi solusi juga merupakan argumen hukum utama
-    
-    # Fallback ke ekstraksi pasal atau jenis perkara jika solusi masih belum ditemukan
-    if metadata['solusi'] == "Solusi tidak dapat diekstraksi secara spesifik.":
-        if metadata['pasal']:
-            metadata['solusi'] = f"Putusan terkait pasal: {metadata['pasal']}"
-        elif metadata['jenis_perkara']:
-            metadata['solusi'] = f"Putusan terkait jenis perkara: {metadata['jenis_perkara']}"
-
-    # --- Peningkatan Ekstraksi Ringkasan Fakta ---
-    # Cari di main_body_raw, atau fallback ke source_for_metadata
-    source_for_facts = main_body_raw if main_body_raw else source_for_metadata
-    facts_keywords = ['bahwa', 'terdakwa', 'bukti', 'kejadian', 'perbuatan', 'saksi', 'keterangan']
-    
-    # Mencoba mencari section "DUDUK PERKARA" atau "FAKTA-FAKTA"
-    facts_section_match = re.search(
-        r'(DUDUK PERKARA|FAKTA-FAKTA|TENTANG FAKTA-FAKTA)\s*(.*?)(?=\n\s*(?:MENIMBANG|MENGADILI|MEMUTUSKAN|MENETAPKAN|\Z))',
-        source_for_facts, re.IGNORECASE | re.DOTALL
-    )
-    
-    if facts_section_match:
-        metadata['ringkasan_fakta'] = facts_section_match.group(2).strip()
-        if len(metadata['ringkasan_fakta'].split()) > 150:
-            metadata['ringkasan_fakta'] = ' '.join(metadata['ringkasan_fakta'].split()[:150]) + "..."
-    else: # Fallback ke pencarian baris dengan kata kunci jika tidak ada section header
-        extracted_facts_lines = []
-        for line in source_for_facts.split('\n'):
-            if any(keyword in line.lower() for keyword in facts_keywords):
-                extracted_facts_lines.append(line.strip())
-                if len(" ".join(extracted_facts_lines).split()) > 150:
-                    break
-        if extracted_facts_lines:
-            metadata['ringkasan_fakta'] = " ".join(extracted_facts_lines)
-    
+    fields = scan_judgment(text_content)
+    metadata = {'case_id': filename_as_id} # Langsung gunakan ID berdasarkan nama file
+    metadata.update((column, value) for column, value in fields.items() if column != 'sections')
+    metadata.update(extract_outcome(amar_text(text_content, fields['sections'])))
+    metadata['text_full'] = text_content # Seluruh teks bersih untuk vectorization
     # Hitung panjang teks dari seluruh konten gabungan
     metadata['text_length'] = len(text_content.split())
-
     return metadata
 
-def create_case_representation():
+def extract_chunk(chunk):
+    """Dijalankan di proses worker: ekstraksi metadata untuk satu potongan [(case_id, teks), ...]."""
+    return [extract_metadata(text_content, case_id) for case_id, text_content in chunk]
+
+def iter_chunks(items, size):
+    chunk = []
+    for item in items:
+        chunk.append(item)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+def iter_extracted(cases, workers=1, chunk_size=CHUNK_SIZE):
     """
-    Membuat representasi kasus dari file teks mentah yang dihasilkan Tahap 1.
+    Menjalankan extract_metadata atas (case_id, teks) dan menghasilkan dict metadata dengan urutan
+    yang sama seperti masukan. Jika workers > 1, potongan berisi `chunk_size` kasus dibagikan ke
+    process pool; paling banyak workers * 2 potongan berjalan sekaligus sehingga raw store tetap
+    dibaca secara streaming, dan hasil diambil sesuai urutan pengiriman (deterministik).
     """
-    cases_data = []
-    txt_files = sorted([f for f in os.listdir(DATA_RAW_DIR) if f.endswith('.txt')])
-    
-    if not txt_files:
-        print(f"Peringatan: Tidak ada file .txt ditemukan di {DATA_RAW_DIR}. Pastikan Tahap 1 sudah dijalankan.")
+    if workers <= 1:
+        for case_id, text_content in cases:
+            yield extract_metadata(text_content, case_id)
         return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in iter_chunks(cases, chunk_size):
+            pending.append(pool.submit(extract_chunk, chunk))
+            if len(pending) >= workers * 2:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
 
-    for filename in txt_files:
-        file_path = os.path.join(DATA_RAW_DIR, filename)
-        with open(file_path, 'r', encoding='utf-8') as f:
-            full_text_content = f.read() # Ini sekarang akan berisi gabungan metadata dan badan utama
-        
-        # Pastikan case_id selalu dari nama file
-        base_filename_id = os.path.basename(filename).replace(".txt", "")
-        extracted_data = extract_metadata(full_text_content, base_filename_id)
-        
-        cases_data.append(extracted_data)
-    
-    # Buat DataFrame dari data yang diekstrak
-    df_cases = pd.DataFrame(cases_data)
-    
+# Parameter yang menentukan nilai signature MinHash; cache signature hanya dipakai ulang jika sama
+SIGNATURE_PARAMS = {"num_perm": DEFAULT_NUM_PERM, "shingle_size": DEFAULT_SHINGLE_SIZE, "seed": 1}
+
+def report_duplicates(duplicates, threshold, only=None):
+    """Mencetak pasangan near-duplicate; `only` membatasi daftar ke case_id tertentu (mis. kasus yang berubah)."""
+    if duplicates:
+        print(f"[=] {len(duplicates)} kasus terdeteksi near-duplicate (Jaccard >= {threshold}):")
+        for case_id, (canonical, similarity) in duplicates.items():
+            if only is None or case_id in only:
+                print(f"    {case_id} ~ {canonical} ({similarity:.2f})")
+
+def mark_near_duplicates(df_cases, threshold=DEFAULT_THRESHOLD, signatures=None):
+    """
+    Mengisi kolom 'duplicate_of' dengan case_id kanonik untuk putusan yang hampir sama
+    (estimasi Jaccard MinHash >= threshold); kasus kanonik bernilai kosong.
+    `signatures` (opsional) diisi dengan signature MinHash setiap kasus untuk eksekusi inkremental.
+    """
+    duplicates = find_near_duplicates(zip(df_cases['case_id'], df_cases['text_full']), threshold=threshold,
+                                      signatures=signatures)
+    df_cases['duplicate_of'] = df_cases['case_id'].map(lambda case_id: duplicates[case_id][0] if case_id in duplicates else None)
+    report_duplicates(duplicates, threshold)
+    return df_cases
+
+def finalize_columns(df_cases):
     # Pastikan kolom yang dibutuhkan ada, jika tidak, isi dengan string kosong
-    required_cols = ['case_id', 'no_perkara', 'tanggal', 'jenis_perkara', 'pasal', 
-                     'pihak', 'judul_putusan_bersih', 'ringkasan_fakta', 'argumen_hukum_utama', 'solusi', 
-                     'text_full', 'text_length']
-    for col in required_cols:
+    for col in CASE_COLUMNS:
         if col not in df_cases.columns:
             df_cases[col] = ''
-    
     # Urutkan ulang kolom sesuai contoh
-    df_cases = df_cases[required_cols]
+    return df_cases[CASE_COLUMNS]
+
+def scan_raw_store(raw_store, previous):
+    """
+    Membandingkan isi raw store dengan status sebelumnya (case_id -> entri RepresentationState).
+    Kasus yang fingerprint-nya sama tidak dibaca sama sekali; sisanya dibaca dan di-hash.
+    Mengembalikan (entries, changed): entri status terbaru untuk setiap kasus, dan
+    dict case_id -> teks untuk kasus yang baru atau isinya berubah.
+    """
+    entries, changed = {}, {}
+    for case_id in raw_store.ids():
+        fingerprint = raw_store.fingerprint(case_id)
+        old = previous.get(case_id)
+        if old is not None and old["fingerprint"] == fingerprint:
+            entries[case_id] = dict(old)
+            continue
+        text_content = raw_store.get(case_id)
+        digest = content_hash(text_content)
+        entries[case_id] = {"fingerprint": fingerprint, "content_hash": digest, "duplicate_of": None}
+        if old is None or old["content_hash"] != digest:
+            changed[case_id] = text_content
+        else:
+            entries[case_id]["duplicate_of"] = old.get("duplicate_of") # Hanya di-touch, isi sama
+    return entries, changed
+
+def track_entries(raw_store, cases, entries):
+    """Meneruskan (case_id, teks) sambil mencatat entri status RepresentationState setiap kasus."""
+    for case_id, text_content in cases:
+        entries[case_id] = {"fingerprint": raw_store.fingerprint(case_id),
+                            "content_hash": content_hash(text_content), "duplicate_of": None}
+        yield case_id, text_content
+
+def report_throughput(count, workers, elapsed):
+    print(f"[=] {count} kasus diekstrak dengan {workers} worker dalam {elapsed:.2f} detik "
+          f"({count / elapsed:.1f} dokumen/detik)")
+
+def build_full(raw_store, dedup, dedup_threshold, workers, chunk_size):
+    """Membangun ulang seluruh representasi. Mengembalikan (df_cases, entri status, cache signature)."""
+    entries = {}
+    start = time.perf_counter()
+    # case_id selalu dari nama file / id di raw store.
+    # Teks berisi gabungan metadata dan badan utama.
+    cases_data = list(iter_extracted(track_entries(raw_store, raw_store.iter_cases(), entries), workers, chunk_size))
+    if not cases_data:
+        return None, entries, {}
+    report_throughput(len(cases_data), workers, time.perf_counter() - start)
+
+    # Buat DataFrame dari data yang diekstrak
+    df_cases = pd.DataFrame(cases_data)
+    signatures = {}
+    if dedup != "off":
+        df_cases = mark_near_duplicates(df_cases, dedup_threshold, signatures)
+        for case_id, canonical in zip(df_cases['case_id'], df_cases['duplicate_of']):
+            entries[case_id]["duplicate_of"] = canonical if pd.notna(canonical) else None
+        if dedup == "collapse":
+            df_cases = df_cases[df_cases['duplicate_of'].isna()]
+    return finalize_columns(df_cases), entries, signatures
+
+def build_streaming(raw_store, dedup, dedup_threshold, workers, chunk_size, batch_size=BATCH_SIZE, fmt="both"):
+    """
+    Membangun ulang seluruh representasi secara streaming: kasus dibaca, diekstrak, dan ditulis ke
+    case base per batch berisi `batch_size` baris (CaseWriter), sehingga teks putusan tidak pernah
+    tersimpan seluruhnya di memori. Near-duplicate dideteksi online dengan urutan yang sama seperti
+    build_full, jadi case base yang dihasilkan identik.
+    Mengembalikan (path yang ditulis, entri status, cache signature); path None jika raw store kosong.
+    """
+    entries, signatures, duplicates = {}, {}, {}
+    index = MinHashLSH(dedup_threshold, DEFAULT_NUM_PERM, DEFAULT_SHINGLE_SIZE) if dedup != "off" else None
+    writer = CaseWriter(fmt)
+    count, batch = 0, []
+    start = time.perf_counter()
+    try:
+        for metadata in iter_extracted(track_entries(raw_store, raw_store.iter_cases(), entries), workers, chunk_size):
+            count += 1
+            if index is not None:
+                case_id = metadata['case_id']
+                signatures[case_id] = index.signature(metadata['text_full'])
+                match = index.add(case_id, signatures[case_id])
+                metadata['duplicate_of'] = entries[case_id]["duplicate_of"] = match[0] if match else None
+                if match:
+                    duplicates[case_id] = match
+                    if dedup == "collapse":
+                        continue
+            batch.append(metadata)
+            if len(batch) >= batch_size:
+                writer.write(finalize_columns(pd.DataFrame(batch)))
+                batch = []
+        if batch:
+            writer.write(finalize_columns(pd.DataFrame(batch)))
+    except BaseException:
+        writer.abort()
+        raise
+    if count == 0:
+        writer.abort()
+        return None, entries, {}
+    report_throughput(count, workers, time.perf_counter() - start)
+    if index is not None:
+        report_duplicates(duplicates, dedup_threshold)
+    return writer.close(), entries, signatures
+
+def peak_rss_mib():
+    """Peak RSS (MiB) proses ini dan proses worker-nya, atau None jika OS tidak mendukung."""
+    if resource is None:
+        return None
+    scale = 1024 * 1024 if sys.platform == "darwin" else 1024 # ru_maxrss: byte di macOS, KiB di Linux
+    return (resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale,
+            resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / scale)
+
+def report_peak_rss(label):
+    peak = peak_rss_mib()
+    if peak is not None:
+        print(f"[=] Peak RSS {label}: {peak[0]:.1f} MiB" + (f" (worker: {peak[1]:.1f} MiB)" if peak[1] else ""))
+
+def rewrite_streaming(df_new, to_drop, duplicate_of, fmt="both", batch_size=BATCH_SIZE):
+    """
+    Menulis ulang case base per chunk (iter_cases) tanpa memuat case base lama seluruhnya.
+    Case base selalu urut menurut case_id, jadi baris baru cukup disisipkan ke chunk yang
+    rentangnya mencakup case_id-nya; hasilnya sama dengan concat + sort_values pada mode biasa.
+    duplicate_of: case_id -> kanonik untuk memperbarui kolom duplicate_of (None = tidak diubah).
+    """
+    df_new = df_new.sort_values('case_id', kind='stable')
+    writer = CaseWriter(fmt)
+    try:
+        for chunk in iter_cases(chunk_rows=batch_size, exact=True):
+            chunk = chunk[~chunk['case_id'].isin(to_drop)]
+            if chunk.empty:
+                continue
+            if duplicate_of is not None:
+                chunk['duplicate_of'] = chunk['case_id'].map(duplicate_of)
+            split = int(df_new['case_id'].searchsorted(chunk['case_id'].iloc[-1], side='right'))
+            if split:
+                chunk = pd.concat([chunk, df_new.iloc[:split]], ignore_index=True).sort_values('case_id', kind='stable')
+                df_new = df_new.iloc[split:]
+            writer.write(chunk)
+        if not df_new.empty:
+            writer.write(df_new)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+def update_incremental(raw_store, state, dedup, dedup_threshold, workers, chunk_size, fmt="both", stream=False,
+                       batch_size=BATCH_SIZE):
+    """
+    Memperbarui case base hanya untuk kasus yang berubah sejak eksekusi terakhir.
+    Kasus baru/berubah diekstrak ulang, kasus yang hilang dari raw store dibuang, dan status
+    near-duplicate dihitung ulang dari cache signature (hanya kasus berubah yang di-hash ulang).
+    Jika perubahan hanya berupa kasus baru di akhir urutan case_id, baris baru cukup di-append
+    (CSV di-append, Parquet mendapat part baru); selain itu case base ditulis ulang tanpa
+    mengekstrak ulang kasus lama. Dengan `stream`, penulisan ulang dilakukan per chunk berisi
+    `batch_size` baris (rewrite_streaming), sehingga case base lama tidak dimuat seluruhnya.
+    Mengembalikan (entri status, cache signature) atau None jika tidak ada perubahan.
+    """
+    start = time.perf_counter()
+    previous = state.cases
+    entries, changed = scan_raw_store(raw_store, previous)
+    removed = set(previous) - set(entries)
+    new = [case_id for case_id in changed if case_id not in previous]
+    print(f"[=] Inkremental: {len(new)} baru, {len(changed) - len(new)} berubah, {len(removed)} dihapus, "
+          f"{len(entries) - len(changed)} tidak berubah (pemindaian {time.perf_counter() - start:.2f} detik)")
+    if not changed and not removed:
+        print("[✓] Tidak ada perubahan; case base tidak disentuh.")
+        return entries, None
+
+    signatures = {}
+    if dedup != "off":
+        signatures = state.load_signatures(SIGNATURE_PARAMS)
+        for case_id in list(signatures):
+            if case_id in changed or case_id not in entries:
+                del signatures[case_id]
+        # Teks hanya dibaca untuk kasus yang belum punya signature di cache
+        docs = ((case_id, changed.get(case_id) or (raw_store.get(case_id) if case_id not in signatures else None))
+                for case_id in sorted(entries))
+        duplicates = find_near_duplicates(docs, threshold=dedup_threshold, signatures=signatures)
+        report_duplicates(duplicates, dedup_threshold, only=changed)
+        for case_id, entry in entries.items():
+            entry["duplicate_of"] = duplicates[case_id][0] if case_id in duplicates else None
+
+    def in_table(entry):
+        return dedup != "collapse" or entry.get("duplicate_of") is None
+
+    previous_rows = {case_id for case_id, entry in previous.items() if in_table(entry)}
+    rows = {case_id for case_id, entry in entries.items() if in_table(entry)}
+    to_extract = sorted(case_id for case_id in rows if case_id in changed or case_id not in previous_rows)
+    to_drop = {case_id for case_id in previous_rows if case_id not in rows or case_id in changed}
+    flag_changed = dedup == "flag" and any(
+        previous[case_id].get("duplicate_of") != entries[case_id]["duplicate_of"]
+        for case_id in rows & previous_rows if case_id not in changed)
+
+    workers = min(workers, max(1, -(-len(to_extract) // chunk_size))) # Tanpa process pool untuk perubahan kecil
+    extracted = list(iter_extracted(((case_id, changed.get(case_id) or raw_store.get(case_id)) for case_id in to_extract),
+                                    workers, chunk_size))
+    df_new = pd.DataFrame(extracted)
+    if dedup != "off" and not df_new.empty:
+        df_new['duplicate_of'] = df_new['case_id'].map(lambda case_id: entries[case_id]["duplicate_of"])
+    df_new = finalize_columns(df_new)
+
+    if not to_drop and not flag_changed and all(case_id > max(previous_rows, default="") for case_id in to_extract):
+        written = append_cases(df_new, fmt)
+        action = "ditambahkan (append)"
+    elif stream:
+        duplicate_of = {case_id: entry["duplicate_of"] for case_id, entry in entries.items()} if dedup == "flag" else None
+        written = rewrite_streaming(df_new, to_drop, duplicate_of, fmt, batch_size)
+        action = "diperbarui (tulis ulang per chunk)"
+    else:
+        # Baris lama dibaca apa adanya agar ditulis ulang tanpa perubahan format
+        df_cases = read_cases_exact()
+        df_cases = df_cases[~df_cases['case_id'].isin(to_drop)]
+        if dedup == "flag":
+            df_cases['duplicate_of'] = df_cases['case_id'].map(lambda case_id: entries[case_id]["duplicate_of"])
+        df_cases = pd.concat([df_cases, df_new], ignore_index=True).sort_values('case_id', kind='stable')
+        written = write_cases(df_cases, fmt)
+        action = "diperbarui (tulis ulang)"
+    print(f"[✓] {len(to_extract)} kasus diekstrak, {len(to_drop)} baris dibuang; {', '.join(written)} {action} "
+          f"dalam {time.perf_counter() - start:.2f} detik")
+    return entries, signatures
+
+def create_case_representation(raw_store_kind="txt", dedup="flag", dedup_threshold=DEFAULT_THRESHOLD,
+                               workers=None, chunk_size=CHUNK_SIZE, incremental=False, fmt="both",
+                               stream=False, batch_size=BATCH_SIZE, sqlite=False):
+    """
+    Membuat representasi kasus dari teks mentah yang dihasilkan Tahap 1.
+    raw_store_kind memilih sumbernya: 'txt' (file .txt di DATA_RAW_DIR) atau
+    'shards' (raw store ber-shard, dibaca secara streaming).
+    dedup: 'off', 'flag' (tandai di kolom duplicate_of) atau 'collapse' (buang duplikat).
+    workers: jumlah proses ekstraksi (default: jumlah core CPU; 1 = tanpa process pool).
+    incremental: hanya proses kasus yang berubah sejak eksekusi terakhir (lihat update_incremental).
+    fmt: format case base, 'both' (Parquet + CSV), 'parquet' atau 'csv' (lihat case_store.py).
+    stream: bangun ulang dengan memori terbatas, ditulis per `batch_size` baris (lihat build_streaming);
+    bersama `incremental`, penulisan ulang case base juga dilakukan per chunk (lihat rewrite_streaming).
+    sqlite: bangun juga case store SQLite (case_db.py); jika sudah ada, database selalu dibangun ulang
+    agar tidak tertinggal dari case base.
+    """
+    report_peak_rss("awal")
+    workers = workers or os.cpu_count() or 1
+    settings = {"raw_store": raw_store_kind, "dedup": dedup, "dedup_threshold": dedup_threshold, "format": fmt,
+                "columns": CASE_COLUMNS} # Kolom baru di case base memaksa pembangunan ulang penuh
+    state = RepresentationState()
+    if incremental and not (state.is_compatible(settings) and cases_exist()):
+        print("[!] Status representasi tidak ada atau dibuat dengan pengaturan lain; membangun ulang seluruhnya.")
+        incremental = False
+
+    with open_raw_store(raw_store_kind, DATA_RAW_DIR if raw_store_kind == "txt" else None) as raw_store:
+        if incremental:
+            entries, signatures = update_incremental(raw_store, state, dedup, dedup_threshold, workers, chunk_size, fmt,
+                                                     stream, batch_size)
+        elif stream:
+            written, entries, signatures = build_streaming(raw_store, dedup, dedup_threshold, workers, chunk_size,
+                                                           batch_size, fmt)
+            if written is None:
+                print(f"Peringatan: Tidak ada kasus ditemukan di raw store '{raw_store_kind}'. Pastikan Tahap 1 sudah dijalankan.")
+                return
+            print(f"[✓] Representasi kasus berhasil disimpan ke: {', '.join(written)}")
+        else:
+            df_cases, entries, signatures = build_full(raw_store, dedup, dedup_threshold, workers, chunk_size)
+            if df_cases is None:
+                print(f"Peringatan: Tidak ada kasus ditemukan di raw store '{raw_store_kind}'. Pastikan Tahap 1 sudah dijalankan.")
+                return
+            written = write_cases(df_cases, fmt)
+            print(f"[✓] Representasi kasus berhasil disimpan ke: {', '.join(written)}")
 
-    df_cases.to_csv(CASES_CSV_PATH, index=False)
-    print(f"[✓] Representasi kasus berhasil disimpan ke: {CASES_CSV_PATH}")
+    state.save(settings, entries)
+    if signatures is not None and dedup != "off":
+        state.save_signatures(signatures, SIGNATURE_PARAMS)
+    if sqlite or os.path.exists(CASE_DB_PATH):
+        build_case_db()
+    report_peak_rss("akhir")
 
 if __name__ == "__main__":
-    create_case_representation()
+    parser = argparse.ArgumentParser(description="Tahap 2: representasi kasus.")
+    parser.add_argument("--raw-store", choices=RAW_STORE_KINDS, default="txt",
+                        help="Sumber teks mentah: txt = data/raw/*.txt; shards = data/raw_store")
+    parser.add_argument("--dedup", choices=["off", "flag", "collapse"], default="flag",
+                        help="Deteksi near-duplicate MinHash/LSH: flag = isi kolom duplicate_of; collapse = buang duplikat")
+    parser.add_argument("--dedup-threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Ambang estimasi Jaccard untuk dianggap near-duplicate")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="Jumlah proses ekstraksi metadata (default: jumlah core CPU; 1 = satu proses)")
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE,
+                        help="Jumlah kasus per tugas yang dikirim ke satu proses worker")
+    parser.add_argument("--incremental", action="store_true",
+                        help="Hanya ekstrak kasus baru/berubah dan buang kasus yang dihapus (berdasarkan hash konten)")
+    parser.add_argument("--format", choices=CASE_STORE_FORMATS, default="both",
+                        help="Format case base: both = Parquet (kolumnar) + CSV; parquet; csv")
+    parser.add_argument("--stream", action="store_true",
+                        help="Bangun ulang (atau tulis ulang pada --incremental) secara streaming dengan memori terbatas")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE,
+                        help="Jumlah baris per batch yang ditulis pada mode --stream")
+    parser.add_argument("--sqlite", action="store_true",
+                        help="Bangun juga case store SQLite berindeks + FTS5 (data/processed/cases.sqlite)")
+    args = parser.parse_args()
+    create_case_representation(args.raw_store, args.dedup, args.dedup_threshold, args.workers, args.chunk_size,
+                               args.incremental, args.format, args.stream, args.batch_size, args.sqlite)
@@ -2,104 +2,317 @@
 
 import os
 import pandas as pd
-from sklearn.metrics.pairwise import cosine_similarity
 import json
+import time
 import numpy as np
-import re # Tambahkan untuk fungsi clean_text di sini juga
 
-from transformers import AutoTokenizer, AutoModel
-import torch
+from text_normalizer import normalize, normalize_many
+from case_store import iter_cases, load_cases
+from bert_encoder import BertEncoder
+from embedding_cache import EmbeddingCache, encode_cached
+from ann_index import IVF_NPROBE, ExactIndex, load_or_build_ivf
 
 # Direktori dan file
 DATA_PROCESSED_DIR = "../data/processed"
 DATA_EVAL_DIR = "../data/eval"
 CASES_CSV_PATH = os.path.join(DATA_PROCESSED_DIR, "cases.csv")
+CASES_PARQUET_DIR = os.path.join(DATA_PROCESSED_DIR, "cases.parquet")
+# Kolom yang dipakai Tahap 3; kolom lain tidak dimuat
+CASE_COLUMNS = ['case_id', 'text_full', 'solusi', 'ringkasan_fakta', 'duplicate_of']
 QUERIES_JSON_PATH = os.path.join(DATA_EVAL_DIR, "queries.json")
+# Cache embedding persisten (lihat embedding_cache.py): hanya kasus baru/berubah yang di-encode ulang
+EMBEDDING_CACHE_DIR = os.path.join(DATA_PROCESSED_DIR, "embeddings")
+# Indeks untuk retrieve(): None = skor terhadap semua vektor kasus (exact); "ivf" = indeks IVF
+# (lihat ann_index.py) yang hanya memeriksa IVF_NPROBE list terdekat. Indeks IVF dibangun sekali dan
+# disimpan di ANN_INDEX_DIR; indeks dibangun ulang otomatis jika vektor kasus berubah.
+RETRIEVAL_INDEX = None
+ANN_INDEX_DIR = os.path.join(DATA_PROCESSED_DIR, "ann_index")
+# Mode out-of-core: None = seluruh case base (termasuk text_full) dimuat ke df_cases; angka = case base
+# dibaca per chunk berisi sekian baris (case_store.iter_cases) dan df_cases hanya berisi case_id.
+# Hasil embedding, retrieval, dan query uji sama pada kedua mode.
+CASE_CHUNK_ROWS = None
 
-# Pastikan direktori output ada
-os.makedirs(DATA_EVAL_DIR, exist_ok=True)
-
-# Muat data kasus dari CSV yang dihasilkan Tahap 2
-try:
-    df_cases = pd.read_csv(CASES_CSV_PATH)
+def filter_cases(df_cases):
+    """Membuang kasus yang tidak di-embed; dipakai untuk seluruh case base maupun per chunk."""
     # Pastikan kolom 'text_full' ada dan tidak kosong
     df_cases['text_full'] = df_cases['text_full'].fillna('')
     # Hilangkan baris di mana 'text_full' kosong setelah fillna
     df_cases = df_cases[df_cases['text_full'].str.strip() != '']
-    if df_cases.empty:
-        raise ValueError("DataFrame kasus kosong atau kolom 'text_full' kosong setelah pemrosesan.")
-    print(f"[✓] {len(df_cases)} kasus dimuat dari {CASES_CSV_PATH}")
-except FileNotFoundError:
-    print(f"Error: File {CASES_CSV_PATH} tidak ditemukan. Pastikan Tahap 2 sudah dijalankan.")
-    exit()
-except ValueError as e:
-    print(f"Error: {e}. Tidak ada data kasus yang valid untuk diproses.")
-    exit()
-
-# --- Implementasi BERT Embedding ---
-tokenizer_bert = None
-model_bert = None
+    # Near-duplicate yang ditandai Tahap 2 tidak perlu di-embed; cukup salinan kanoniknya
+    if 'duplicate_of' in df_cases.columns:
+        df_cases = df_cases[df_cases['duplicate_of'].isna()]
+    return df_cases
 
-def get_bert_embedding(text):
+# Fungsi pembersih teks yang konsisten dengan scraper: keduanya memakai text_normalizer.py
+def clean_text_for_query(text):
     """
-    Menghasilkan embedding BERT untuk teks yang diberikan.
-    Memuat model IndoBERT hanya sekali.
+    Membersihkan teks secara umum, konsisten dengan pembersihan dokumen kasus.
     """
-    global tokenizer_bert, model_bert
-    if tokenizer_bert is None:
-        print("[+] Memuat model IndoBERT untuk embedding (hanya sekali)...")
-        tokenizer_bert = AutoTokenizer.from_pretrained("indobenchmark/indobert-base-p1")
-        model_bert = AutoModel.from_pretrained("indobenchmark/indobert-base-p1")
-        model_bert.eval() 
-        print("[✓] Model IndoBERT dimuat.")
-    
-    inputs = tokenizer_bert(text, return_tensors="pt", truncation=True, padding=True, max_length=512)
-    with torch.no_grad():
-        outputs = model_bert(**inputs)
-    return outputs.last_hidden_state[:, 0, :].squeeze().numpy()
+    return normalize(text)
 
-# Fungsi pembersih teks yang konsisten dengan scraper (dari 02_representation atau scraper asli)
-def clean_text_for_query(text):
+
+class RetrievalEngine:
     """
-    Membersihkan teks secara umum, konsisten dengan pembersihan dokumen kasus.
+    Case base, model IndoBERT, dan matriks embedding Tahap 3. Membuat engine tidak memuat apa pun;
+    setiap bagian dimuat saat pertama dipakai, jadi alat yang hanya butuh metadata kasus atau vektor
+    dari cache embedding tidak ikut memuat model. warm_up() memuat semuanya di awal, close() melepasnya,
+    dan `timings` mencatat lama setiap tahap pemuatan (lihat startup_report()).
+    Kegagalan memuat case base memunculkan FileNotFoundError/ValueError, bukan menghentikan program.
+    """
+
+    def __init__(self, csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR, chunk_rows=CASE_CHUNK_ROWS,
+                 cache_dir=EMBEDDING_CACHE_DIR, encoder=None, index=RETRIEVAL_INDEX, index_dir=ANN_INDEX_DIR,
+                 nprobe=IVF_NPROBE):
+        if index not in (None, 'ivf'):
+            raise ValueError("Indeks retrieval tidak dikenal. Gunakan None atau 'ivf'.")
+        self.csv_path = csv_path
+        self.parquet_dir = parquet_dir
+        self.chunk_rows = chunk_rows
+        self.cache_dir = cache_dir
+        self.index = index
+        self.index_dir = index_dir
+        self.nprobe = nprobe
+        # Encoder ber-batch (lihat bert_encoder.py); model IndoBERT dimuat sekali saat pertama dipakai
+        self.encoder = encoder or BertEncoder()
+        self.timings = {} # tahap -> detik
+        self._df_cases = None
+        self._embedding_cache = None
+        self._case_vectors = None
+        self._exact_index = None
+        self._ann_index = None
+
+    def iter_case_chunks(self, columns=CASE_COLUMNS):
+        """
+        Chunk case base (mode out-of-core) yang sudah difilter, dengan urutan yang sama seperti df_cases.
+        Chunk yang kosong setelah difilter dilewati.
+        """
+        columns = list(dict.fromkeys(['case_id', 'text_full', 'duplicate_of', *columns])) # Kolom filter selalu dibaca
+        for chunk in iter_cases(columns, self.chunk_rows, csv_path=self.csv_path, parquet_dir=self.parquet_dir):
+            chunk = filter_cases(chunk)
+            if len(chunk):
+                yield chunk
+
+    @property
+    def df_cases(self):
+        """
+        Kasus yang di-embed, urut sesuai baris case_vectors. Mode out-of-core (chunk_rows) hanya
+        menyimpan case_id; selain itu seluruh CASE_COLUMNS.
+        """
+        if self._df_cases is None:
+            start = time.perf_counter()
+            # Muat data kasus yang dihasilkan Tahap 2 (Parquet jika ada, selain itu CSV)
+            if self.chunk_rows:
+                chunks = [chunk[['case_id']] for chunk in self.iter_case_chunks(['case_id'])]
+                df_cases = pd.concat(chunks, ignore_index=True) if chunks else pd.DataFrame()
+            else:
+                df_cases = filter_cases(load_cases(CASE_COLUMNS, self.csv_path, self.parquet_dir))
+            if df_cases.empty:
+                raise ValueError("DataFrame kasus kosong atau kolom 'text_full' kosong setelah pemrosesan.")
+            self._df_cases = df_cases
+            self.timings['case_base'] = time.perf_counter() - start
+            print(f"[✓] {len(df_cases)} kasus dimuat dari {os.path.dirname(self.csv_path)}")
+        return self._df_cases
+
+    @property
+    def embedding_cache(self):
+        """Cache embedding persisten (lihat embedding_cache.py) untuk model encoder ini."""
+        if self._embedding_cache is None:
+            start = time.perf_counter()
+            self._embedding_cache = EmbeddingCache(self.cache_dir, self.encoder.model_name, self.encoder.max_length)
+            self.timings['embedding_cache'] = time.perf_counter() - start
+        return self._embedding_cache
+
+    @property
+    def case_vectors(self):
+        """Matriks embedding float32 seluruh kasus (satu baris per baris df_cases)."""
+        if self._case_vectors is None:
+            df_cases, cache = self.df_cases, self.embedding_cache
+            print("[+] Menghitung BERT embeddings untuk semua kasus...")
+            start, model_loaded = time.perf_counter(), self.encoder.model is not None
+            # Teks dinormalisasi sekaligus satu kolom seperti query; hanya teks yang belum ada di
+            # cache embedding yang di-encode (ber-batch, urut panjang, padding dinamis)
+            if self.chunk_rows:
+                # Out-of-core: hanya teks satu chunk yang berada di memori; yang disimpan hanya vektornya
+                self._case_vectors = np.concatenate([encode_cached(self.encoder, normalize_many(chunk['text_full']), cache)
+                                                     for chunk in self.iter_case_chunks(['text_full'])])
+            else:
+                self._case_vectors = encode_cached(self.encoder, normalize_many(df_cases['text_full']), cache)
+            elapsed = time.perf_counter() - start
+            if not model_loaded and self.encoder.model is not None: # Model dimuat untuk teks yang belum di-cache
+                self.timings['model'] = self.encoder.load_seconds
+                elapsed -= self.encoder.load_seconds
+            self.timings['case_vectors'] = elapsed
+            print(f"[✓] BERT Embeddings siap. Dimensi vektor: {self._case_vectors.shape}")
+            print(f"[=] Cache embedding: {cache.hits} teks dari cache, {cache.misses} teks di-encode")
+        return self._case_vectors
+
+    @property
+    def exact_index(self):
+        """Matriks vektor kasus yang sudah dinormalisasi (float32) untuk pencarian exact."""
+        if self._exact_index is None:
+            self._exact_index = ExactIndex().build(self.case_vectors)
+        return self._exact_index
+
+    @property
+    def ann_index(self):
+        """Indeks IVF atas case_vectors (None jika engine memakai pencarian exact)."""
+        if self._ann_index is None and self.index == 'ivf':
+            vectors = self.case_vectors
+            start = time.perf_counter()
+            self._ann_index = load_or_build_ivf(vectors, self.index_dir, self.nprobe)
+            self.timings['ann_index'] = time.perf_counter() - start
+        return self._ann_index
+
+    def load_model(self):
+        """Encoder dengan model IndoBERT yang sudah dimuat."""
+        if self.encoder.model is None:
+            self.encoder.load()
+            self.timings['model'] = self.encoder.load_seconds
+        return self.encoder
+
+    def warm_up(self, model=True):
+        """Memuat case base, vektor kasus, indeks, dan (jika `model`) model IndoBERT untuk query sekarang juga."""
+        if self.ann_index is None:
+            self.exact_index
+        if model:
+            self.load_model()
+        return self
+
+    def startup_report(self):
+        names = {'case_base': 'case base', 'embedding_cache': 'cache embedding', 'case_vectors': 'vektor kasus',
+                 'ann_index': 'indeks IVF', 'model': 'model IndoBERT'}
+        parts = ", ".join(f"{names[stage]} {seconds:.2f}" for stage, seconds in self.timings.items())
+        print(f"[=] Waktu muat Tahap 3 (detik): {parts or '-'}; total {sum(self.timings.values()):.2f}")
+
+    def close(self):
+        """Melepas case base, vektor, dan model; jika engine dipakai lagi, semuanya dimuat ulang."""
+        if self._embedding_cache is not None:
+            self._embedding_cache.close()
+        self._df_cases = self._embedding_cache = self._case_vectors = self._exact_index = self._ann_index = None
+        self.encoder.close()
+        self.timings = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def embed_query(self, text):
+        """Embedding BERT (vektor float32) untuk satu teks, misalnya query."""
+        return self.load_model().encode_one(text)
+
+    def retrieve(self, query: str, k: int = 5, method: str = 'bert') -> tuple[list, list]:
+        """
+        Mengambil top-k kasus yang paling mirip dengan query menggunakan metode BERT embedding.
+        """
+        return self.retrieve_batch([query], k=k, method=method)[0]
+
+    def retrieve_batch(self, queries, k: int = 5, method: str = 'bert') -> list[tuple[list, list]]:
+        """
+        retrieve() untuk banyak query sekaligus: query di-encode ber-batch, skornya terhadap matriks
+        vektor kasus yang sudah dinormalisasi dihitung dengan satu perkalian matriks, dan top-k dipilih
+        dengan argpartition (tanpa mengurutkan seluruh skor). Dengan indeks IVF hanya kandidat dari
+        list terdekat yang diperiksa (hasil aproksimasi).
+
+        Returns:
+            list[tuple[list, list]]: (case_id top-k, skor kemiripan) per query, urut seperti `queries`.
+        """
+        if method != 'bert':
+            raise ValueError("Metode retrieval tidak dikenal. Harap gunakan 'bert'.")
+        # Pastikan query dibersihkan dengan cara yang sama seperti dokumen di case base
+        query_vectors = self.load_model().encode(normalize_many([str(query) for query in queries]))
+        index = self.exact_index if self.ann_index is None else self.ann_index
+        ids, scores = index.search(query_vectors, k)
+        case_ids = self.df_cases['case_id'].to_numpy()
+        results = []
+        for row_ids, row_scores in zip(ids, scores):
+            found = row_ids >= 0 # IVF: kandidat bisa kurang dari k
+            results.append((case_ids[row_ids[found]].tolist(), row_scores[found].tolist()))
+        return results
+
+    def sample_query_cases(self, n_samples):
+        """
+        Sampel kasus untuk query uji (random_state=42). Pada mode out-of-core, pass pertama hanya
+        mengumpulkan penanda has_specific_text per chunk dan sampel diambil atas posisi barisnya;
+        pandas memilih baris hanya berdasarkan jumlah baris dan random_state, jadi posisi yang terpilih
+        sama dengan mode biasa. Pass kedua mengambil baris-baris terpilih tersebut.
+        """
+        df_cases = self.df_cases
+        if not self.chunk_rows:
+            # Ambil sampel kasus yang memiliki solusi atau ringkasan fakta yang valid
+            # Preferensi: solusi, lalu ringkasan_fakta, lalu sebagian text_full
+            valid_sample_cases = df_cases[has_specific_text(df_cases)]
+            if len(valid_sample_cases) < n_samples:
+                print(f"Peringatan: Hanya {len(valid_sample_cases)} kasus dengan solusi/fakta valid. Mengambil dari semua kasus.")
+                return df_cases.sample(n=n_samples, random_state=42, replace=True) # Pakai replace jika < n_samples
+            return valid_sample_cases.sample(n=n_samples, random_state=42)
+
+        valid = np.concatenate([has_specific_text(chunk).to_numpy(dtype=bool) for chunk in self.iter_case_chunks()])
+        valid_positions = pd.Series(np.flatnonzero(valid))
+        if len(valid_positions) < n_samples:
+            print(f"Peringatan: Hanya {len(valid_positions)} kasus dengan solusi/fakta valid. Mengambil dari semua kasus.")
+            positions = pd.Series(np.arange(len(valid))).sample(n=n_samples, random_state=42, replace=True)
+        else:
+            positions = valid_positions.sample(n=n_samples, random_state=42)
+        rows, offset = {}, 0
+        for chunk in self.iter_case_chunks():
+            for position in positions[(positions >= offset) & (positions < offset + len(chunk))].unique():
+                rows[position] = chunk.iloc[position - offset]
+            offset += len(chunk)
+        return pd.DataFrame([rows[position] for position in positions])
+
+
+# Engine bawaan modul, dibuat saat pertama dibutuhkan. Nama lama modul (df_cases, case_vectors_bert,
+# bert_encoder, embedding_cache) tetap tersedia lewat __getattr__ modul (PEP 562) dan baru memuat
+# datanya saat diakses, sehingga `from _03_retrieval import retrieve` tidak memuat apa pun.
+_engine = None
+
+def get_engine():
+    global _engine
+    if _engine is None:
+        _engine = RetrievalEngine()
+    return _engine
+
+_LAZY_ATTRIBUTES = {
+    'df_cases': lambda engine: engine.df_cases,
+    'case_vectors_bert': lambda engine: engine.case_vectors,
+    'bert_encoder': lambda engine: engine.encoder,
+    'embedding_cache': lambda engine: engine.embedding_cache,
+}
+
+def __getattr__(name):
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name](get_engine())
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def get_bert_embedding(text):
     """
-    text = re.sub(r'\s+', ' ', text) # Normalisasi spasi
-    # Hapus karakter non-alfanumerik kecuali yang penting untuk teks hukum (.,:()–-)
-    # Sesuaikan dengan regex di scraper asli Anda jika berbeda
-    text = re.sub(r'[^\w\s.,:()–-]', '', text) 
-    text = text.strip().lower()
-    if text.endswith(';'):
-        text = text[:-1]
-    return text
-
-print("[+] Menghitung BERT embeddings untuk semua kasus...")
-# Memastikan semua teks adalah string dan mengisi NaN dengan string kosong
-# Pastikan juga teks sudah bersih sebelum di-embedding
-case_vectors_bert = np.array([get_bert_embedding(clean_text_for_query(str(text))) for text in df_cases['text_full']])
-print(f"[✓] BERT Embeddings siap. Dimensi vektor: {case_vectors_bert.shape}")
+    Menghasilkan embedding BERT (vektor float32) untuk satu teks, misalnya query.
+    Memuat model IndoBERT hanya sekali.
+    """
+    return get_engine().embed_query(text)
 
 def retrieve(query: str, k: int = 5, method: str = 'bert') -> tuple[list, list]:
     """
     Mengambil top-k kasus yang paling mirip dengan query menggunakan metode BERT embedding.
     """
-    # Pastikan query dibersihkan dengan cara yang sama seperti dokumen di case base
-    query = clean_text_for_query(str(query))
+    return get_engine().retrieve(query, k=k, method=method)
 
-    query_vector = None
-    if method == 'bert':
-        query_vector = get_bert_embedding(query).reshape(1, -1)
-        similarities = cosine_similarity(query_vector, case_vectors_bert).flatten()
-    else:
-        raise ValueError("Metode retrieval tidak dikenal. Harap gunakan 'bert'.")
+def retrieve_batch(queries, k: int = 5, method: str = 'bert') -> list[tuple[list, list]]:
+    """retrieve() untuk banyak query sekaligus (lihat RetrievalEngine.retrieve_batch)."""
+    return get_engine().retrieve_batch(queries, k=k, method=method)
 
-    top_k_indices = similarities.argsort()[-k:][::-1]
-    
-    top_k_case_ids = df_cases.iloc[top_k_indices]['case_id'].tolist()
-    top_k_similarities = similarities[top_k_indices].tolist()
+# --- Pengujian Awal: Menghasilkan Query Uji dan Ground Truth ---
+def has_specific_text(df_cases):
+    """Kasus yang memiliki solusi atau ringkasan fakta yang valid (bukan nilai default)."""
+    return ((df_cases['solusi'].str.strip() != "Solusi tidak dapat diekstraksi secara spesifik.") |
+            (df_cases['ringkasan_fakta'].str.strip() != "Ringkasan fakta tidak dapat diekstraksi secara spesifik."))
 
-    return top_k_case_ids, top_k_similarities
+def sample_query_cases(n_samples):
+    """Sampel kasus untuk query uji (lihat RetrievalEngine.sample_query_cases)."""
+    return get_engine().sample_query_cases(n_samples)
 
-# --- Pengujian Awal: Menghasilkan Query Uji dan Ground Truth ---
 def generate_dummy_queries(num_queries=10):
     """
     Menghasilkan query uji dummy dan ground-truth untuk evaluasi.
@@ -107,24 +320,13 @@ def generate_dummy_queries(num_queries=10):
     untuk memastikan relevansi.
     """
     queries_data = []
-    n_samples = min(num_queries, len(df_cases))
+    n_samples = min(num_queries, len(get_engine().df_cases))
     if n_samples == 0:
         print("Peringatan: Tidak cukup kasus untuk membuat query dummy.")
         return []
 
-    # Ambil sampel kasus yang memiliki solusi atau ringkasan fakta yang valid
-    # Preferensi: solusi, lalu ringkasan_fakta, lalu sebagian text_full
-    valid_sample_cases = df_cases[
-        (df_cases['solusi'].str.strip() != "Solusi tidak dapat diekstraksi secara spesifik.") |
-        (df_cases['ringkasan_fakta'].str.strip() != "Ringkasan fakta tidak dapat diekstraksi secara spesifik.")
-    ]
+    sample_cases = sample_query_cases(n_samples)
 
-    if len(valid_sample_cases) < n_samples:
-        print(f"Peringatan: Hanya {len(valid_sample_cases)} kasus dengan solusi/fakta valid. Mengambil dari semua kasus.")
-        sample_cases = df_cases.sample(n=n_samples, random_state=42, replace=True) # Pakai replace jika < n_samples
-    else:
-        sample_cases = valid_sample_cases.sample(n=n_samples, random_state=42)
-    
     for _, row in sample_cases.iterrows():
         query_text = ""
         if row['solusi'].strip() != "Solusi tidak dapat diekstraksi secara spesifik.":
@@ -146,12 +348,25 @@ def generate_dummy_queries(num_queries=10):
             "ground_truth_case_id": row['case_id'] 
         })
     
+    # Pastikan direktori output ada
+    os.makedirs(DATA_EVAL_DIR, exist_ok=True)
     with open(QUERIES_JSON_PATH, 'w', encoding='utf-8') as f:
         json.dump(queries_data, f, indent=4)
     print(f"[✓] Dummy queries ({len(queries_data)} buah) berhasil disimpan ke: {QUERIES_JSON_PATH}")
     return queries_data
 
 if __name__ == "__main__":
+    engine = get_engine()
+    try:
+        engine.warm_up()
+    except FileNotFoundError:
+        print(f"Error: File {CASES_CSV_PATH} tidak ditemukan. Pastikan Tahap 2 sudah dijalankan.")
+        exit()
+    except ValueError as e:
+        print(f"Error: {e}. Tidak ada data kasus yang valid untuk diproses.")
+        exit()
+    engine.startup_report()
+
     queries_for_testing = []
     if not os.path.exists(QUERIES_JSON_PATH):
         print(f"[!] File {QUERIES_JSON_PATH} tidak ditemukan. Menghasilkan dummy queries baru.")
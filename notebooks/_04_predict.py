@@ -7,6 +7,10 @@ from collections import Counter
 from scipy.stats import mode # Diperlukan untuk majority vote
 import sys
 
+from case_store import load_case_texts
+from case_db import CaseDB
+from outcome_fields import load_outcomes
+
 # Tambahkan path ke direktori induk untuk mengimpor retrieve dari 03_retrieval.py
 # Ini diperlukan karena 04_predict.py akan memanggil fungsi retrieve()
 # Pastikan jalur ini sesuai dengan struktur direktori Anda.
@@ -15,7 +19,7 @@ sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 # Menggunakan _03_retrieval untuk menghindari konflik penamaan dan menunjukkan ini adalah file dari proyek
 try:
-    from _03_retrieval import retrieve
+    from _03_retrieval import retrieve, retrieve_batch
 except ImportError:
     print("Error: Tidak dapat mengimpor fungsi 'retrieve' dari '03_retrieval.py'.")
     print("Pastikan '03_retrieval.py' ada dan tidak ada kesalahan impor/path.")
@@ -26,19 +30,27 @@ except ImportError:
 DATA_PROCESSED_DIR = "data/processed"
 DATA_RESULTS_DIR = "data/results"
 CASES_CSV_PATH = os.path.join(DATA_PROCESSED_DIR, "cases.csv")
+CASES_PARQUET_DIR = os.path.join(DATA_PROCESSED_DIR, "cases.parquet")
+CASES_DB_PATH = os.path.join(DATA_PROCESSED_DIR, "cases.sqlite")
 PREDICTIONS_CSV_PATH = os.path.join(DATA_RESULTS_DIR, "predictions.csv")
 
 # Pastikan direktori output ada
 os.makedirs(DATA_RESULTS_DIR, exist_ok=True)
 
-# Muat data kasus dari CSV untuk mengakses solusi
+# Muat solusi kasus sebagai mapping case_id -> solusi. Jika case store SQLite ada, setiap solusi
+# diambil dengan lookup berindeks saat dipakai (tidak ada yang dimuat di awal). Tanpa SQLite, dengan
+# case base Parquet hanya kunci blob yang dimuat; teks solusi diambil dari blob store saat dipakai.
 try:
-    df_cases = pd.read_csv(CASES_CSV_PATH)
-    # Pastikan kolom 'solusi' ada dan tidak kosong
-    df_cases['solusi'] = df_cases['solusi'].fillna('Solusi tidak tersedia.') 
-    if df_cases.empty:
+    if os.path.exists(CASES_DB_PATH):
+        case_solutions = CaseDB(CASES_DB_PATH).texts('solusi', 'Solusi tidak tersedia.')
+    else:
+        case_solutions = load_case_texts('solusi', 'Solusi tidak tersedia.', CASES_CSV_PATH, CASES_PARQUET_DIR)
+    if not case_solutions:
         raise ValueError("DataFrame kasus kosong atau kolom 'solusi' kosong.")
-    print(f"[✓] {len(df_cases)} kasus dimuat untuk reuse solusi.")
+    print(f"[✓] {len(case_solutions)} kasus dimuat untuk reuse solusi.")
+    # Field hasil putusan bertipe (jenis putusan, lama pidana, denda, barang bukti) sebagai array NumPy;
+    # hanya kolom numerik yang dibaca sehingga murah dimuat di awal
+    outcomes = load_outcomes(CASES_CSV_PATH, CASES_PARQUET_DIR)
 except FileNotFoundError:
     print(f"Error: File {CASES_CSV_PATH} tidak ditemukan. Pastikan Tahap 2 sudah dijalankan.")
     sys.exit(1) # Keluar jika file tidak ditemukan
@@ -46,9 +58,11 @@ except ValueError as e:
     print(f"Error: {e}. Tidak ada data kasus yang valid untuk diproses.")
     sys.exit(1)
 
-# Membuat dictionary solusi dari case_id
-case_solutions = dict(zip(df_cases['case_id'], df_cases['solusi']))
-print(f"[✓] {len(case_solutions)} solusi kasus tersedia.")
+def close_case_solutions():
+    """Melepas blob store atau koneksi SQLite di balik case_solutions (dict biasa tidak perlu ditutup)."""
+    close = getattr(case_solutions, 'close', None)
+    if close is not None:
+        close()
 
 def predict_outcome(query: str, k: int = 5, prediction_method: str = 'weighted_similarity') -> tuple[str, list]:
     """
@@ -62,11 +76,45 @@ def predict_outcome(query: str, k: int = 5, prediction_method: str = 'weighted_s
     Returns:
         tuple[str, list]: Prediksi solusi dan daftar case_id yang digunakan untuk prediksi.
     """
+    prediction = predict_outcome_details(query, k=k, prediction_method=prediction_method)
+    return prediction['predicted_solution'], prediction['case_ids']
+
+def predict_outcome_details(query: str, k: int = 5, prediction_method: str = 'weighted_similarity') -> dict:
+    """
+    Seperti predict_outcome, ditambah hasil putusan bertipe yang diagregasi dari top-k kasus
+    (dibobot skor kemiripan; lihat outcome_fields.OutcomeTable.aggregate). Retrieval hanya
+    dilakukan sekali untuk keduanya.
+
+    Returns:
+        dict: predicted_solution, case_ids, dan field hasil putusan (verdict_type, verdict_share,
+              prison_months, fine_amount, evidence_disposition, neighbours).
+    """
     # Dapatkan top-k kasus terjemirip dari fungsi retrieve
     top_k_ids, top_k_similarities = retrieve(query, k=k)
-    
+    return _prediction_details(top_k_ids, top_k_similarities, prediction_method)
+
+def predict_outcomes(queries, k: int = 5, prediction_method: str = 'weighted_similarity') -> list[dict]:
+    """
+    predict_outcome_details untuk banyak query sekaligus; retrieval-nya satu panggilan
+    retrieve_batch (encoding ber-batch dan satu perkalian matriks), cocok untuk evaluasi massal.
+    """
+    return [_prediction_details(top_k_ids, top_k_similarities, prediction_method)
+            for top_k_ids, top_k_similarities in retrieve_batch(queries, k=k)]
+
+def _prediction_details(top_k_ids, top_k_similarities, prediction_method):
+    prediction = {
+        'predicted_solution': _predict_solution(top_k_ids, top_k_similarities, prediction_method),
+        'case_ids': top_k_ids,
+    }
+    prediction.update(outcomes.aggregate(top_k_ids, top_k_similarities))
+    return prediction
+
+def _predict_solution(top_k_ids, top_k_similarities, prediction_method):
+    """Agregasi teks solusi top-k kasus (majority vote atau bobot kemiripan)."""
     if not top_k_ids:
-        return "Tidak ada kasus serupa yang ditemukan.", []
+        return "Tidak ada kasus serupa yang ditemukan."
+    if prediction_method not in ('majority_vote', 'weighted_similarity'):
+        raise ValueError("Metode prediksi tidak dikenal. Gunakan 'majority_vote' atau 'weighted_similarity'.")
 
     # Ambil solusi dari top-k kasus yang ditemukan
     solutions_from_top_k = []
@@ -109,10 +157,8 @@ def predict_outcome(query: str, k: int = 5, prediction_method: str = 'weighted_s
             predicted_solution = max(weighted_sums, key=weighted_sums.get)
         else:
             predicted_solution = "Tidak ada solusi valid untuk bobot kemiripan."
-    else:
-        raise ValueError("Metode prediksi tidak dikenal. Gunakan 'majority_vote' atau 'weighted_similarity'.")
-    
-    return predicted_solution, top_k_ids # Mengembalikan solusi dan case_id yang digunakan
+
+    return predicted_solution
 
 # --- Demo Manual ---
 def manual_demo():
@@ -130,15 +176,23 @@ def manual_demo():
     predictions_data = []
     for i, query in enumerate(new_queries):
         print(f"\nQuery Baru {i+1}: {query}")
-        predicted_solution, top_k_ids_used = predict_outcome(query, k=5, prediction_method='weighted_similarity')
-        
-        print(f"Solusi Prediksi: {predicted_solution}")
+        prediction = predict_outcome_details(query, k=5, prediction_method='weighted_similarity')
+        top_k_ids_used = prediction['case_ids']
+
+        print(f"Solusi Prediksi: {prediction['predicted_solution']}")
+        print(f"Jenis Putusan: {prediction['verdict_type']} ({prediction['verdict_share']:.0%} bobot), "
+              f"pidana penjara ±{prediction['prison_months']:.1f} bulan, "
+              f"barang bukti: {', '.join(prediction['evidence_disposition']) or '-'}")
         print(f"Top {len(top_k_ids_used)} Case IDs yang digunakan: {top_k_ids_used}")
-        
+
         predictions_data.append({
             "query_id": f"manual_q_{i+1}",
             "query_text": query,
-            "predicted_solution": predicted_solution,
+            "predicted_solution": prediction['predicted_solution'],
+            "predicted_verdict_type": prediction['verdict_type'],
+            "predicted_prison_months": prediction['prison_months'],
+            "predicted_fine_amount": prediction['fine_amount'],
+            "predicted_evidence_disposition": ", ".join(prediction['evidence_disposition']),
             "top_5_case_ids": ", ".join(top_k_ids_used) # Simpan dalam format string
         })
 
@@ -148,4 +202,7 @@ def manual_demo():
     print(f"\n[✓] Hasil prediksi manual disimpan ke: {PREDICTIONS_CSV_PATH}")
 
 if __name__ == "__main__":
-    manual_demo()
+    try:
+        manual_demo()
+    finally:
+        close_case_solutions()
@@ -13,10 +13,10 @@ import numpy as np
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 try:
-    from _03_retrieval import retrieve
-    # Mengimpor df_cases dari 03_retrieval untuk mendapatkan akses ke data asli
-    from _03_retrieval import df_cases as df_cases_from_retrieval 
-    from _04_predict import predict_outcome
+    # Evaluasi tidak memuat case base sendiri: akses ke kasus lewat retrieve(), sehingga mode
+    # out-of-core Tahap 3 (CASE_CHUNK_ROWS) juga berlaku di sini
+    from _03_retrieval import retrieve_batch
+    from _04_predict import close_case_solutions, predict_outcomes
 except ImportError:
     print("Error: Tidak dapat mengimpor fungsi yang dibutuhkan dari '03_retrieval.py' atau '04_predict.py'.")
     print("Pastikan kedua file tersebut ada dan tidak ada kesalahan impor/path.")
@@ -57,13 +57,13 @@ def eval_retrieval(queries_data: list, k: int = 5):
     # Untuk menyimpan detail retrieval untuk analisis kegagalan
     retrieval_details = []
 
-    for query_info in queries_data:
+    # Retrieval semua query sekaligus: encoding ber-batch dan satu perkalian matriks untuk skornya
+    retrieved = retrieve_batch([query_info['query_text'] for query_info in queries_data], k=k)
+
+    for query_info, (retrieved_ids, retrieved_scores) in zip(queries_data, retrieved):
         query_id = query_info['query_id']
         query_text = query_info['query_text']
         ground_truth_id = query_info['ground_truth_case_id']
-        
-        # Lakukan retrieval untuk query
-        retrieved_ids, retrieved_scores = retrieve(query_text, k=k)
 
         # Cek apakah ground_truth_id ada di hasil retrieval top-k
         is_relevant_retrieved = 1 if ground_truth_id in retrieved_ids else 0
@@ -96,10 +96,10 @@ def eval_retrieval(queries_data: list, k: int = 5):
             # Namun, untuk diagnosis akurat, sebaiknya panggil retrieve() dengan k yang mencakup semua kasus
             # atau hitung ulang kesamaan untuk GT. Untuk saat ini, kita akan mengabaikan skor GT jika tidak di top-k.
             # Alternatif yang lebih baik:
-            # from _03_retrieval import get_bert_embedding, case_vectors_bert, df_cases_from_retrieval
+            # from _03_retrieval import get_bert_embedding, case_vectors_bert, df_cases
             # query_vector = get_bert_embedding(query_text).reshape(1, -1)
             # all_similarities = cosine_similarity(query_vector, case_vectors_bert).flatten()
-            # gt_case_index = df_cases_from_retrieval[df_cases_from_retrieval['case_id'] == ground_truth_id].index
+            # gt_case_index = df_cases[df_cases['case_id'] == ground_truth_id].index
             # if not gt_case_index.empty:
             #     ground_truth_score = all_similarities[gt_case_index[0]]
             pass # Keep ground_truth_score as 0.0 if not found in top-k for simplicity of this immersive.
@@ -159,10 +159,12 @@ def eval_prediction(queries_data: list, k: int = 5):
         print("Tidak ada data query untuk dievaluasi prediksinya.")
         return pd.DataFrame()
 
-    for query_info in queries_data:
+    predictions = predict_outcomes([query_info['query_text'] for query_info in queries_data], k=k)
+
+    for query_info, prediction in zip(queries_data, predictions):
         query_text = query_info['query_text']
         
-        predicted_solution, top_k_ids_used = predict_outcome(query_text, k=k)
+        predicted_solution, top_k_ids_used = prediction['predicted_solution'], prediction['case_ids']
         
         # Tambahkan ground_truth_solution jika ada di queries.json
         ground_truth_solution = query_info.get('ground_truth_solution', 'N/A (Tidak ada GT)')
@@ -207,14 +209,15 @@ if __name__ == "__main__":
 
     # Evaluasi Prediksi (saat ini hanya logging karena tidak ada ground truth solusi)
     prediction_results_log = eval_prediction(queries_data, k=5)
+    close_case_solutions() # Solusi kasus tidak dipakai lagi setelah evaluasi prediksi
 
     print("\n[=] Analisis Kegagalan Model (Sederhana):")
     # Identifikasi query di mana ground truth tidak ditemukan di top-k retrieval
     failed_retrieval_queries = []
-    for query_info in queries_data:
+    retrieved = retrieve_batch([query_info['query_text'] for query_info in queries_data], k=5)
+    for query_info, (retrieved_ids, _) in zip(queries_data, retrieved):
         query_text = query_info['query_text']
         ground_truth_id = query_info['ground_truth_case_id']
-        retrieved_ids, _ = retrieve(query_text, k=5)
         if ground_truth_id not in retrieved_ids:
             failed_retrieval_queries.append({
                 "query_id": query_info['query_id'],
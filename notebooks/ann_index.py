@@ -0,0 +1,262 @@
+# ann_index.py
+# Indeks nearest-neighbour untuk retrieve() Tahap 3 atas vektor embedding (similarity kosinus).
+# IVFIndex (inverted file): vektor dikelompokkan dengan k-means sferis ke `nlist` list; query hanya
+# dibandingkan dengan isi `nprobe` list yang centroid-nya paling mirip, sehingga biaya per query
+# sebanding dengan N * nprobe / nlist, bukan N. ExactIndex membandingkan dengan semua vektor dan
+# menjadi pembanding recall@k.
+#
+#   python ann_index.py report                    -> recall@k dan latensi IVF vs exact atas vektor case base
+#   python ann_index.py report --synthetic 200000 -> sama, atas vektor sintetis berkelompok
+
+import argparse
+import hashlib
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+
+IVF_NPROBE = 8 # Jumlah list yang diperiksa per query: naikkan untuk recall lebih tinggi, turunkan untuk latensi
+KMEANS_ITERATIONS = 10
+KMEANS_POINTS_PER_LIST = 64 # Ukuran sampel pelatihan k-means per list
+SEARCH_CHUNK_ROWS = 4096 # Baris per blok perkalian matriks saat menghitung skor terhadap banyak vektor
+SCORE_BLOCK_ELEMENTS = 1 << 24 # Ukuran maksimum satu blok skor query x vektor pada ExactIndex (64 MiB float32)
+
+
+def normalize_rows(vectors):
+    """Vektor float32 kontigu dengan norma 1 per baris (baris nol tetap nol)."""
+    vectors = np.array(vectors, dtype=np.float32, ndmin=2)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    np.divide(vectors, norms, out=vectors, where=norms > 0)
+    return vectors
+
+def vectors_fingerprint(vectors):
+    """Hash isi matriks vektor; indeks yang disimpan hanya dipakai ulang jika vektornya sama."""
+    vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(str(vectors.shape).encode("ascii"))
+    digest.update(memoryview(vectors).cast("B"))
+    return digest.hexdigest()
+
+def top_k(scores, k):
+    """Indeks k skor terbesar per baris, terurut menurun (argpartition lalu sort k elemen saja)."""
+    k = min(k, scores.shape[1])
+    if k == 0:
+        return np.empty((scores.shape[0], 0), dtype=np.int64)
+    part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    order = np.argsort(-np.take_along_axis(scores, part, axis=1), axis=1, kind="stable")
+    return np.take_along_axis(part, order, axis=1)
+
+
+class ExactIndex:
+    """
+    Pencarian exact: vektor dinormalisasi sekali saat build, sehingga skor kosinus sekumpulan query
+    adalah satu perkalian matriks (BLAS) per blok query; top-k dipilih dengan argpartition.
+    """
+
+    kind = "exact"
+
+    def __init__(self):
+        self.vectors = None
+
+    def build(self, vectors):
+        self.vectors = normalize_rows(vectors)
+        return self
+
+    def __len__(self):
+        return 0 if self.vectors is None else len(self.vectors)
+
+    def search(self, queries, k):
+        """
+        (ids, skor) berukuran (jumlah query, k) untuk query 1-D atau 2-D; ids adalah posisi baris
+        vektor saat build, urut skor menurun.
+        """
+        queries = normalize_rows(queries)
+        ids = np.empty((len(queries), min(k, len(self))), dtype=np.int64)
+        scores = np.empty(ids.shape, dtype=np.float32)
+        block_rows = max(1, SCORE_BLOCK_ELEMENTS // max(len(self), 1))
+        for start in range(0, len(queries), block_rows):
+            block = queries[start:start + block_rows] @ self.vectors.T
+            best = top_k(block, k)
+            ids[start:start + len(block)] = best
+            scores[start:start + len(block)] = np.take_along_axis(block, best, axis=1)
+        return ids, scores
+
+
+class IVFIndex:
+    """
+    Inverted file index atas vektor ternormalisasi. Vektor disimpan terurut per list (`vectors`,
+    dengan posisi aslinya di `ids` dan batas list di `offsets`) agar isi satu list dibaca berurutan.
+    build() melatih centroid dengan k-means sferis pada sampel vektor; save()/load() memakai
+    direktori berisi file .npy yang dibuka dengan memory map.
+    """
+
+    kind = "ivf"
+
+    def __init__(self, nlist=None, nprobe=IVF_NPROBE, seed=0):
+        self.nlist = nlist
+        self.nprobe = nprobe
+        self.seed = seed
+        self.centroids = self.vectors = self.ids = self.offsets = None
+        self.fingerprint = None
+
+    def __len__(self):
+        return 0 if self.ids is None else len(self.ids)
+
+    @staticmethod
+    def default_nlist(rows):
+        """±4 * akar(N) list, tetapi minimal 39 vektor per list agar centroid terlatih (case base kecil: 1 list = exact)."""
+        return max(1, min(int(4 * np.sqrt(rows)), rows // 39))
+
+    def _assign(self, vectors):
+        """List (centroid paling mirip) untuk setiap vektor, dihitung per blok."""
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), SEARCH_CHUNK_ROWS):
+            assignment[start:start + SEARCH_CHUNK_ROWS] = np.argmax(
+                vectors[start:start + SEARCH_CHUNK_ROWS] @ self.centroids.T, axis=1)
+        return assignment
+
+    def _train(self, vectors, rng):
+        sample_rows = min(len(vectors), self.nlist * KMEANS_POINTS_PER_LIST)
+        sample = vectors[np.sort(rng.choice(len(vectors), sample_rows, replace=False))]
+        self.centroids = sample[rng.choice(sample_rows, self.nlist, replace=False)].copy()
+        for _ in range(KMEANS_ITERATIONS):
+            assignment = self._assign(sample)
+            order = np.argsort(assignment, kind="stable")
+            counts = np.bincount(assignment, minlength=self.nlist)
+            filled = np.flatnonzero(counts)
+            sums = np.add.reduceat(sample[order], np.concatenate(([0], np.cumsum(counts)[:-1]))[filled], axis=0)
+            self.centroids[filled] = normalize_rows(sums)
+            empty = np.flatnonzero(counts == 0)
+            if len(empty): # List kosong diisi ulang dengan vektor sampel acak
+                self.centroids[empty] = sample[rng.choice(sample_rows, len(empty), replace=False)]
+
+    def build(self, vectors):
+        vectors = normalize_rows(vectors)
+        self.fingerprint = vectors_fingerprint(vectors)
+        self.nlist = min(self.nlist or self.default_nlist(len(vectors)), len(vectors))
+        self._train(vectors, np.random.default_rng(self.seed))
+        assignment = self._assign(vectors)
+        self.ids = np.argsort(assignment, kind="stable")
+        self.vectors = vectors[self.ids]
+        self.offsets = np.concatenate(([0], np.cumsum(np.bincount(assignment, minlength=self.nlist))))
+        return self
+
+    def search(self, queries, k, nprobe=None):
+        """
+        (ids, skor) berukuran (jumlah query, k) seperti ExactIndex.search, tetapi hanya atas isi
+        `nprobe` list terdekat. Jika kandidatnya kurang dari k, sisa baris diisi id -1 dan skor -inf.
+        """
+        queries = normalize_rows(queries)
+        nprobe = min(nprobe or self.nprobe, self.nlist)
+        probes = top_k(queries @ self.centroids.T, nprobe)
+        ids = np.full((len(queries), k), -1, dtype=np.int64)
+        scores = np.full((len(queries), k), -np.inf, dtype=np.float32)
+        for row, query in enumerate(queries):
+            # Setiap list adalah potongan berurutan di `vectors`: skornya dihitung per potongan tanpa menyalin
+            spans = [(self.offsets[probe], self.offsets[probe + 1]) for probe in probes[row]]
+            candidate_scores = np.concatenate([self.vectors[start:end] @ query for start, end in spans])
+            positions = np.concatenate([np.arange(start, end) for start, end in spans])
+            best = top_k(candidate_scores[None, :], k)[0]
+            ids[row, :len(best)] = self.ids[positions[best]]
+            scores[row, :len(best)] = candidate_scores[best]
+        return ids, scores
+
+    def save(self, index_dir):
+        """Menulis indeks ke `index_dir` (ditulis ke direktori sementara lalu dipindahkan)."""
+        tmp_dir = index_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        os.makedirs(tmp_dir)
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            np.save(os.path.join(tmp_dir, f"{name}.npy"), getattr(self, name))
+        with open(os.path.join(tmp_dir, "meta.json"), "w", encoding="utf-8") as f:
+            json.dump({"kind": self.kind, "nlist": self.nlist, "nprobe": self.nprobe, "seed": self.seed,
+                       "fingerprint": self.fingerprint}, f)
+        shutil.rmtree(index_dir, ignore_errors=True)
+        os.replace(tmp_dir, index_dir)
+
+    @classmethod
+    def load(cls, index_dir, nprobe=None):
+        """Indeks dari save(); array dibuka dengan memory map. nprobe None = nilai saat disimpan."""
+        with open(os.path.join(index_dir, "meta.json"), "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        index = cls(meta["nlist"], nprobe or meta["nprobe"], meta["seed"])
+        index.fingerprint = meta["fingerprint"]
+        for name in ("centroids", "vectors", "ids", "offsets"):
+            setattr(index, name, np.load(os.path.join(index_dir, f"{name}.npy"), mmap_mode="r"))
+        return index
+
+def load_or_build_ivf(vectors, index_dir, nprobe=IVF_NPROBE):
+    """
+    IVFIndex untuk `vectors`: dimuat dari `index_dir` jika dibangun dari vektor yang sama,
+    selain itu dibangun dan disimpan ulang.
+    """
+    if os.path.exists(os.path.join(index_dir, "meta.json")):
+        index = IVFIndex.load(index_dir, nprobe)
+        if index.fingerprint == vectors_fingerprint(normalize_rows(vectors)):
+            return index
+    print(f"[+] Membangun indeks IVF untuk {len(vectors)} vektor...")
+    index = IVFIndex(nprobe=nprobe).build(vectors)
+    index.save(index_dir)
+    return index
+
+
+def recall_report(vectors, k=10, queries=200, nprobes=(1, 2, 4, 8, 16, 32), nlist=None, seed=0):
+    """
+    recall@k IVF terhadap exact untuk setiap nprobe, beserta latensi per query. Query adalah vektor
+    case base yang diambil acak (leave-one-out: kasus itu sendiri dikeluarkan dari kedua hasil).
+    """
+    rng = np.random.default_rng(seed)
+    start = time.perf_counter()
+    ivf = IVFIndex(nlist).build(vectors)
+    build_time = time.perf_counter() - start
+    exact = ExactIndex().build(vectors)
+    rows = rng.choice(len(vectors), min(queries, len(vectors)), replace=False)
+    query_vectors = exact.vectors[rows]
+
+    def without_self(ids):
+        return [[i for i in found if i != row and i >= 0][:k] for row, found in zip(rows, ids)]
+
+    start = time.perf_counter()
+    truth = without_self(np.vstack([exact.search(query, k + 1)[0] for query in query_vectors]))
+    exact_ms = (time.perf_counter() - start) / len(rows) * 1000
+    print(f"[=] {len(vectors)} vektor x {vectors.shape[1]} dimensi, {len(rows)} query, k={k}; "
+          f"IVF nlist={ivf.nlist} dibangun dalam {build_time:.1f} detik")
+    print(f"    exact                 {exact_ms:8.2f} ms/query")
+    for nprobe in nprobes:
+        if nprobe > ivf.nlist:
+            break
+        start = time.perf_counter()
+        found = without_self(np.vstack([ivf.search(query, k + 1, nprobe)[0] for query in query_vectors]))
+        ivf_ms = (time.perf_counter() - start) / len(rows) * 1000
+        # Dibagi jumlah tetangga exact: probe yang menghasilkan kurang dari k kandidat menurunkan recall
+        recall = np.mean([len(set(a) & set(b)) / max(len(b), 1) for a, b in zip(found, truth)])
+        print(f"    IVF nprobe={nprobe:<4}      {ivf_ms:8.2f} ms/query, recall@{k} {recall:.3f}")
+
+def synthetic_vectors(rows, dim=768, seed=0):
+    """
+    Vektor sintetis berkelompok untuk menguji indeks pada skala besar: satu pusat acak per ±250
+    vektor plus derau yang cukup besar sehingga kelompok saling tumpang tindih.
+    """
+    rng = np.random.default_rng(seed)
+    centers = rng.standard_normal((max(1, rows // 250), dim), dtype=np.float32)
+    vectors = centers[rng.integers(0, len(centers), rows)]
+    vectors += 2.0 * rng.standard_normal((rows, dim), dtype=np.float32)
+    return vectors
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Indeks nearest-neighbour (IVF) untuk retrieval Tahap 3.")
+    parser.add_argument("action", choices=["report"], help="report = recall@k dan latensi IVF vs exact")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--nlist", type=int, default=None, help="Jumlah list (default ±4 * akar(N), lihat IVFIndex.default_nlist)")
+    parser.add_argument("--synthetic", type=int, default=0, help="Pakai N vektor sintetis, bukan vektor case base")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        case_vectors = synthetic_vectors(args.synthetic)
+    else:
+        from _03_retrieval import get_engine
+        case_vectors = get_engine().case_vectors # Dari cache embedding; model hanya dimuat untuk kasus baru
+    recall_report(case_vectors, args.k, args.queries, nlist=args.nlist)
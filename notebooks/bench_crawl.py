@@ -0,0 +1,207 @@
+# bench_crawl.py
+# Bench konkurensi dan politeness mode crawl async terhadap server stub lokal (tanpa jaringan).
+# Server stub mencatat setiap request dan bisa membalas 429 (terlalu banyak request bersamaan) atau
+# 503 (server "down"); dari catatan sisi server itu diperiksa bahwa HostRateLimiter, AdaptiveConcurrency
+# dan RetryBudget benar-benar membatasi request. Hasil crawl ditulis ke direktori sementara.
+#
+#   python bench_crawl.py                         -> semua skenario (rate, throttle, outage)
+#   python bench_crawl.py --scenario throttle --workers 8
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import re
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import _01_scraping as scraping
+from crawl_manifest import CrawlManifest
+from throttle import RetryBudget
+
+PER_PAGE = 5 # Putusan per halaman daftar stub
+
+
+def listing_html(page, pages):
+    items = "".join(f'<div class="entry-c"><strong><a href="/putusan/d{(page - 1) * PER_PAGE + k}.html">x</a></strong></div>'
+                    for k in range(PER_PAGE))
+    pagination = "".join(f'<a href="/kat/page/{p}.html">{p}</a>' for p in range(1, pages + 1))
+    return f"<html><body>{items}<ul class='pagination'>{pagination}</ul></body></html>"
+
+def detail_html(i):
+    body = " ".join(f"bahwa terdakwa kata{j} saksi" for j in range(60))
+    return (f'<html><body><div class="row"><div class="col-md-9"><p>MENGADILI: menyatakan terdakwa {i} bersalah '
+            f'pidana penjara selama 1 (satu) tahun</p><p>{body}</p></div><div class="col-md-3">'
+            f'<div id="popular-post-list-sidebar" class="box-content"><h2>Putusan nomor {i}</h2><table class="table">'
+            f'<tr><td>Nomor</td><td>{i}/pid.sus/2025</td></tr><tr><td>Tanggal Register</td><td>9 mei 2025</td></tr>'
+            f'</table></div></div></div></body></html>')
+
+
+class StubServer:
+    """
+    Server HTTP stub di thread latar: `pages` halaman daftar x PER_PAGE putusan. Request di atas
+    `max_in_flight` yang berjalan bersamaan dibalas 429; halaman detail dibalas `detail_status`.
+    Setiap request dicatat sebagai (waktu monotonic, path, status).
+    """
+
+    def __init__(self, pages=3, delay=0.02, max_in_flight=None, detail_status=200):
+        self.pages = pages
+        self.delay = delay
+        self.max_in_flight = max_in_flight
+        self.detail_status = detail_status
+        self.requests = []
+        self.in_flight = self.peak_in_flight = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+
+    @property
+    def category(self):
+        return f"http://127.0.0.1:{self._server.server_address[1]}/kat"
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                with stub._lock:
+                    stub.in_flight += 1
+                    stub.peak_in_flight = max(stub.peak_in_flight, stub.in_flight)
+                    over_limit = stub.max_in_flight is not None and stub.in_flight > stub.max_in_flight
+                try:
+                    status, body = (429, "slow down") if over_limit else stub.respond(self.path)
+                    time.sleep(stub.delay)
+                    data = body.encode("utf-8")
+                    self.send_response(status)
+                    self.send_header("Content-Length", str(len(data)))
+                    self.end_headers()
+                    self.wfile.write(data)
+                finally:
+                    with stub._lock:
+                        stub.in_flight -= 1
+                        stub.requests.append((time.monotonic(), self.path, status))
+
+        return Handler
+
+    def respond(self, path):
+        match = re.match(r"/kat(?:/page/(\d+))?\.html", path)
+        if match:
+            page = int(match.group(1) or 1)
+            return 200, listing_html(page, self.pages) if page <= self.pages else "<html></html>"
+        match = re.match(r"/putusan/d(\d+)\.html", path)
+        if match:
+            return self.detail_status, detail_html(int(match.group(1))) if self.detail_status == 200 else "unavailable"
+        return 404, "not found"
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+
+def run_crawl(category, workdir, workers, rate, adaptive=True):
+    """
+    crawl_async penuh terhadap `category` dengan raw store, manifest, log dan telemetri di `workdir`
+    (data/ tidak tersentuh). Mengembalikan (detik, jumlah putusan OK di manifest).
+    """
+    scraping.SAVE_DIR = os.path.join(workdir, "raw")
+    scraping.MANIFEST_FILE = os.path.join(scraping.SAVE_DIR, "manifest.jsonl")
+    scraping.LOG_FILE = os.path.join(workdir, "cleaning.log")
+    scraping.METRICS_FILE = os.path.join(workdir, "crawl_metrics.jsonl")
+    scraping._raw_store = scraping._metrics = None
+    os.makedirs(scraping.SAVE_DIR, exist_ok=True)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        asyncio.run(scraping.crawl_async([category], workers=workers, rate=rate, use_archive=False,
+                                         parse_workers=1, adaptive=adaptive))
+    elapsed = time.perf_counter() - start
+    with CrawlManifest(scraping.MANIFEST_FILE) as manifest:
+        ok = sum(entry["status"] == "OK" for entry in manifest.entries.values())
+    return elapsed, ok
+
+def check(passed, message):
+    print(f"    [{'✓' if passed else '!'}] {message}")
+    return passed
+
+def bench_rate(args):
+    """HostRateLimiter: laju request yang diterima server tidak melebihi --rate."""
+    with StubServer(args.pages, delay=0.005) as stub, tempfile.TemporaryDirectory() as workdir:
+        elapsed, ok = run_crawl(stub.category, workdir, args.workers, args.rate)
+    times = sorted(t for t, _, _ in stub.requests)
+    observed = (len(times) - 1) / (times[-1] - times[0]) if len(times) > 1 else 0.0
+    print(f"[=] rate: {len(times)} request dalam {elapsed:.1f} detik, {ok} putusan OK, "
+          f"laju teramati {observed:.1f} req/detik (batas {args.rate:g}), {args.workers} worker")
+    return all([
+        check(observed <= args.rate * 1.05, "laju request per host tidak melebihi --rate"),
+        check(ok == args.pages * PER_PAGE, "semua putusan tersimpan"),
+    ])
+
+def bench_throttle(args):
+    """AdaptiveConcurrency: server membalas 429 di atas --server-limit request bersamaan."""
+    results = {}
+    for adaptive in (True, False):
+        with StubServer(args.pages, delay=0.05, max_in_flight=args.server_limit) as stub, \
+                tempfile.TemporaryDirectory() as workdir:
+            elapsed, ok = run_crawl(stub.category, workdir, args.workers, rate=0, adaptive=adaptive)
+        throttled = sum(status == 429 for _, _, status in stub.requests)
+        results[adaptive] = (throttled, stub.peak_in_flight, ok)
+        print(f"[=] throttle ({'adaptif' if adaptive else 'tetap'}): {len(stub.requests)} request, {throttled} dibalas 429, "
+              f"puncak {stub.peak_in_flight} request bersamaan (server membatasi {args.server_limit}), "
+              f"{ok} putusan OK, {elapsed:.1f} detik")
+    return all([
+        check(max(peak for _, peak, _ in results.values()) <= args.workers,
+              "request bersamaan tidak pernah melebihi --workers"),
+        check(results[True][0] < results[False][0], "konkurensi adaptif memicu lebih sedikit 429 daripada konkurensi tetap"),
+        check(results[True][2] >= results[False][2], "konkurensi adaptif menyimpan putusan sebanyak konkurensi tetap"),
+    ])
+
+def bench_outage(args):
+    """RetryBudget: semua halaman detail dibalas 503, retry dibatasi anggaran, bukan MAX_RETRIES per URL."""
+    with StubServer(args.pages, detail_status=503) as stub, tempfile.TemporaryDirectory() as workdir:
+        elapsed, ok = run_crawl(stub.category, workdir, args.workers, rate=0)
+        with CrawlManifest(scraping.MANIFEST_FILE) as manifest:
+            done = sum(manifest.is_done(url) for url in manifest.entries)
+    paths = [path for _, path, _ in stub.requests]
+    retries = len(paths) - len(set(paths))
+    budget = RetryBudget()
+    limit = budget.balance + budget.ratio * len(set(paths)) # Anggaran awal + setoran per fetch
+    unbudgeted = scraping.MAX_RETRIES * args.pages * PER_PAGE
+    print(f"[=] outage: {len(paths)} request untuk {len(set(paths))} URL, {retries} retry "
+          f"(anggaran {limit:.1f}; tanpa anggaran hingga {unbudgeted}), {elapsed:.1f} detik")
+    return all([
+        check(retries <= limit, "jumlah retry tidak melebihi anggaran retry"),
+        check(ok == 0 and done == 0, "putusan yang gagal tidak ditandai selesai di manifest"),
+    ])
+
+SCENARIOS = {"rate": bench_rate, "throttle": bench_throttle, "outage": bench_outage}
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Bench konkurensi dan pembatasan laju crawl async terhadap server stub lokal.")
+    arg_parser.add_argument("--scenario", choices=["all", *SCENARIOS], default="all")
+    arg_parser.add_argument("--pages", type=int, default=3, help="Jumlah halaman daftar stub")
+    arg_parser.add_argument("--workers", type=int, default=8, help="Batas atas worker fetch")
+    arg_parser.add_argument("--rate", type=float, default=20.0, help="Batas laju (request/detik) pada skenario rate")
+    arg_parser.add_argument("--server-limit", type=int, default=2,
+                            help="Request bersamaan maksimum sebelum server stub membalas 429 (skenario throttle)")
+    args = arg_parser.parse_args()
+
+    names = list(SCENARIOS) if args.scenario == "all" else [args.scenario]
+    passed = [SCENARIOS[name](args) for name in names]
+    if not all(passed):
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
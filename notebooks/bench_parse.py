@@ -0,0 +1,77 @@
+# bench_parse.py
+# Micro-benchmark parsing halaman detail putusan dari arsip HTML lokal (data/archive).
+# Membandingkan parse penuh html.parser (jalur lama) dengan parsing parsial dan backend lxml.
+
+import argparse
+import statistics
+import time
+import tracemalloc
+
+from bs4 import FeatureNotFound
+
+from html_archive import HtmlArchive
+from _01_scraping import ARCHIVE_DIR, build_case_text
+
+# (label, parser, partial)
+VARIANTS = [
+    ("full html.parser", "html.parser", False),
+    ("partial html.parser", "html.parser", True),
+    ("full lxml", "lxml", False),
+    ("partial lxml", "lxml", True),
+]
+
+def load_pages(limit=None):
+    pages = []
+    with HtmlArchive(ARCHIVE_DIR) as archive:
+        for url, _, html in archive.iter_records():
+            if "/putusan/" in url:
+                pages.append(html)
+                if limit and len(pages) >= limit:
+                    break
+    return pages
+
+def bench_variant(pages, parser, partial):
+    """Mengembalikan (daftar waktu per halaman dalam ms, daftar puncak memori per halaman dalam KiB, hasil)."""
+    times, peaks, outputs = [], [], []
+    for html in pages:
+        start = time.perf_counter()
+        outputs.append(build_case_text(html, parser=parser, partial=partial)[0])
+        times.append((time.perf_counter() - start) * 1000)
+    # Memori diukur pada putaran terpisah karena tracemalloc memperlambat eksekusi
+    for html in pages:
+        tracemalloc.start()
+        build_case_text(html, parser=parser, partial=partial)
+        peaks.append(tracemalloc.get_traced_memory()[1] / 1024)
+        tracemalloc.stop()
+    return times, peaks, outputs
+
+def main():
+    arg_parser = argparse.ArgumentParser(description="Benchmark parsing halaman detail dari arsip HTML.")
+    arg_parser.add_argument("--limit", type=int, default=200, help="Jumlah maksimum halaman yang diuji (0 = semua)")
+    args = arg_parser.parse_args()
+
+    pages = load_pages(args.limit or None)
+    if not pages:
+        print(f"Peringatan: Tidak ada halaman detail di arsip {ARCHIVE_DIR}. Jalankan Tahap 1 dengan arsip aktif terlebih dahulu.")
+        return
+    avg_kib = sum(len(p) for p in pages) / len(pages) / 1024
+    print(f"[+] Benchmark parsing pada {len(pages)} halaman (rata-rata {avg_kib:.1f} KiB/halaman)\n")
+
+    baseline_outputs = None
+    baseline_mean = None
+    print(f"{'varian':<22}{'mean ms':>10}{'p50 ms':>10}{'peak KiB':>12}{'speedup':>10}  hasil")
+    for label, parser, partial in VARIANTS:
+        try:
+            times, peaks, outputs = bench_variant(pages, parser, partial)
+        except FeatureNotFound:
+            print(f"{label:<22}  (parser {parser} tidak terpasang, dilewati)")
+            continue
+        mean_ms = statistics.mean(times)
+        if baseline_outputs is None:
+            baseline_outputs, baseline_mean = outputs, mean_ms
+        same = sum(a == b for a, b in zip(outputs, baseline_outputs))
+        print(f"{label:<22}{mean_ms:>10.2f}{statistics.median(times):>10.2f}{statistics.mean(peaks):>12.0f}"
+              f"{baseline_mean / mean_ms:>9.2f}x  {same}/{len(pages)} identik")
+
+if __name__ == "__main__":
+    main()
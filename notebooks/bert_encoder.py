@@ -0,0 +1,125 @@
+# bert_encoder.py
+# Encoder IndoBERT ber-batch untuk Tahap 3. Teks ditokenisasi sekali, diurutkan berdasarkan jumlah token,
+# lalu dikelompokkan ke batch dengan padding dinamis (sepanjang teks terpanjang di batch saja); ukuran
+# batch ditentukan anggaran token. Hasilnya matriks float32 kontigu dengan urutan baris = urutan input.
+#
+#   python bert_encoder.py bench   -> satu dokumen per forward pass vs batch ber-bucket, beserta selisih embedding
+
+import argparse
+import time
+
+import numpy as np
+
+BERT_MODEL_NAME = "indobenchmark/indobert-base-p1"
+MAX_LENGTH = 512 # Token maksimum per teks (sisanya dipotong), sama seperti encoding per dokumen
+TOKENS_PER_BATCH = 2048 # Anggaran token per forward pass (jumlah teks x panjang terpanjang di batch)
+MAX_BATCH_SIZE = 64 # Batas jumlah teks per batch untuk teks yang sangat pendek
+
+
+class BertEncoder:
+    """
+    Embedding [CLS] dari lapisan terakhir IndoBERT. Model dan tokenizer dimuat sekali, saat
+    pertama kali dipakai. Karena attention mask menutup token padding dan padding ada di kanan,
+    embedding satu teks tidak bergantung pada batch-nya (sama dengan encoding per dokumen dalam
+    toleransi numerik float32).
+    """
+
+    def __init__(self, model_name=BERT_MODEL_NAME, max_length=MAX_LENGTH, tokens_per_batch=TOKENS_PER_BATCH,
+                 max_batch_size=MAX_BATCH_SIZE):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.tokens_per_batch = tokens_per_batch
+        self.max_batch_size = max_batch_size
+        self.tokenizer = None
+        self.model = None
+        self.load_seconds = 0.0 # Waktu impor + pemuatan model terakhir
+
+    def load(self):
+        if self.model is None:
+            # torch/transformers baru diimpor di sini: impornya saja butuh beberapa detik, dan tidak
+            # diperlukan jika semua embedding sudah ada di cache (lihat embedding_cache.py)
+            start = time.perf_counter()
+            from transformers import AutoModel, AutoTokenizer
+            print("[+] Memuat model IndoBERT untuk embedding (hanya sekali)...")
+            self.tokenizer = AutoTokenizer.from_pretrained(self.model_name)
+            self.model = AutoModel.from_pretrained(self.model_name)
+            self.model.eval()
+            self.load_seconds = time.perf_counter() - start
+            print("[✓] Model IndoBERT dimuat.")
+        return self
+
+    def close(self):
+        """Melepas model dan tokenizer; dimuat ulang jika encoder dipakai lagi."""
+        self.tokenizer = self.model = None
+
+    @property
+    def dim(self):
+        return self.load().model.config.hidden_size
+
+    def batches(self, lengths):
+        """
+        Indeks teks per batch. Teks diurutkan naik berdasarkan jumlah token sehingga teks terakhir
+        yang masuk selalu yang terpanjang; batch ditutup jika menambah satu teks lagi membuat
+        (jumlah teks x panjang terpanjang) melebihi tokens_per_batch, atau jumlahnya mencapai max_batch_size.
+        """
+        batch = []
+        for index in np.argsort(lengths, kind="stable"):
+            if batch and (len(batch) >= self.max_batch_size or (len(batch) + 1) * lengths[index] > self.tokens_per_batch):
+                yield batch
+                batch = []
+            batch.append(index)
+        if batch:
+            yield batch
+
+    def encode(self, texts):
+        """Embedding untuk daftar teks sebagai matriks float32 berukuran (len(texts), dim)."""
+        texts = list(texts)
+        vectors = np.empty((len(texts), self.dim), dtype=np.float32)
+        if not texts:
+            return vectors
+        encodings = self.tokenizer(texts, truncation=True, max_length=self.max_length)
+        lengths = np.fromiter(map(len, encodings["input_ids"]), dtype=np.int64, count=len(texts))
+        import torch
+        with torch.inference_mode():
+            for batch in self.batches(lengths):
+                features = self.tokenizer.pad({key: [encodings[key][i] for i in batch] for key in encodings.keys()},
+                                              return_tensors="pt")
+                outputs = self.model(**features)
+                vectors[batch] = outputs.last_hidden_state[:, 0, :].float().numpy()
+        return vectors
+
+    def encode_one(self, text):
+        """Embedding satu teks (vektor 1-D), misalnya query retrieval."""
+        return self.encode([text])[0]
+
+
+def bench(encoder, texts):
+    """Encoding per dokumen (batch 1, seperti Tahap 3 sebelumnya) vs encode() ber-bucket atas teks yang sama."""
+    encoder.load()
+    start = time.perf_counter()
+    single = np.stack([encoder.encode_one(text) for text in texts])
+    single_time = time.perf_counter() - start
+    start = time.perf_counter()
+    batched = encoder.encode(texts)
+    batched_time = time.perf_counter() - start
+    lengths = [len(ids) for ids in encoder.tokenizer(texts, truncation=True, max_length=encoder.max_length)["input_ids"]]
+    batches = list(encoder.batches(np.array(lengths)))
+    padded = sum(len(batch) * max(lengths[i] for i in batch) for batch in batches)
+    print(f"[=] {len(texts)} teks ({sum(lengths)} token, {len(batches)} batch, padding {padded / sum(lengths) - 1:.1%})")
+    print(f"    per dokumen {single_time:.2f} detik, ber-batch {batched_time:.2f} detik "
+          f"({single_time / batched_time:.1f}x)")
+    print(f"    selisih embedding maksimum {np.abs(single - batched).max():.2e}")
+
+if __name__ == "__main__":
+    from case_store import load_cases
+    from text_normalizer import normalize_many
+
+    parser = argparse.ArgumentParser(description="Encoder IndoBERT ber-batch untuk Tahap 3.")
+    parser.add_argument("action", choices=["bench"], help="bench = per dokumen vs batch ber-bucket")
+    parser.add_argument("--model", default=BERT_MODEL_NAME, help="Nama model Hugging Face atau direktori lokal")
+    parser.add_argument("--limit", type=int, default=200, help="Jumlah kasus yang di-encode")
+    parser.add_argument("--tokens-per-batch", type=int, default=TOKENS_PER_BATCH)
+    args = parser.parse_args()
+
+    df_cases = load_cases(['case_id', 'text_full']).head(args.limit)
+    bench(BertEncoder(args.model, tokens_per_batch=args.tokens_per_batch), normalize_many(df_cases['text_full'].fillna('')))
@@ -0,0 +1,197 @@
+# blob_store.py
+# Blob store berbasis konten (content-addressed) untuk teks panjang case base:
+# text_full, ringkasan_fakta, solusi, dan argumen_hukum_utama disimpan sekali per isi, tabel kasus hanya menyimpan kuncinya.
+#
+#   python blob_store.py stats   -> jumlah blob, ukuran terkompresi vs asli
+
+import argparse
+import hashlib
+import json
+import os
+import threading
+import zlib
+from collections.abc import Mapping
+
+PACK_SIZE_LIMIT = 64 * 1024 * 1024 # Ukuran maksimum satu pack sebelum pack baru dibuat (byte)
+
+
+def blob_key(text):
+    """Kunci blob: hash blake2b-128 (hex) dari teks UTF-8; teks yang sama selalu mendapat kunci yang sama."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+
+class BlobStore:
+    """
+    Blob disimpan di file `pack-NNNNN.bin`; setiap blob dikompresi zlib dan ditambahkan di akhir
+    pack (append-only). Indeks `index.jsonl` memetakan kunci -> (pack, offset, length).
+    Karena kunci adalah hash isi, put() atas teks yang sudah ada tidak menulis apa pun:
+    putusan yang identik (atau nilai default yang sama di banyak baris) hanya disimpan sekali.
+    """
+
+    def __init__(self, store_dir, pack_limit=PACK_SIZE_LIMIT):
+        self.store_dir = store_dir
+        self.pack_limit = pack_limit
+        self.index_path = os.path.join(store_dir, "index.jsonl")
+        self.index = {} # kunci -> (pack, offset, length)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue # Baris terakhir bisa terpotong jika penulisan terhenti
+                    self.index[entry["key"]] = (entry["pack"], entry["offset"], entry["length"])
+        self._drop_torn_entries()
+        self._pack_file = None
+        self._pack_number = None
+        self._index_file = None
+        self._readers = {} # pack -> file handle untuk dibaca
+        self._lock = threading.Lock()
+
+    def _drop_torn_entries(self):
+        """
+        Membuang entri indeks yang datanya melewati akhir pack (pack terpotong saat proses mati),
+        agar put() atas teks yang sama menulis ulang blobnya alih-alih mengembalikan kunci rusak.
+        """
+        pack_sizes = {}
+        for key, (pack, offset, length) in list(self.index.items()):
+            if pack not in pack_sizes:
+                path = self._pack_path(pack)
+                pack_sizes[pack] = os.path.getsize(path) if os.path.exists(path) else 0
+            if offset + length > pack_sizes[pack]:
+                del self.index[key]
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, key):
+        return key in self.index
+
+    def _pack_path(self, pack):
+        return os.path.join(self.store_dir, f"pack-{pack:05}.bin")
+
+    def _writable_pack(self):
+        if self._pack_file is None or self._pack_file.tell() >= self.pack_limit:
+            if self._pack_file is not None:
+                pack = self._pack_number + 1
+                self._pack_file.close()
+            else:
+                os.makedirs(self.store_dir, exist_ok=True)
+                existing = sorted(f for f in os.listdir(self.store_dir) if f.startswith("pack-"))
+                pack = int(existing[-1][len("pack-"):-len(".bin")]) if existing else 0
+                if existing and os.path.getsize(self._pack_path(pack)) >= self.pack_limit:
+                    pack += 1
+            self._pack_number = pack
+            self._pack_file = open(self._pack_path(pack), "ab")
+        return self._pack_number, self._pack_file
+
+    def put(self, text):
+        """Menyimpan teks (jika belum ada) dan mengembalikan kuncinya."""
+        key = blob_key(text)
+        with self._lock:
+            if key in self.index:
+                return key
+            record = zlib.compress(text.encode("utf-8"))
+            pack, pack_file = self._writable_pack()
+            offset = pack_file.tell()
+            pack_file.write(record)
+            # Data blob ditulis ke file sebelum baris indeksnya; pack yang tetap terpotong (OS crash)
+            # ditangani _drop_torn_entries saat store dibuka
+            pack_file.flush()
+            if self._index_file is None:
+                self._index_file = open(self.index_path, "a", encoding="utf-8")
+            self._index_file.write(json.dumps({"key": key, "pack": pack, "offset": offset, "length": len(record)}) + "\n")
+            self.index[key] = (pack, offset, len(record))
+        return key
+
+    def _read(self, pack, offset, length):
+        if self._pack_file is not None and pack == self._pack_number:
+            self._pack_file.flush()
+        handle = self._readers.get(pack)
+        if handle is None:
+            handle = self._readers[pack] = open(self._pack_path(pack), "rb")
+        handle.seek(offset)
+        return zlib.decompress(handle.read(length)).decode("utf-8")
+
+    def get(self, key):
+        return self._read(*self.index[key])
+
+    def get_many(self, keys):
+        """
+        Pembaca massal: teks untuk setiap kunci (None tetap None), sesuai urutan masukan.
+        Blob dibaca terurut menurut (pack, offset) agar akses disk sekuensial, dan setiap
+        kunci yang muncul berulang hanya didekompresi sekali.
+        """
+        unique = {key for key in keys if key is not None}
+        texts = {key: self._read(*self.index[key]) for key in sorted(unique, key=self.index.__getitem__)}
+        return [None if key is None else texts[key] for key in keys]
+
+    def stats(self):
+        """(jumlah blob, total byte terkompresi, total byte asli)."""
+        stored = sum(length for _, _, length in self.index.values())
+        raw = sum(len(self.get(key).encode("utf-8")) for key in self.index)
+        return len(self.index), stored, raw
+
+    def close(self):
+        # Satu fsync per file saat ditutup (pack lebih dulu), bukan per blob; pemanggil yang menulis
+        # ke direktori .tmp baru mengganti nama direktori setelah close()
+        for handle in (self._pack_file, self._index_file):
+            if handle is not None:
+                handle.flush()
+                os.fsync(handle.fileno())
+        for handle in (self._pack_file, self._index_file, *self._readers.values()):
+            if handle is not None:
+                handle.close()
+        self._pack_file = self._index_file = None
+        self._readers = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class LazyTexts(Mapping):
+    """
+    Mapping case_id -> teks yang mengambil blob hanya saat diakses (tanpa cache, sehingga memori
+    tidak tumbuh). Nilai kosong (kunci None) dikembalikan sebagai `fill`.
+    """
+
+    def __init__(self, refs, store, fill=None):
+        self._refs = refs # case_id -> kunci blob
+        self._store = store
+        self._fill = fill
+
+    def __getitem__(self, case_id):
+        key = self._refs[case_id]
+        return self._fill if key is None else self._store.get(key)
+
+    def __iter__(self):
+        return iter(self._refs)
+
+    def __len__(self):
+        return len(self._refs)
+
+    def close(self):
+        """Menutup file handle blob store (dibuka lagi jika mapping dipakai kembali)."""
+        self._store.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Blob store teks panjang case base Tahap 2.")
+    parser.add_argument("action", choices=["stats"], help="stats = jumlah blob dan rasio kompresi")
+    parser.add_argument("--store-dir", default="../data/processed/cases.parquet/_blobs")
+    args = parser.parse_args()
+
+    with BlobStore(args.store_dir) as store:
+        count, stored, raw = store.stats()
+        ratio = raw / stored if stored else 0
+        print(f"[=] {count} blob di {args.store_dir}: {stored / 1024 / 1024:.1f} MiB terkompresi, "
+              f"{raw / 1024 / 1024:.1f} MiB asli ({ratio:.1f}x)")
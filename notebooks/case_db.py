@@ -0,0 +1,258 @@
+# case_db.py
+# Case store SQLite opsional untuk lookup cepat tanpa memuat case base ke RAM:
+# indeks B-tree atas case_id, no_perkara, pasal, dan tanggal, serta indeks teks penuh FTS5 atas teks putusan.
+#
+#   python case_db.py build                              -> bangun data/processed/cases.sqlite dari case base Tahap 2
+#   python case_db.py get case_001                       -> lookup satu kasus
+#   python case_db.py search "senjata api tanpa izin"    -> pencarian kata kunci (peringkat BM25)
+#   python case_db.py no-perkara 101/pid.sus             -> lookup awalan nomor perkara (juga: pasal)
+#   python case_db.py tanggal 2025-05-01 2025-05-31      -> kasus dalam rentang tanggal putusan
+
+import argparse
+import os
+import re
+import sqlite3
+import time
+from collections.abc import Mapping
+
+from case_store import (CASE_COLUMNS, CASES_CSV_PATH, CASES_PARQUET_DIR, CHUNK_ROWS, DATA_PROCESSED_DIR, NUMERIC_COLUMNS,
+                        iter_cases)
+
+CASE_DB_PATH = os.path.join(DATA_PROCESSED_DIR, "cases.sqlite")
+# text_full diletakkan paling akhir: SQLite membaca kolom berurutan, sehingga lookup metadata
+# tidak perlu menyentuh halaman overflow teks putusan yang panjang.
+DB_COLUMNS = [col for col in CASE_COLUMNS if col != 'text_full'] + ['tanggal_iso', 'text_full']
+META_COLUMNS = [col for col in DB_COLUMNS if col != 'text_full']
+FTS_COLUMNS = ['judul_putusan_bersih', 'ringkasan_fakta', 'text_full']
+INDEXED_COLUMNS = ['no_perkara', 'pasal', 'tanggal_iso'] # case_id sudah terindeks sebagai PRIMARY KEY
+
+MONTHS = {'januari': 1, 'februari': 2, 'maret': 3, 'april': 4, 'mei': 5, 'juni': 6, 'juli': 7,
+          'agustus': 8, 'september': 9, 'oktober': 10, 'november': 11, 'desember': 12}
+DATE_PATTERN = re.compile(r'(\d{1,2})\s+(' + '|'.join(MONTHS) + r')\s+(\d{4})', re.IGNORECASE)
+# Kolom `tanggal` berisi tanggal register; tanggal putusan diambil dari tabel metadata di text_full
+DIBACAKAN_PATTERN = re.compile(r'tanggal dibacakan\s*:?\s*' + DATE_PATTERN.pattern, re.IGNORECASE)
+
+
+def parse_tanggal(tanggal):
+    """Tanggal pertama berformat '9 Mei 2025' di `tanggal` sebagai 'YYYY-MM-DD' (None jika tidak ada)."""
+    if not isinstance(tanggal, str):
+        return None
+    match = DATE_PATTERN.search(tanggal)
+    if not match:
+        return None
+    day, month, year = match.groups()
+    return f"{int(year):04}-{MONTHS[month.lower()]:02}-{int(day):02}"
+
+def parse_tanggal_putusan(text_full):
+    """Tanggal putusan ('tanggal dibacakan: 25 Juni 2025') di text_full sebagai 'YYYY-MM-DD' (None jika tidak ada)."""
+    if not isinstance(text_full, str):
+        return None
+    match = DIBACAKAN_PATTERN.search(text_full)
+    return parse_tanggal(match.group(0)) if match else None
+
+def _prefix_range(prefix):
+    """Batas [awal, akhir) untuk pencarian awalan yang memakai indeks B-tree (LIKE tidak memakai indeks)."""
+    return prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1)
+
+def _fts_query(text):
+    """Kata kunci bebas sebagai query FTS5: setiap kata dikutip sehingga tanda baca tidak dibaca sebagai operator."""
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+def _sql_type(col):
+    dtype = NUMERIC_COLUMNS.get(col)
+    if dtype is None:
+        return "TEXT"
+    return "REAL" if dtype.startswith("float") else "INTEGER"
+
+def _db_rows(df_cases):
+    df_cases = df_cases.reindex(columns=CASE_COLUMNS)
+    df_cases['tanggal_iso'] = df_cases['text_full'].map(parse_tanggal_putusan)
+    df_cases = df_cases[DB_COLUMNS].astype(object).where(df_cases[DB_COLUMNS].notna(), None)
+    return df_cases.itertuples(index=False, name=None)
+
+def build_case_db(db_path=CASE_DB_PATH, csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR,
+                  chunk_rows=CHUNK_ROWS):
+    """
+    Membangun ulang database SQLite dari case base Tahap 2, dibaca per chunk berisi `chunk_rows`
+    baris (iter_cases) sehingga case base tidak pernah dimuat seluruhnya. Ditulis ke file .tmp lalu
+    diganti secara atomik, sehingga pembaca tidak pernah melihat database setengah jadi.
+    Indeks B-tree dibuat setelah semua baris dimasukkan (lebih cepat daripada memperbaruinya per baris).
+    Memunculkan FileNotFoundError jika case base belum dibuat.
+    """
+    start = time.perf_counter()
+    rows = 0
+    tmp_path = db_path + ".tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+    conn = sqlite3.connect(tmp_path)
+    try:
+        conn.execute("PRAGMA journal_mode = OFF") # File .tmp dibuang jika pembangunan gagal
+        conn.execute("PRAGMA synchronous = OFF")
+        columns = ", ".join(f"{col} {_sql_type(col)}" for col in DB_COLUMNS[1:])
+        conn.execute(f"CREATE TABLE cases (case_id TEXT PRIMARY KEY, {columns})")
+        conn.execute(f"CREATE VIRTUAL TABLE cases_fts USING fts5({', '.join(FTS_COLUMNS)}, "
+                     "content='cases', content_rowid='rowid', tokenize='unicode61 remove_diacritics 2')")
+        insert = f"INSERT INTO cases ({', '.join(DB_COLUMNS)}) VALUES ({', '.join('?' * len(DB_COLUMNS))})"
+        for chunk in iter_cases(chunk_rows=chunk_rows, csv_path=csv_path, parquet_dir=parquet_dir):
+            conn.executemany(insert, _db_rows(chunk))
+            rows += len(chunk)
+        for col in INDEXED_COLUMNS:
+            conn.execute(f"CREATE INDEX idx_cases_{col} ON cases ({col})")
+        conn.execute(f"INSERT INTO cases_fts (rowid, {', '.join(FTS_COLUMNS)}) "
+                     f"SELECT rowid, {', '.join(FTS_COLUMNS)} FROM cases")
+        conn.execute("INSERT INTO cases_fts (cases_fts) VALUES ('optimize')")
+        conn.commit()
+    except BaseException:
+        conn.close()
+        os.remove(tmp_path)
+        raise
+    conn.close()
+    os.replace(tmp_path, db_path)
+    print(f"[✓] {rows} kasus ditulis ke {db_path} ({os.path.getsize(db_path) / 1024 / 1024:.1f} MiB) "
+          f"dalam {time.perf_counter() - start:.2f} detik")
+    return db_path
+
+
+class CaseTexts(Mapping):
+    """Mapping case_id -> nilai satu kolom teks; setiap akses adalah satu lookup PRIMARY KEY."""
+
+    def __init__(self, db, column, fill=None):
+        self._db = db
+        self._column = column
+        self._fill = fill
+
+    def __getitem__(self, case_id):
+        row = self._db.conn.execute(f"SELECT {self._column} FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+        if row is None:
+            raise KeyError(case_id)
+        return self._fill if row[0] is None else row[0]
+
+    def __iter__(self):
+        return (row[0] for row in self._db.conn.execute("SELECT case_id FROM cases ORDER BY rowid"))
+
+    def __len__(self):
+        return self._db.conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    def close(self):
+        """Menutup koneksi database di balik mapping ini."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class CaseDB:
+    """
+    API query case store SQLite. Semua lookup memakai indeks, jadi waktu jawab tidak bergantung
+    pada ukuran korpus dan tidak ada yang dimuat ke RAM selain baris hasilnya.
+    Hasil berupa dict kolom metadata (tanpa text_full; ambil dengan text()).
+    Database dibuka read-only; memunculkan FileNotFoundError jika belum dibangun.
+    """
+
+    def __init__(self, db_path=CASE_DB_PATH):
+        if not os.path.exists(db_path):
+            raise FileNotFoundError(db_path)
+        self.db_path = db_path
+        self.conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+        self.conn.row_factory = sqlite3.Row
+
+    def _select(self, where, params, limit, order="c.rowid"):
+        columns = ", ".join(f"c.{col}" for col in META_COLUMNS)
+        rows = self.conn.execute(f"SELECT {columns} FROM cases c WHERE {where} ORDER BY {order} LIMIT ?",
+                                 (*params, limit))
+        return [dict(row) for row in rows]
+
+    def get(self, case_id):
+        """Metadata satu kasus, atau None jika case_id tidak ada."""
+        rows = self._select("c.case_id = ?", (case_id,), 1)
+        return rows[0] if rows else None
+
+    def by_no_perkara(self, prefix, limit=20):
+        """Kasus yang no_perkara-nya diawali `prefix` (huruf kecil, seperti hasil Tahap 2)."""
+        if not prefix:
+            return []
+        return self._select("c.no_perkara >= ? AND c.no_perkara < ?", _prefix_range(prefix.lower()), limit,
+                            "c.no_perkara")
+
+    def by_pasal(self, prefix, limit=20):
+        """Kasus yang pasal-nya diawali `prefix`."""
+        if not prefix:
+            return []
+        return self._select("c.pasal >= ? AND c.pasal < ?", _prefix_range(prefix.lower()), limit, "c.pasal")
+
+    def by_tanggal(self, start, end=None, limit=100):
+        """Kasus dengan tanggal putusan dalam rentang ISO [start, end] (end default = start)."""
+        return self._select("c.tanggal_iso BETWEEN ? AND ?", (start, end or start), limit, "c.tanggal_iso")
+
+    def search(self, keywords, limit=10):
+        """
+        Pencarian kata kunci atas judul, ringkasan fakta, dan teks putusan (semua kata harus muncul),
+        diurutkan menurut skor BM25. Setiap hasil mendapat tambahan 'score' dan 'snippet'.
+        """
+        query = _fts_query(keywords)
+        if not query:
+            return []
+        columns = ", ".join(f"c.{col}" for col in META_COLUMNS)
+        rows = self.conn.execute(
+            f"SELECT {columns}, bm25(cases_fts) AS score, "
+            f"snippet(cases_fts, -1, '[', ']', '...', 12) AS snippet "
+            f"FROM cases_fts JOIN cases c ON c.rowid = cases_fts.rowid "
+            f"WHERE cases_fts MATCH ? ORDER BY score LIMIT ?", (query, limit))
+        return [dict(row) for row in rows]
+
+    def text(self, case_id, column='text_full'):
+        row = self.conn.execute(f"SELECT {column} FROM cases WHERE case_id = ?", (case_id,)).fetchone()
+        return None if row is None else row[0]
+
+    def texts(self, column, fill=None):
+        """Mapping case_id -> `column` yang membaca dari database saat diakses (lihat CaseTexts)."""
+        return CaseTexts(self, column, fill)
+
+    def __len__(self):
+        return self.conn.execute("SELECT COUNT(*) FROM cases").fetchone()[0]
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def print_cases(rows, elapsed):
+    for row in rows:
+        extra = f" (skor {row['score']:.2f}) {row['snippet']}" if 'snippet' in row else ""
+        print(f"    {row['case_id']} | {(row['no_perkara'] or '-')[:40]} | {row['tanggal_iso'] or '-'}{extra}")
+    print(f"[=] {len(rows)} kasus dalam {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Case store SQLite (indeks metadata + FTS5) untuk case base Tahap 2.")
+    parser.add_argument("action", choices=["build", "get", "search", "no-perkara", "pasal", "tanggal"],
+                        help="build = bangun ulang dari case base; lainnya = query")
+    parser.add_argument("terms", nargs="*", help="case_id, kata kunci, awalan, atau tanggal ISO (awal [akhir])")
+    parser.add_argument("--db-path", default=CASE_DB_PATH)
+    parser.add_argument("--limit", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.action == "build":
+        build_case_db(args.db_path)
+    else:
+        with CaseDB(args.db_path) as db:
+            start = time.perf_counter()
+            if args.action == "get":
+                rows = [row for row in map(db.get, args.terms) if row is not None]
+            elif args.action == "search":
+                rows = db.search(" ".join(args.terms), args.limit)
+            elif args.action == "no-perkara":
+                rows = db.by_no_perkara(" ".join(args.terms), args.limit)
+            elif args.action == "pasal":
+                rows = db.by_pasal(" ".join(args.terms), args.limit)
+            else:
+                rows = db.by_tanggal(*args.terms[:2], limit=args.limit)
+            print_cases(rows, time.perf_counter() - start)
@@ -0,0 +1,297 @@
+# case_store.py
+# Penyimpanan case base hasil Tahap 2 (keluaran Tahap 2, masukan Tahap 3-5).
+#
+#   parquet : direktori data/processed/cases.parquet/ berisi part-NNNNN.parquet (kolumnar, terkompresi zstd)
+#             dan _blobs/ (blob_store.py) untuk teks panjang; tabel hanya menyimpan kunci blob-nya
+#   csv     : data/processed/cases.csv (format lama dengan teks inline, tetap didukung sebagai fallback)
+#
+# Pembaca memilih Parquet jika ada dan hanya memuat kolom yang diminta; iter_cases membacanya per chunk
+# (out-of-core) untuk case base yang lebih besar dari memori.
+
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from blob_store import BlobStore, LazyTexts
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError: # pyarrow opsional; tanpa pyarrow case base hanya ditulis/dibaca sebagai CSV
+    pa = pq = None
+
+DATA_PROCESSED_DIR = "../data/processed"
+CASES_CSV_PATH = os.path.join(DATA_PROCESSED_DIR, "cases.csv")
+CASES_PARQUET_DIR = os.path.join(DATA_PROCESSED_DIR, "cases.parquet")
+CASE_STORE_FORMATS = ("both", "parquet", "csv")
+PARQUET_COMPRESSION = "zstd"
+CHUNK_ROWS = 5000 # Jumlah baris per chunk pada pembacaan out-of-core (iter_cases)
+
+CASE_COLUMNS = ['case_id', 'no_perkara', 'tanggal', 'jenis_perkara', 'pasal',
+                'pihak', 'judul_putusan_bersih', 'ringkasan_fakta', 'argumen_hukum_utama', 'solusi',
+                'verdict_type', 'prison_months', 'fine_amount', 'evidence_disposition',
+                'text_full', 'text_length', 'duplicate_of']
+# Kolom numerik dan tipenya (lihat outcome_fields.py untuk kolom hasil putusan); kolom lain bertipe string (nullable)
+NUMERIC_COLUMNS = {'verdict_type': 'int8', 'prison_months': 'float32', 'fine_amount': 'float64',
+                   'evidence_disposition': 'uint8', 'text_length': 'int64'}
+# Tipe kolom saat membaca CSV: string tetap string meskipun seluruh nilainya kosong (sama seperti Parquet),
+# sehingga setiap chunk iter_cases bertipe sama dengan hasil load_cases
+CSV_DTYPES = {col: NUMERIC_COLUMNS.get(col, str) for col in CASE_COLUMNS}
+# Kolom teks panjang yang di Parquet disimpan di blob store; tabel menyimpan kolom <nama>_ref berisi kuncinya.
+# argumen_hukum_utama biasanya sama dengan solusi, sehingga keduanya berbagi satu blob.
+BLOB_COLUMNS = ('ringkasan_fakta', 'argumen_hukum_utama', 'solusi', 'text_full')
+BLOB_DIR_NAME = "_blobs" # Awalan "_" membuat pembaca dataset Parquet (pyarrow, pandas) melewatinya
+
+
+def has_parquet():
+    return pq is not None
+
+def _ref(col):
+    return col + "_ref"
+
+def _schema():
+    return pa.schema([(col, pa.from_numpy_dtype(np.dtype(NUMERIC_COLUMNS[col]))) if col in NUMERIC_COLUMNS
+                      else (_ref(col) if col in BLOB_COLUMNS else col, pa.string()) for col in CASE_COLUMNS])
+
+def _typed(values, col):
+    # Nilai dari CSV yang dibaca apa adanya berupa string; '' (kosong) menjadi NaN
+    return pd.to_numeric(values.replace('', np.nan)).astype(NUMERIC_COLUMNS[col])
+
+def _csv_frame(df_cases):
+    """Kolom CASE_COLUMNS untuk CSV; kolom numerik dikonversi ke tipenya agar isinya sama dengan Parquet."""
+    return df_cases[CASE_COLUMNS].assign(**{col: _typed(df_cases[col], col) for col in NUMERIC_COLUMNS})
+
+def _to_table(df_cases, blobs):
+    """Tabel Arrow untuk satu batch; teks di BLOB_COLUMNS ditulis ke `blobs` dan diganti kuncinya."""
+    df_cases = df_cases[CASE_COLUMNS].copy()
+    for col in CASE_COLUMNS:
+        if col in NUMERIC_COLUMNS:
+            df_cases[col] = _typed(df_cases[col], col)
+            continue
+        # Nilai kosong (None/NaN/'') menjadi null, sama seperti saat CSV dibaca pandas; sisanya string
+        values = [None if v is None or v == '' or (isinstance(v, float) and pd.isna(v)) else str(v)
+                  for v in df_cases[col]]
+        if col in BLOB_COLUMNS:
+            df_cases[col] = [None if v is None else blobs.put(v) for v in values]
+            df_cases = df_cases.rename(columns={col: _ref(col)})
+        else:
+            df_cases[col] = values
+    return pa.Table.from_pandas(df_cases, schema=_schema(), preserve_index=False)
+
+def _blob_dir(parquet_dir):
+    return os.path.join(parquet_dir, BLOB_DIR_NAME)
+
+def _parquet_parts(parquet_dir=CASES_PARQUET_DIR):
+    if not os.path.isdir(parquet_dir):
+        return []
+    return sorted(os.path.join(parquet_dir, f) for f in os.listdir(parquet_dir)
+                  if f.startswith("part-") and f.endswith(".parquet"))
+
+def _formats(fmt):
+    if fmt not in CASE_STORE_FORMATS:
+        raise ValueError(f"Format case store tidak dikenal: {fmt}. Gunakan salah satu dari {CASE_STORE_FORMATS}.")
+    formats = {"csv", "parquet"} if fmt == "both" else {fmt}
+    if "parquet" in formats and not has_parquet():
+        print("Peringatan: pyarrow tidak terpasang, case base hanya ditulis sebagai CSV.")
+        formats = {"csv"}
+    return formats
+
+class CaseWriter:
+    """
+    Penulis case base bertahap: batch DataFrame ditulis satu per satu (Parquet sebagai row group
+    baru, CSV di-append), sehingga seluruh case base tidak perlu berada di memori sekaligus.
+    Keluaran ditulis ke path sementara dan baru menggantikan case base lama saat close();
+    abort() membuang hasil yang setengah jadi.
+    """
+
+    def __init__(self, fmt="both", csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+        self.formats = _formats(fmt)
+        self.csv_path = csv_path
+        self.parquet_dir = parquet_dir
+        self.rows = 0
+        self._csv = self._parquet = self._blobs = None
+        if "parquet" in self.formats:
+            shutil.rmtree(parquet_dir + ".tmp", ignore_errors=True)
+            os.makedirs(parquet_dir + ".tmp")
+            self._blobs = BlobStore(_blob_dir(parquet_dir + ".tmp"))
+            self._parquet = pq.ParquetWriter(os.path.join(parquet_dir + ".tmp", "part-00000.parquet"), _schema(),
+                                             compression=PARQUET_COMPRESSION)
+        if "csv" in self.formats:
+            self._csv = open(csv_path + ".tmp", "w", encoding="utf-8", newline="")
+        self._header = True
+
+    def write(self, df_cases):
+        if self._parquet is not None:
+            self._parquet.write_table(_to_table(df_cases, self._blobs))
+        if self._csv is not None:
+            _csv_frame(df_cases).to_csv(self._csv, header=self._header, index=False)
+        self._header = False
+        self.rows += len(df_cases)
+
+    def _finish(self):
+        if self._parquet is not None:
+            self._parquet.close()
+            self._blobs.close()
+        if self._csv is not None:
+            self._csv.close()
+
+    def close(self):
+        """
+        Memindahkan hasil ke tempatnya. Format yang tidak ditulis dihapus agar pembaca tidak
+        memuat salinan lama yang sudah usang. Mengembalikan daftar path yang ditulis.
+        """
+        self._finish()
+        written = []
+        if self._parquet is not None:
+            shutil.rmtree(self.parquet_dir, ignore_errors=True)
+            os.replace(self.parquet_dir + ".tmp", self.parquet_dir)
+            written.append(self.parquet_dir)
+        elif os.path.isdir(self.parquet_dir):
+            shutil.rmtree(self.parquet_dir)
+        if self._csv is not None:
+            os.replace(self.csv_path + ".tmp", self.csv_path)
+            written.append(self.csv_path)
+        elif os.path.exists(self.csv_path):
+            os.remove(self.csv_path)
+        return written
+
+    def abort(self):
+        self._finish()
+        if self._parquet is not None:
+            shutil.rmtree(self.parquet_dir + ".tmp", ignore_errors=True)
+        if self._csv is not None and os.path.exists(self.csv_path + ".tmp"):
+            os.remove(self.csv_path + ".tmp")
+
+def write_cases(df_cases, fmt="both", csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    """
+    Menulis seluruh case base sekaligus (lihat CaseWriter). Mengembalikan daftar path yang ditulis.
+    """
+    writer = CaseWriter(fmt, csv_path, parquet_dir)
+    try:
+        writer.write(df_cases)
+    except BaseException:
+        writer.abort()
+        raise
+    return writer.close()
+
+def append_cases(df_cases, fmt="both", csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    """
+    Menambahkan baris baru di akhir case base tanpa menulis ulang baris lama:
+    CSV di-append, Parquet mendapat file part baru. Mengembalikan daftar path yang ditulis.
+    """
+    formats = _formats(fmt)
+    written = []
+    if "parquet" in formats:
+        parts = _parquet_parts(parquet_dir)
+        number = int(os.path.basename(parts[-1])[len("part-"):-len(".parquet")]) + 1 if parts else 0
+        path = os.path.join(parquet_dir, f"part-{number:05}.parquet")
+        os.makedirs(parquet_dir, exist_ok=True)
+        # Blob ditulis (dan indeksnya ditutup) sebelum part yang merujuknya
+        with BlobStore(_blob_dir(parquet_dir)) as blobs:
+            table = _to_table(df_cases, blobs)
+        pq.write_table(table, path, compression=PARQUET_COMPRESSION)
+        written.append(path)
+    if "csv" in formats:
+        _csv_frame(df_cases).to_csv(csv_path, mode='a', header=False, index=False)
+        written.append(csv_path)
+    return written
+
+def cases_exist(csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    return bool(_parquet_parts(parquet_dir)) or os.path.exists(csv_path)
+
+def _physical_columns(columns, available):
+    """Kolom yang diminta dan tersedia di satu part, beserta nama fisiknya (<nama>_ref untuk teks di blob store)."""
+    wanted = [col for col in (columns or CASE_COLUMNS) if col in available or _ref(col) in available]
+    return wanted, [col if col in available else _ref(col) for col in wanted]
+
+def _resolve_blobs(table, wanted, physical, blobs):
+    for i, col in enumerate(wanted):
+        if physical[i] != col:
+            texts = blobs.get_many(table.column(i).to_pylist())
+            table = table.set_column(i, col, pa.array(texts, type=pa.string()))
+    return table.replace_schema_metadata(None)
+
+def _read_parquet(parts, columns, blobs):
+    """
+    Membaca `columns` (None = semua) dari setiap part. Kolom teks panjang dibaca lewat <nama>_ref
+    lalu di-resolve dari blob store; part lama yang masih menyimpan teks inline dibaca apa adanya.
+    """
+    tables = []
+    for path in parts:
+        wanted, physical = _physical_columns(columns, pq.read_schema(path).names)
+        tables.append(_resolve_blobs(pq.read_table(path, columns=physical, memory_map=True), wanted, physical, blobs))
+    return pa.concat_tables(tables)
+
+def load_cases(columns=None, csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    """
+    Memuat case base sebagai DataFrame, hanya dengan `columns` (None = semua kolom).
+    Parquet dibaca per kolom dengan memory map; teks panjang hanya diambil dari blob store jika
+    kolomnya diminta. Tanpa Parquet (atau tanpa pyarrow) dibaca dari CSV dengan usecols.
+    Kolom yang diminta tetapi tidak ada (case base lama) dilewati.
+    Memunculkan FileNotFoundError jika case base belum dibuat.
+    """
+    parts = _parquet_parts(parquet_dir) if has_parquet() else []
+    if parts:
+        with BlobStore(_blob_dir(parquet_dir)) as blobs:
+            return _read_parquet(parts, columns, blobs).to_pandas()
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(csv_path)
+    if columns:
+        available = pd.read_csv(csv_path, nrows=0).columns
+        columns = [col for col in columns if col in available]
+    return pd.read_csv(csv_path, usecols=columns, dtype=CSV_DTYPES)
+
+def load_case_texts(column, fill=None, csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    """
+    Mapping case_id -> nilai `column` (nilai kosong menjadi `fill`). Untuk kolom teks panjang di
+    Parquet hanya kunci blob yang dimuat; teks diambil dari blob store saat diakses (LazyTexts).
+    Memunculkan FileNotFoundError jika case base belum dibuat.
+    """
+    parts = _parquet_parts(parquet_dir) if has_parquet() and column in BLOB_COLUMNS else []
+    if parts and all(_ref(column) in pq.read_schema(path).names for path in parts):
+        refs = pa.concat_tables(pq.read_table(path, columns=['case_id', _ref(column)], memory_map=True)
+                                for path in parts)
+        return LazyTexts(dict(zip(refs.column(0).to_pylist(), refs.column(1).to_pylist())),
+                         BlobStore(_blob_dir(parquet_dir)), fill)
+    df_cases = load_cases(['case_id', column], csv_path, parquet_dir)
+    values = df_cases[column] if fill is None else df_cases[column].fillna(fill)
+    return dict(zip(df_cases['case_id'], values))
+
+def read_cases_exact(csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    """
+    Memuat seluruh case base untuk ditulis ulang (Tahap 2 inkremental) tanpa mengubah nilainya:
+    Parquet sudah bertipe (teks panjang di-resolve dari blob store); CSV dibaca sebagai string apa adanya.
+    """
+    if has_parquet() and _parquet_parts(parquet_dir):
+        return load_cases(csv_path=csv_path, parquet_dir=parquet_dir)
+    return pd.read_csv(csv_path, dtype=str, keep_default_na=False)
+
+def iter_cases(columns=None, chunk_rows=CHUNK_ROWS, exact=False, csv_path=CASES_CSV_PATH,
+               parquet_dir=CASES_PARQUET_DIR):
+    """
+    Pembaca out-of-core: case base sebagai rangkaian DataFrame berisi paling banyak `chunk_rows`
+    baris, dengan urutan yang sama seperti load_cases. Hanya satu chunk (beserta teks panjangnya
+    dari blob store) yang berada di memori pada satu waktu, sehingga memori bergantung pada
+    `chunk_rows`, bukan ukuran korpus. Gabungan semua chunk bernilai sama dengan load_cases(columns),
+    atau read_cases_exact() jika `exact`.
+    Memunculkan FileNotFoundError jika case base belum dibuat.
+    """
+    parts = _parquet_parts(parquet_dir) if has_parquet() else []
+    if parts:
+        with BlobStore(_blob_dir(parquet_dir)) as blobs:
+            for path in parts:
+                parquet_file = pq.ParquetFile(path, memory_map=True)
+                wanted, physical = _physical_columns(columns, parquet_file.schema_arrow.names)
+                for batch in parquet_file.iter_batches(chunk_rows, columns=physical):
+                    yield _resolve_blobs(pa.Table.from_batches([batch]), wanted, physical, blobs).to_pandas()
+        return
+    if not os.path.exists(csv_path):
+        raise FileNotFoundError(csv_path)
+    if columns:
+        available = pd.read_csv(csv_path, nrows=0).columns
+        columns = [col for col in columns if col in available]
+    options = {"dtype": str, "keep_default_na": False} if exact else {"dtype": CSV_DTYPES}
+    with pd.read_csv(csv_path, usecols=columns, chunksize=chunk_rows, **options) as reader:
+        yield from reader
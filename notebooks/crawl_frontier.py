@@ -0,0 +1,96 @@
+# crawl_frontier.py
+# Frontier crawl multi-kategori untuk Tahap 1: antrean prioritas halaman daftar dan halaman detail.
+
+import asyncio
+import heapq
+import itertools
+
+LISTING = 0 # Jenis item: halaman daftar (paginasi kategori)
+DETAIL = 1  # Jenis item: halaman detail putusan
+
+
+class CrawlFrontier:
+    """
+    Antrean prioritas (heapq) bersama untuk banyak root kategori sekaligus.
+
+    Prioritas item adalah (halaman, jenis, urutan): halaman daftar ke-1 dari semua kategori
+    berisi putusan terbaru, sehingga diambil lebih dulu, disusul detail dari halaman itu,
+    lalu halaman ke-2 dari semua kategori, dan seterusnya (newest first, bergantian antar kategori).
+    Halaman daftar didahulukan atas detail pada halaman yang sama agar discovery tidak tertinggal.
+
+    Frontier hanya mengatur urutan; laju dan konkurensi tetap diatur oleh satu HostRateLimiter
+    dan satu AdaptiveConcurrency yang dipakai bersama oleh semua worker.
+    """
+
+    def __init__(self, max_pages=None):
+        self.max_pages = max_pages # Batas halaman per kategori (None = sesuai jumlah halaman yang terdeteksi)
+        self.page_counts = {} # kategori -> jumlah halaman hasil deteksi paginasi (None = tidak terdeteksi)
+        self.categories = []
+        self._heap = []
+        self._seq = itertools.count()
+        self._unfinished = 0
+        self._changed = None
+
+    def _event(self):
+        if self._changed is None:
+            self._changed = asyncio.Event()
+        return self._changed
+
+    def _push(self, priority, item):
+        heapq.heappush(self._heap, (priority, next(self._seq), item))
+        self._unfinished += 1
+        self._event().set()
+
+    def add_category(self, category):
+        """Mendaftarkan root kategori (URL tanpa .html) dan menjadwalkan halaman daftar pertamanya."""
+        if category in self.categories:
+            return
+        self.categories.append(category)
+        self.push_listing(category, 1)
+
+    def push_listing(self, category, page):
+        rank = self.categories.index(category)
+        self._push((page, LISTING, rank), (LISTING, category, page, None, None))
+
+    def push_detail(self, category, page, position, url, case_id):
+        self._push((page, DETAIL, position), (DETAIL, category, page, url, case_id))
+
+    def set_page_count(self, category, page_count):
+        self.page_counts[category] = page_count
+
+    def last_page(self, category):
+        """Halaman terakhir yang boleh diambil untuk kategori ini (None = sampai halaman kosong)."""
+        limits = [n for n in (self.page_counts.get(category), self.max_pages) if n]
+        return min(limits) if limits else None
+
+    def schedule_next_page(self, category, page):
+        """Menjadwalkan halaman daftar berikutnya jika masih dalam batas. Mengembalikan True jika dijadwalkan."""
+        last = self.last_page(category)
+        if last is not None and page >= last:
+            return False
+        self.push_listing(category, page + 1)
+        return True
+
+    def __len__(self):
+        return len(self._heap)
+
+    async def get(self):
+        """
+        Mengambil item berprioritas tertinggi: (jenis, kategori, halaman, url, case_id).
+        Mengembalikan None jika frontier kosong dan tidak ada item yang masih diproses
+        (item yang sedang diproses masih bisa menjadwalkan item baru).
+        """
+        event = self._event()
+        while True:
+            if self._heap:
+                return heapq.heappop(self._heap)[2]
+            if self._unfinished == 0:
+                return None
+            event.clear()
+            await event.wait()
+
+    def task_done(self):
+        """Dipanggil worker setelah selesai memproses item dari get()."""
+        self._unfinished -= 1
+        if self._unfinished == 0:
+            self._event().set() # Bangunkan worker yang menunggu agar bisa berhenti
@@ -0,0 +1,112 @@
+# crawl_manifest.py
+# Manifest crawl persisten untuk Tahap 1: URL -> case_id, hash konten, waktu ambil, status.
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+
+# Status yang dianggap selesai dan tidak perlu diambil ulang saat resume.
+# ERROR sengaja tidak termasuk agar dicoba lagi pada eksekusi berikutnya.
+DONE_STATUSES = ("OK", "SKIPPED")
+
+
+def content_hash(text):
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class CrawlManifest:
+    """
+    Manifest berbentuk JSON lines yang hanya ditambah (append-only).
+    Setiap hasil fetch langsung ditulis satu baris, sehingga crash di tengah crawl
+    tidak menghilangkan progres. Saat dimuat, baris terakhir untuk suatu URL yang berlaku.
+    Baris berkunci "category" mencatat status pass crawl per kategori ("started"/"completed").
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.entries = {} # url -> entri terakhir
+        self.passes = {} # kategori -> status pass crawl terakhir
+        self._next_id = 1
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue # Baris terakhir bisa terpotong jika proses mati saat menulis
+                    if "category" in entry:
+                        self.passes[entry["category"]] = entry["pass"]
+                        continue
+                    self.entries[entry["url"]] = entry
+                    self._next_id = max(self._next_id, entry["case_id"] + 1)
+        else:
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._file = open(path, "a", encoding="utf-8")
+
+    def __len__(self):
+        return len(self.entries)
+
+    def __contains__(self, url):
+        return url in self.entries
+
+    def is_done(self, url):
+        entry = self.entries.get(url)
+        return entry is not None and entry["status"] in DONE_STATUSES
+
+    def case_id_for(self, url):
+        """case_id stabil per URL; URL baru mendapat nomor berikutnya yang belum dipakai."""
+        entry = self.entries.get(url)
+        if entry is not None:
+            return entry["case_id"]
+        case_id = self._next_id
+        self._next_id += 1
+        # Reservasi tanpa status agar URL yang sama tidak mendapat dua nomor dalam satu eksekusi
+        self.entries[url] = {"url": url, "case_id": case_id, "content_hash": None, "fetched_at": None, "status": None}
+        return case_id
+
+    def record(self, url, status, text=None):
+        entry = {
+            "url": url,
+            "case_id": self.case_id_for(url),
+            "content_hash": content_hash(text) if text is not None else None,
+            "fetched_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "status": status,
+        }
+        self.entries[url] = entry
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+        return entry
+
+    def start_pass(self, category):
+        """
+        Mencatat dimulainya pass crawl atas satu kategori. Mengembalikan True jika pass sebelumnya
+        selesai penuh: hanya dalam keadaan itu paginasi boleh berhenti pada halaman yang sudah dikenal,
+        karena halaman-halaman sesudahnya sudah pernah ditemukan dan diambil. Pass yang terhenti
+        (crash, error, atau dibatasi --max-pages) membuat pass berikutnya berjalan penuh.
+        """
+        completed = self.passes.get(category) == "completed"
+        self._record_pass(category, "started")
+        return completed
+
+    def finish_pass(self, category):
+        """Mencatat pass yang sampai ke halaman daftar terakhir dengan semua putusannya OK/SKIPPED."""
+        self._record_pass(category, "completed")
+
+    def _record_pass(self, category, status):
+        self.passes[category] = status
+        entry = {"category": category, "pass": status, "at": datetime.now(timezone.utc).isoformat(timespec="seconds")}
+        self._file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
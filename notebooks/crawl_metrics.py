@@ -0,0 +1,145 @@
+# crawl_metrics.py
+# Telemetri terstruktur untuk scraper Tahap 1: metrik per request (JSON lines) dan ringkasan per tahap.
+
+import json
+import math
+import os
+import socket
+import threading
+import time
+from datetime import datetime, timezone
+
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection, HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+# Waktu DNS/connect dicatat per thread: request dijalankan di thread worker,
+# dan koneksi baru dibuat di thread yang sama saat session.get dipanggil.
+_local = threading.local()
+
+def reset_connection_timings():
+    _local.timings = {"dns_ms": 0.0, "connect_ms": 0.0, "new_connection": False}
+
+def connection_timings():
+    return dict(getattr(_local, "timings", None) or {"dns_ms": 0.0, "connect_ms": 0.0, "new_connection": False})
+
+
+class _TimedConnectionMixin:
+    """Mengukur resolusi DNS dan pembukaan koneksi (TCP + TLS) untuk koneksi baru."""
+
+    def _new_conn(self):
+        started = time.perf_counter()
+        try:
+            addresses = socket.getaddrinfo(self._dns_host, self.port, type=socket.SOCK_STREAM)
+        except OSError:
+            return super()._new_conn() # Biarkan urllib3 melaporkan kegagalan DNS dengan caranya sendiri
+        resolved = time.perf_counter()
+        original_host = self._dns_host
+        self._dns_host = addresses[0][4][0] # Hindari resolusi DNS kedua di create_connection
+        try:
+            return super()._new_conn()
+        finally:
+            self._dns_host = original_host
+            timings = getattr(_local, "timings", None)
+            if timings is not None:
+                timings["dns_ms"] += (resolved - started) * 1000
+                timings["new_connection"] = True
+
+    def connect(self):
+        started = time.perf_counter()
+        super().connect()
+        timings = getattr(_local, "timings", None)
+        if timings is not None:
+            # connect() mencakup _new_conn (DNS + TCP) dan handshake TLS; DNS dilaporkan terpisah
+            timings["connect_ms"] += (time.perf_counter() - started) * 1000 - timings["dns_ms"]
+
+
+class TimedHTTPConnection(_TimedConnectionMixin, HTTPConnection):
+    pass
+
+class TimedHTTPSConnection(_TimedConnectionMixin, HTTPSConnection):
+    pass
+
+class TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = TimedHTTPConnection
+
+class TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = TimedHTTPSConnection
+
+
+class TimedHTTPAdapter(HTTPAdapter):
+    """HTTPAdapter yang koneksinya mencatat waktu DNS dan connect (lihat connection_timings)."""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            "http": TimedHTTPConnectionPool,
+            "https": TimedHTTPSConnectionPool,
+        }
+
+
+def percentile(values, q):
+    """Persentil nearest-rank (q dalam 0-100) tanpa dependensi numpy."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, math.ceil(q / 100 * len(ordered)))
+    return ordered[min(rank, len(ordered)) - 1]
+
+
+class CrawlMetrics:
+    """
+    Menulis satu baris JSON per request/kasus ke `path` dan mengumpulkan durasi per tahap
+    (fetch, parse, write) untuk ringkasan p50/p95/p99 dan throughput di akhir eksekusi.
+    """
+
+    def __init__(self, path):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.started = time.perf_counter()
+        self.durations = {} # tahap -> daftar durasi (ms)
+        self.bytes = 0
+        self._file = open(path, "a", encoding="utf-8")
+
+    def observe(self, stage, duration_ms):
+        self.durations.setdefault(stage, []).append(duration_ms)
+
+    def emit(self, record):
+        record = {"run_id": self.run_id, "ts": round(time.perf_counter() - self.started, 4), **record}
+        self.bytes += record.get("bytes") or 0
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._file.flush()
+
+    def summary(self, concurrency=None):
+        """
+        Mencetak ringkasan per tahap dan menuliskannya sebagai record bertipe "summary".
+        `concurrency` (tahap -> jumlah worker) dipakai untuk menghitung utilisasi tiap tahap:
+        tahap dengan utilisasi tertinggi adalah bottleneck (network-, parse- atau disk-bound).
+        """
+        concurrency = concurrency or {}
+        wall = time.perf_counter() - self.started
+        stages = {}
+        print(f"\n[=] Ringkasan telemetri ({self.path}, run {self.run_id}):")
+        print(f"    {'tahap':<8}{'n':>7}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'item/s':>10}{'utilisasi':>11}")
+        for stage, values in self.durations.items():
+            busy = sum(values) / 1000
+            workers = concurrency.get(stage, 1)
+            stats = {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "throughput_per_s": round(len(values) / wall, 2) if wall > 0 else 0.0,
+                "utilization": round(busy / (wall * workers), 3) if wall > 0 else 0.0,
+            }
+            stages[stage] = stats
+            print(f"    {stage:<8}{stats['count']:>7}{stats['p50_ms']:>10.1f}{stats['p95_ms']:>10.1f}{stats['p99_ms']:>10.1f}"
+                  f"{stats['throughput_per_s']:>10.2f}{stats['utilization']:>10.0%}")
+        if stages:
+            bottleneck = max(stages, key=lambda s: stages[s]["utilization"])
+            print(f"    Bottleneck: tahap '{bottleneck}' ({self.bytes / 1024 / 1024:.1f} MiB diunduh dalam {wall:.1f} detik)")
+        self.emit({"type": "summary", "wall_s": round(wall, 3), "stages": stages})
+
+    def close(self):
+        self._file.close()
@@ -0,0 +1,157 @@
+# embedding_cache.py
+# Cache embedding persisten di disk untuk Tahap 3. Kunci: (model, max_length, hash teks ternormalisasi);
+# vektor disimpan sebagai array float32 yang bisa di-memory map beserta indeks kuncinya, sehingga hanya
+# kasus baru atau yang teksnya berubah yang perlu di-encode ulang oleh IndoBERT.
+#
+#   python embedding_cache.py stats   -> jumlah vektor dan ukuran cache per model
+
+import argparse
+import json
+import os
+import re
+
+import numpy as np
+
+from blob_store import blob_key
+
+EMBEDDING_CACHE_DIR = "../data/processed/embeddings"
+KEY_BYTES = 32 # blob_key: hash blake2b-128 dalam hex
+
+
+def cache_namespace(model_name, max_length):
+    """Nama subdirektori cache untuk satu model + max_length ('indobenchmark/indobert-base-p1', 512 -> 'indobenchmark_indobert-base-p1-512')."""
+    return f"{re.sub(r'[^A-Za-z0-9._-]+', '_', model_name).strip('_')}-{max_length}"
+
+
+class EmbeddingCache:
+    """
+    Satu cache per (model, max_length) di `<cache_dir>/<namespace>/`:
+      vectors.f32  baris-baris vektor float32 (append-only), dibaca dengan np.memmap
+      keys.bin     kunci teks per baris (KEY_BYTES byte ASCII), urutannya sama dengan vectors.f32
+      meta.json    model, max_length, dan dimensi vektor
+    Vektor ditulis sebelum kuncinya; jika penulisan terhenti di tengah, baris yang tidak lengkap
+    dipotong saat cache dibuka berikutnya.
+    """
+
+    def __init__(self, cache_dir, model_name, max_length):
+        self.model_name = model_name
+        self.max_length = max_length
+        self.store_dir = os.path.join(cache_dir, cache_namespace(model_name, max_length))
+        self.vectors_path = os.path.join(self.store_dir, "vectors.f32")
+        self.keys_path = os.path.join(self.store_dir, "keys.bin")
+        self.meta_path = os.path.join(self.store_dir, "meta.json")
+        self.dim = None
+        self.row_of = {} # kunci -> baris
+        self.hits = self.misses = 0
+        self._vectors = None
+        if os.path.exists(self.meta_path):
+            with open(self.meta_path, "r", encoding="utf-8") as f:
+                meta = json.load(f)
+            if (meta["model"], meta["max_length"]) != (model_name, max_length):
+                raise ValueError(f"Cache {self.store_dir} milik model {meta['model']} (max_length {meta['max_length']}).")
+            self.dim = meta["dim"]
+            self._open_rows()
+
+    def _open_rows(self):
+        key_rows = os.path.getsize(self.keys_path) // KEY_BYTES if os.path.exists(self.keys_path) else 0
+        vector_rows = os.path.getsize(self.vectors_path) // (4 * self.dim) if os.path.exists(self.vectors_path) else 0
+        rows = min(key_rows, vector_rows)
+        for path, row_bytes in ((self.keys_path, KEY_BYTES), (self.vectors_path, 4 * self.dim)):
+            if os.path.exists(path) and os.path.getsize(path) != rows * row_bytes:
+                os.truncate(path, rows * row_bytes) # Sisa penulisan yang terhenti
+        keys = np.fromfile(self.keys_path, dtype=f"S{KEY_BYTES}", count=rows) if rows else []
+        self.row_of = {key.decode("ascii"): row for row, key in enumerate(keys)}
+
+    def __len__(self):
+        return len(self.row_of)
+
+    def __contains__(self, key):
+        return key in self.row_of
+
+    @property
+    def vectors(self):
+        """Seluruh vektor cache sebagai memmap read-only berukuran (len(self), dim)."""
+        if self._vectors is None and self.row_of:
+            self._vectors = np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(len(self.row_of), self.dim))
+        return self._vectors
+
+    def rows(self, keys):
+        """Baris cache untuk setiap kunci (-1 jika belum ada)."""
+        return np.fromiter((self.row_of.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+
+    def add(self, keys, vectors):
+        """Menambahkan vektor untuk kunci yang belum ada di cache (kunci yang sudah ada dilewati)."""
+        vectors = np.asarray(vectors, dtype=np.float32)
+        new = {}
+        for key, row in zip(keys, range(len(vectors))):
+            if key not in self.row_of and key not in new:
+                new[key] = row
+        if not new:
+            return
+        if self.dim is None:
+            self.dim = vectors.shape[1]
+            os.makedirs(self.store_dir, exist_ok=True)
+            tmp_path = self.meta_path + ".tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump({"model": self.model_name, "max_length": self.max_length, "dim": self.dim}, f)
+            os.replace(tmp_path, self.meta_path)
+        with open(self.vectors_path, "ab") as f:
+            np.ascontiguousarray(vectors[list(new.values())]).tofile(f)
+        with open(self.keys_path, "ab") as f:
+            f.write("".join(new).encode("ascii"))
+        for key in new:
+            self.row_of[key] = len(self.row_of)
+        self._vectors = None # Memmap dibuka ulang dengan ukuran baru
+
+    def get_many(self, keys):
+        """Vektor untuk setiap kunci (semuanya harus ada) sebagai matriks float32 di memori."""
+        if not len(keys):
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.asarray(self.vectors[self.rows(keys)])
+
+    def close(self):
+        self._vectors = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def encode_cached(encoder, texts, cache):
+    """
+    Embedding untuk `texts` (sudah dinormalisasi) lewat `cache`: hanya teks yang hash-nya belum ada
+    di cache yang di-encode (masing-masing sekali, walaupun muncul berulang), lalu disimpan.
+    Jika semua teks sudah ada di cache, model tidak dimuat sama sekali.
+    """
+    texts = list(texts)
+    keys = [blob_key(text) for text in texts]
+    missing = {key: text for key, text in zip(keys, texts) if key not in cache}
+    cache.hits += len(texts) - sum(key in missing for key in keys)
+    cache.misses += len(missing)
+    if missing:
+        cache.add(list(missing), encoder.encode(list(missing.values())))
+    return cache.get_many(keys)
+
+def stats(cache_dir=EMBEDDING_CACHE_DIR):
+    if not os.path.isdir(cache_dir):
+        print(f"[=] Belum ada cache embedding di {cache_dir}")
+        return
+    for name in sorted(os.listdir(cache_dir)):
+        meta_path = os.path.join(cache_dir, name, "meta.json")
+        if not os.path.exists(meta_path):
+            continue
+        with open(meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        cache = EmbeddingCache(cache_dir, meta["model"], meta["max_length"])
+        size = os.path.getsize(cache.vectors_path) + os.path.getsize(cache.keys_path)
+        print(f"[=] {meta['model']} (max_length {meta['max_length']}): {len(cache)} vektor x {cache.dim} dimensi, "
+              f"{size / 1024 / 1024:.1f} MiB")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cache embedding persisten Tahap 3.")
+    parser.add_argument("action", choices=["stats"], help="stats = jumlah vektor dan ukuran cache per model")
+    parser.add_argument("--cache-dir", default=EMBEDDING_CACHE_DIR)
+    args = parser.parse_args()
+    stats(args.cache_dir)
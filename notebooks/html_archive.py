@@ -0,0 +1,138 @@
+# html_archive.py
+# Arsip HTML mentah (mirip WARC) untuk Tahap 1, agar ekstraksi bisa diulang tanpa jaringan.
+
+import gzip
+import json
+import os
+import threading
+from datetime import datetime, timezone
+
+ARCHIVE_FILE_LIMIT = 512 * 1024 * 1024 # Ukuran maksimum satu file arsip sebelum rotasi (byte)
+
+
+class HtmlArchive:
+    """
+    Arsip append-only: setiap respons disimpan sebagai satu member gzip terpisah
+    (header bergaya WARC + badan HTML) di file `pages-NNNNN.warc.gz`.
+    Indeks `index.jsonl` menyimpan url -> (file, offset, length) sehingga satu
+    record dapat dibaca langsung dengan seek tanpa mendekompresi seluruh file.
+    """
+
+    def __init__(self, archive_dir, file_limit=ARCHIVE_FILE_LIMIT):
+        self.archive_dir = archive_dir
+        self.file_limit = file_limit
+        self.index_path = os.path.join(archive_dir, "index.jsonl")
+        self.index = {} # url -> entri indeks terakhir
+        os.makedirs(archive_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.index[entry["url"]] = entry
+        self._data_file = None
+        self._index_file = None
+        self._lock = threading.Lock() # append bisa dipanggil dari beberapa thread worker
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, url):
+        return url in self.index
+
+    def _current_file(self):
+        if self._data_file is None or self._data_file.tell() >= self.file_limit:
+            if self._data_file is not None:
+                self._data_file.close()
+            number = 0
+            existing = sorted(f for f in os.listdir(self.archive_dir) if f.endswith(".warc.gz"))
+            if existing:
+                number = int(existing[-1].split("-")[1].split(".")[0])
+                if os.path.getsize(os.path.join(self.archive_dir, existing[-1])) >= self.file_limit:
+                    number += 1
+            self._data_file = open(os.path.join(self.archive_dir, f"pages-{number:05}.warc.gz"), "ab")
+        return self._data_file
+
+    def append(self, url, status, html):
+        """Menambahkan satu respons ke arsip dan mencatat offset-nya di indeks."""
+        fetched_at = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        body = html.encode("utf-8")
+        header = (
+            "WARC/1.0\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {fetched_at}\r\n"
+            f"HTTP-Status: {status}\r\n"
+            "Content-Type: text/html; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            "\r\n"
+        ).encode("utf-8")
+        record = gzip.compress(header + body + b"\r\n\r\n")
+
+        with self._lock:
+            data_file = self._current_file()
+            offset = data_file.tell()
+            data_file.write(record)
+            data_file.flush()
+
+            entry = {
+                "url": url,
+                "file": os.path.basename(data_file.name),
+                "offset": offset,
+                "length": len(record),
+                "status": status,
+                "fetched_at": fetched_at,
+            }
+            if self._index_file is None:
+                self._index_file = open(self.index_path, "a", encoding="utf-8")
+            self._index_file.write(json.dumps(entry, ensure_ascii=False) + "\n")
+            self._index_file.flush()
+            self.index[url] = entry
+        return entry
+
+    def _read_entry(self, entry, handle):
+        handle.seek(entry["offset"])
+        record = gzip.decompress(handle.read(entry["length"]))
+        _, body = record.split(b"\r\n\r\n", 1)
+        return body[:-4].decode("utf-8")
+
+    def get(self, url):
+        """Mengembalikan HTML terakhir yang diarsipkan untuk `url`, atau None."""
+        entry = self.index.get(url)
+        if entry is None:
+            return None
+        with open(os.path.join(self.archive_dir, entry["file"]), "rb") as handle:
+            return self._read_entry(entry, handle)
+
+    def iter_records(self):
+        """
+        Membaca semua record terbaru (satu per URL) secara berurutan per file dan offset,
+        sehingga akses disk tetap sekuensial. Menghasilkan (url, status, html).
+        """
+        entries = sorted(self.index.values(), key=lambda e: (e["file"], e["offset"]))
+        handle, handle_name = None, None
+        try:
+            for entry in entries:
+                if entry["file"] != handle_name:
+                    if handle is not None:
+                        handle.close()
+                    handle = open(os.path.join(self.archive_dir, entry["file"]), "rb")
+                    handle_name = entry["file"]
+                yield entry["url"], entry["status"], self._read_entry(entry, handle)
+        finally:
+            if handle is not None:
+                handle.close()
+
+    def close(self):
+        if self._data_file is not None:
+            self._data_file.close()
+        if self._index_file is not None:
+            self._index_file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,121 @@
+# near_dup.py
+# Deteksi putusan yang hampir sama (near-duplicate) dengan MinHash + LSH.
+# Dipakai Tahap 2 agar salinan yang sama tidak ikut di-embed dan memakan slot top-k di Tahap 3.
+
+import zlib
+import numpy as np
+
+MERSENNE_PRIME = np.uint64(4294967311) # Prima > 2^32 untuk hashing universal (a*x + b) mod p
+DEFAULT_NUM_PERM = 128
+DEFAULT_SHINGLE_SIZE = 5
+DEFAULT_THRESHOLD = 0.9
+
+
+def shingle_hashes(text, k=DEFAULT_SHINGLE_SIZE):
+    """Hash 32-bit (crc32, stabil antar proses) dari himpunan k-gram kata dalam teks."""
+    words = text.split()
+    if len(words) < k:
+        shingles = {" ".join(words)} if words else set()
+    else:
+        shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def optimal_bands(threshold, num_perm):
+    """
+    Memilih (bands, rows) dengan bands * rows == num_perm sehingga titik belok kurva LSH
+    (1/bands)^(1/rows) paling dekat dengan ambang Jaccard.
+    """
+    best = None
+    for rows in range(1, num_perm + 1):
+        if num_perm % rows:
+            continue
+        bands = num_perm // rows
+        error = abs((1.0 / bands) ** (1.0 / rows) - threshold)
+        if best is None or error < best[0]:
+            best = (error, bands, rows)
+    return best[1], best[2]
+
+
+class MinHashLSH:
+    """
+    Indeks LSH atas signature MinHash. Setiap dokumen dibagi ke `bands` potongan signature;
+    dokumen yang berbagi minimal satu bucket menjadi kandidat, lalu diverifikasi dengan
+    estimasi Jaccard dari signature. Biaya query tidak bergantung linear pada ukuran korpus.
+    """
+
+    def __init__(self, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE, seed=1):
+        self.threshold = threshold
+        self.num_perm = num_perm
+        self.shingle_size = shingle_size
+        self.bands, self.rows = optimal_bands(threshold, num_perm)
+        rng = np.random.RandomState(seed)
+        # a < 2^31 agar a * x (x < 2^32) + b tidak overflow uint64
+        self._a = rng.randint(1, 2 ** 31, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._b = rng.randint(0, 2 ** 32, size=num_perm, dtype=np.int64).astype(np.uint64)
+        self._buckets = [dict() for _ in range(self.bands)]
+        self.signatures = {} # id -> signature
+
+    def signature(self, text):
+        hashes = shingle_hashes(text, self.shingle_size)
+        if hashes.size == 0:
+            return np.full(self.num_perm, MERSENNE_PRIME, dtype=np.uint64)
+        # Matriks (num_perm, jumlah shingle): permutasi hash universal untuk semua shingle sekaligus
+        permuted = (np.outer(self._a, hashes) + self._b[:, None]) % MERSENNE_PRIME
+        return permuted.min(axis=1)
+
+    def _band_keys(self, signature):
+        return [signature[i * self.rows:(i + 1) * self.rows].tobytes() for i in range(self.bands)]
+
+    def query(self, signature):
+        """Mengembalikan daftar (id, estimasi_jaccard) untuk dokumen terindeks di atas ambang."""
+        candidates = set()
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            candidates.update(band.get(key, ()))
+        matches = []
+        for candidate in candidates:
+            similarity = float(np.mean(self.signatures[candidate] == signature))
+            if similarity >= self.threshold:
+                matches.append((candidate, similarity))
+        return sorted(matches, key=lambda m: -m[1])
+
+    def insert(self, doc_id, signature):
+        self.signatures[doc_id] = signature
+        for band, key in zip(self._buckets, self._band_keys(signature)):
+            band.setdefault(key, []).append(doc_id)
+
+    def add(self, doc_id, signature):
+        """
+        Satu langkah pemindaian berurutan: mengembalikan (id_kanonik, estimasi_jaccard) jika dokumen
+        adalah near-duplicate dokumen terindeks; jika tidak, dokumen diindeks sebagai kanonik (None).
+        """
+        matches = self.query(signature)
+        if matches:
+            return matches[0]
+        self.insert(doc_id, signature) # Hanya dokumen kanonik yang diindeks
+        return None
+
+
+def find_near_duplicates(docs, threshold=DEFAULT_THRESHOLD, num_perm=DEFAULT_NUM_PERM, shingle_size=DEFAULT_SHINGLE_SIZE,
+                         signatures=None):
+    """
+    Memindai (id, teks) secara berurutan. Dokumen pertama dari setiap kelompok menjadi kanonik;
+    dokumen berikutnya yang estimasi Jaccard-nya >= threshold dipetakan ke id kanonik tersebut.
+    Mengembalikan dict id_duplikat -> (id_kanonik, estimasi_jaccard).
+
+    `signatures` (opsional) adalah cache id -> signature: signature yang sudah ada dipakai ulang
+    (teksnya boleh None) dan signature baru ditambahkan ke cache. Hasil hanya bergantung pada
+    urutan dokumen, sehingga dokumen di awal urutan tidak terpengaruh dokumen yang datang kemudian.
+    """
+    index = MinHashLSH(threshold, num_perm, shingle_size)
+    duplicates = {}
+    for doc_id, text in docs:
+        signature = signatures.get(doc_id) if signatures is not None else None
+        if signature is None:
+            signature = index.signature(text)
+            if signatures is not None:
+                signatures[doc_id] = signature
+        match = index.add(doc_id, signature)
+        if match:
+            duplicates[doc_id] = match
+    return duplicates
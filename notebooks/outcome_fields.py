@@ -0,0 +1,237 @@
+# outcome_fields.py
+# Field hasil putusan yang bertipe (jenis putusan, lama pidana penjara, denda, status barang bukti),
+# diekstrak sekali di Tahap 2 dari amar putusan lengkap dan disimpan sebagai kolom numerik case base.
+# OutcomeTable memuat kolom-kolom itu sebagai array NumPy sehingga hasil putusan kasus tetangga
+# bisa diagregasi secara vektor tanpa mem-parsing ulang teks solusi.
+#
+#   python outcome_fields.py summary   -> ringkasan hasil putusan seluruh case base
+#   python outcome_fields.py bench     -> agregasi k tetangga: parsing ulang solusi vs array
+
+import argparse
+import random
+import re
+import time
+
+import numpy as np
+
+from case_store import CASES_CSV_PATH, CASES_PARQUET_DIR, NUMERIC_COLUMNS, load_cases
+
+OUTCOME_COLUMNS = ['verdict_type', 'prison_months', 'fine_amount', 'evidence_disposition']
+
+# Kode kolom verdict_type (int8); indeks tuple = kode
+VERDICT_TYPES = ('tidak_diketahui', 'pemidanaan', 'pidana_bersyarat', 'bebas', 'lepas', 'tidak_dapat_diterima')
+VERDICT_CODES = {name: code for code, name in enumerate(VERDICT_TYPES)}
+
+# Bit kolom evidence_disposition (uint8); satu putusan bisa memuat beberapa status barang bukti
+EVIDENCE_FLAGS = {'dimusnahkan': 1, 'dirampas_negara': 2, 'dikembalikan': 4, 'berkas_perkara': 8}
+
+_VERDICT_PATTERNS = ( # Diperiksa berurutan; yang pertama cocok menentukan jenis putusan
+    ('lepas', re.compile(r'melepaskan\s+terdakwa[^.]{0,40}?dari\s+segala\s+tuntutan|onslag')),
+    ('bebas', re.compile(r'membebaskan\s+terdakwa|tidak\s+terbukti\s+secara\s+sah')),
+    ('tidak_dapat_diterima', re.compile(r'tidak\s+dapat\s+diterima')),
+    ('pidana_bersyarat', re.compile(r'tidak\s+perlu\s+dijalani|masa\s+percobaan')),
+    ('pemidanaan', re.compile(r'menjatuhkan\s+pidana|pidana\s+penjara|pidana\s+denda|terbukti\s+secara\s+sah')),
+)
+_AMAR_LABEL = 'catatan amar'
+_PRISON_START = re.compile(r'pidana\s+penjara\s+(?:masing-masing\s+)?(?:selama\s*)?:?\s*')
+_DURATION_PART = re.compile(r'\s*(?:dan\s+)?(\d+)\s*(?:\(\s*[a-z\s]*\)\s*)?(tahun|bulan|minggu|hari)\b')
+_MONTHS_PER_UNIT = {'tahun': 12.0, 'bulan': 1.0, 'minggu': 7 / 30, 'hari': 1 / 30}
+_FINE = re.compile(r'denda\s+(?:sebesar|sejumlah|senilai)?\s*:?\s*rp\.?\s*(\d[\d.]*)')
+_EVIDENCE_START = re.compile(r'barang\s+bukti')
+_EVIDENCE_PATTERNS = {
+    'dimusnahkan': re.compile(r'dimusnahkan|dirampas\s+untuk\s+dirusak'),
+    'dirampas_negara': re.compile(r'dirampas\s+untuk\s+(?:kepentingan\s+)?negara'),
+    'dikembalikan': re.compile(r'dikembalikan\s+kepada'),
+    'berkas_perkara': re.compile(r'terlampir\s+dalam\s+berkas|(?:dipergunakan|digunakan)\s+dalam\s+perkara'),
+}
+
+
+def amar_text(text, sections):
+    """
+    Teks amar untuk extract_outcome: bagian 'solusi' dari section_scanner, diperluas ke belakang
+    sampai label 'catatan amar' halaman direktori putusan. Header amar yang ditulis berspasi
+    ('m e n g a d i l i') membuat bagian 'solusi' baru mulai di 'menetapkan ...', setelah
+    pernyataan bersalah dan lama pidananya.
+    """
+    span = sections.get('solusi')
+    start, end = span if span else (len(text), len(text))
+    label = text.rfind(_AMAR_LABEL, 0, start)
+    if label >= 0:
+        start = label + len(_AMAR_LABEL)
+    return text[start:end]
+
+def prison_months(amar):
+    """
+    Lama pidana penjara pertama di amar dalam bulan ('1 (satu) tahun 6 (enam) bulan' -> 18.0), atau NaN.
+    Sebutan 'pidana penjara' tanpa lama (misalnya '... dari pidana penjara yang dijatuhkan') dilewati.
+    """
+    for match in _PRISON_START.finditer(amar):
+        months, position, found = 0.0, match.end(), False
+        while True:
+            part = _DURATION_PART.match(amar, position)
+            if not part:
+                break
+            months += int(part.group(1)) * _MONTHS_PER_UNIT[part.group(2)]
+            position, found = part.end(), True
+        if found:
+            return months
+    return np.nan
+
+def extract_outcome(amar):
+    """
+    Field hasil putusan dari teks amar lengkap (lihat amar_text; bukan solusi yang sudah
+    dipotong 200 kata). Nilai yang tidak ditemukan: verdict_type 0, prison_months NaN,
+    fine_amount NaN (0 untuk pemidanaan tanpa denda), evidence_disposition 0.
+    Pidana seumur hidup/mati tidak punya lama penjara sehingga prison_months-nya NaN.
+    """
+    amar = (amar or '').lower()
+    verdict = next((name for name, pattern in _VERDICT_PATTERNS if pattern.search(amar)), 'tidak_diketahui')
+    fine = _FINE.search(amar)
+    if fine:
+        fine_amount = float(fine.group(1).replace('.', '')) # Titik = pemisah ribuan, sen (",00") diabaikan
+    else:
+        fine_amount = 0.0 if verdict in ('pemidanaan', 'pidana_bersyarat') else np.nan
+    evidence = 0
+    start = _EVIDENCE_START.search(amar)
+    if start:
+        for name, pattern in _EVIDENCE_PATTERNS.items():
+            if pattern.search(amar, start.end()):
+                evidence |= EVIDENCE_FLAGS[name]
+    return {
+        'verdict_type': VERDICT_CODES[verdict],
+        'prison_months': prison_months(amar) if verdict in ('pemidanaan', 'pidana_bersyarat') else np.nan,
+        'fine_amount': fine_amount,
+        'evidence_disposition': evidence,
+    }
+
+
+class OutcomeTable:
+    """
+    Kolom hasil putusan seluruh case base sebagai array NumPy bertipe (satu elemen per kasus)
+    plus indeks case_id -> baris. Memori: ±14 byte per kasus di luar case_id.
+    """
+
+    def __init__(self, case_ids, verdict_type, prison_months, fine_amount, evidence_disposition):
+        self.case_ids = list(case_ids)
+        self.row_of = {case_id: row for row, case_id in enumerate(self.case_ids)}
+        self.verdict_type = np.asarray(verdict_type, dtype=NUMERIC_COLUMNS['verdict_type'])
+        self.prison_months = np.asarray(prison_months, dtype=NUMERIC_COLUMNS['prison_months'])
+        self.fine_amount = np.asarray(fine_amount, dtype=NUMERIC_COLUMNS['fine_amount'])
+        self.evidence_disposition = np.asarray(evidence_disposition, dtype=NUMERIC_COLUMNS['evidence_disposition'])
+
+    @classmethod
+    def from_cases(cls, df_cases):
+        """Dari DataFrame case base; case base lama tanpa kolom hasil putusan dianggap tidak diketahui."""
+        n = len(df_cases)
+        def column(name, default):
+            return df_cases[name].to_numpy() if name in df_cases.columns else np.full(n, default)
+        return cls(df_cases['case_id'], column('verdict_type', 0), column('prison_months', np.nan),
+                   column('fine_amount', np.nan), column('evidence_disposition', 0))
+
+    def __len__(self):
+        return len(self.case_ids)
+
+    def rows(self, case_ids):
+        """Indeks baris untuk setiap case_id (-1 jika tidak ada di case base)."""
+        return np.fromiter((self.row_of.get(case_id, -1) for case_id in case_ids), dtype=np.int64,
+                           count=len(case_ids))
+
+    def aggregate(self, case_ids, weights=None):
+        """
+        Agregasi hasil putusan kasus-kasus `case_ids` (misalnya top-k hasil retrieval), dibobot
+        `weights` (misalnya skor kemiripan; bobot negatif dianggap 0). Nilai yang tidak diketahui
+        diabaikan per field. Mengembalikan dict:
+          verdict_type          jenis putusan dengan bobot terbesar, dan verdict_share porsinya
+          prison_months         rata-rata berbobot lama pidana penjara (bulan)
+          fine_amount           rata-rata berbobot denda (rupiah)
+          evidence_disposition  status barang bukti yang muncul pada >= separuh bobot
+          neighbours            jumlah kasus yang ditemukan di case base
+        """
+        rows = self.rows(case_ids)
+        weights = np.ones(len(rows)) if weights is None else np.clip(np.asarray(weights, dtype=np.float64), 0, None)
+        found = rows >= 0
+        rows, weights = rows[found], weights[found]
+        if weights.sum() == 0:
+            weights = np.ones(len(rows))
+
+        verdict = self.verdict_type[rows]
+        known = verdict > 0
+        verdict_weights = np.bincount(verdict[known], weights=weights[known], minlength=len(VERDICT_TYPES))
+        code = int(verdict_weights.argmax()) if known.any() else 0
+
+        def weighted_mean(values):
+            valid = ~np.isnan(values)
+            total = weights[valid].sum()
+            return float(np.dot(values[valid], weights[valid]) / total) if total > 0 else np.nan
+
+        evidence = self.evidence_disposition[rows]
+        with_evidence = evidence > 0
+        evidence_total = weights[with_evidence].sum()
+        disposition = [name for name, bit in EVIDENCE_FLAGS.items()
+                       if evidence_total > 0 and weights[(evidence & bit) > 0].sum() >= evidence_total / 2]
+        return {
+            'verdict_type': VERDICT_TYPES[code],
+            'verdict_share': float(verdict_weights[code] / verdict_weights.sum()) if known.any() else 0.0,
+            'prison_months': weighted_mean(self.prison_months[rows].astype(np.float64)),
+            'fine_amount': weighted_mean(self.fine_amount[rows]),
+            'evidence_disposition': disposition,
+            'neighbours': int(len(rows)),
+        }
+
+def load_outcomes(csv_path=CASES_CSV_PATH, parquet_dir=CASES_PARQUET_DIR):
+    """OutcomeTable dari case base; hanya case_id dan kolom numerik hasil putusan yang dibaca."""
+    return OutcomeTable.from_cases(load_cases(['case_id', *OUTCOME_COLUMNS], csv_path, parquet_dir))
+
+
+def summary(table):
+    print(f"[=] Hasil putusan {len(table)} kasus:")
+    counts = np.bincount(table.verdict_type, minlength=len(VERDICT_TYPES))
+    for name, count in zip(VERDICT_TYPES, counts):
+        print(f"    {name:<22}{count:>6}")
+    months = table.prison_months[~np.isnan(table.prison_months)]
+    if len(months):
+        print(f"    pidana penjara    rata-rata {months.mean():.1f} bulan, median {np.median(months):.1f}, "
+              f"rentang {months.min():.1f}-{months.max():.1f} ({len(months)} kasus)")
+    fines = table.fine_amount[table.fine_amount > 0]
+    if len(fines):
+        print(f"    denda             rata-rata Rp{fines.mean():,.0f}, median Rp{np.median(fines):,.0f} ({len(fines)} kasus)")
+    for name, bit in EVIDENCE_FLAGS.items():
+        print(f"    barang bukti {name:<18}{int(((table.evidence_disposition & bit) > 0).sum()):>6}")
+
+def bench(table, solutions, queries=1000, k=10, seed=0):
+    """
+    Agregasi hasil putusan k tetangga acak: parsing ulang teks solusi per query (cara lama)
+    dibandingkan array OutcomeTable.
+    """
+    rng = random.Random(seed)
+    neighbour_sets = [rng.sample(table.case_ids, min(k, len(table))) for _ in range(queries)]
+    legacy_months, vectorized_months = [], []
+    start = time.perf_counter()
+    for case_ids in neighbour_sets:
+        parsed = [extract_outcome(solutions[case_id]) for case_id in case_ids]
+        months = [fields['prison_months'] for fields in parsed if not np.isnan(fields['prison_months'])]
+        legacy_months.append(sum(months) / len(months) if months else np.nan)
+    legacy = time.perf_counter() - start
+    start = time.perf_counter()
+    for case_ids in neighbour_sets:
+        vectorized_months.append(table.aggregate(case_ids)['prison_months'])
+    vectorized = time.perf_counter() - start
+    print(f"[=] {queries} query x {k} tetangga: parsing ulang solusi {legacy * 1000:.1f} ms, "
+          f"array OutcomeTable {vectorized * 1000:.1f} ms")
+    # Solusi di case base dipotong 200 kata, sedangkan field bertipe diekstrak dari amar lengkap
+    print(f"    rata-rata lama pidana diketahui: {int(np.count_nonzero(~np.isnan(legacy_months)))} query "
+          f"(parsing ulang), {int(np.count_nonzero(~np.isnan(vectorized_months)))} query (array)")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Field hasil putusan bertipe pada case base Tahap 2.")
+    parser.add_argument("action", choices=["summary", "bench"],
+                        help="summary = ringkasan hasil putusan; bench = parsing ulang solusi vs array")
+    parser.add_argument("--k", type=int, default=10, help="Jumlah tetangga per query pada bench")
+    args = parser.parse_args()
+
+    outcomes = load_outcomes()
+    if args.action == "summary":
+        summary(outcomes)
+    else:
+        df_cases = load_cases(['case_id', 'solusi'])
+        bench(outcomes, dict(zip(df_cases['case_id'], df_cases['solusi'].fillna(''))), k=args.k)
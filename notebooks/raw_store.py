@@ -0,0 +1,224 @@
+# raw_store.py
+# Backend penyimpanan teks putusan mentah (keluaran Tahap 1, masukan Tahap 2).
+#
+#   txt    : satu file case_NNN.txt per putusan di data/raw (layout lama, tetap didukung)
+#   shards : beberapa file shard terkompresi + indeks id -> (shard, offset, length)
+
+import argparse
+import json
+import os
+import threading
+import zlib
+
+DATA_RAW_DIR = "../data/raw"
+RAW_STORE_DIR = "../data/raw_store"
+SHARD_SIZE_LIMIT = 64 * 1024 * 1024 # Ukuran maksimum satu shard sebelum shard baru dibuat (byte)
+
+
+class TxtRawStore:
+    """Layout lama: satu file case_NNN.txt per putusan."""
+
+    def __init__(self, raw_dir=DATA_RAW_DIR):
+        self.raw_dir = raw_dir
+        os.makedirs(raw_dir, exist_ok=True)
+
+    def ids(self):
+        return sorted(f[:-4] for f in os.listdir(self.raw_dir) if f.endswith(".txt"))
+
+    def __len__(self):
+        return len(self.ids())
+
+    def __contains__(self, case_id):
+        return os.path.exists(self.path_for(case_id))
+
+    def path_for(self, case_id):
+        return os.path.join(self.raw_dir, f"{case_id}.txt")
+
+    def fingerprint(self, case_id):
+        """Penanda murah (tanpa membaca isi) yang berubah jika file ditulis ulang."""
+        stat = os.stat(self.path_for(case_id))
+        return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+    def get(self, case_id):
+        with open(self.path_for(case_id), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def put(self, case_id, text):
+        path = self.path_for(case_id)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def iter_cases(self):
+        """Menghasilkan (case_id, teks) terurut berdasarkan case_id."""
+        for case_id in self.ids():
+            yield case_id, self.get(case_id)
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ShardedRawStore:
+    """
+    Semua putusan disimpan di sedikit file `shard-NNNNN.bin`; setiap record dikompresi
+    zlib dan ditambahkan di akhir shard (append-only). Indeks `index.jsonl` memetakan
+    case_id -> (shard, offset, length); entri terakhir untuk suatu case_id yang berlaku,
+    sehingga menulis ulang sebuah kasus cukup menambah record baru.
+    Ini menghindari ribuan file kecil (inode dan os.listdir) pada case base yang besar.
+    """
+
+    def __init__(self, store_dir=RAW_STORE_DIR, shard_limit=SHARD_SIZE_LIMIT):
+        self.store_dir = store_dir
+        self.shard_limit = shard_limit
+        self.index_path = os.path.join(store_dir, "index.jsonl")
+        self.index = {} # case_id -> (shard, offset, length)
+        os.makedirs(store_dir, exist_ok=True)
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if entry.get("deleted"):
+                        self.index.pop(entry["case_id"], None)
+                    else:
+                        self.index[entry["case_id"]] = (entry["shard"], entry["offset"], entry["length"])
+        self._shard_file = None
+        self._index_file = None
+        self._lock = threading.Lock()
+
+    def ids(self):
+        return sorted(self.index)
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, case_id):
+        return case_id in self.index
+
+    def _shard_path(self, shard):
+        return os.path.join(self.store_dir, f"shard-{shard:05}.bin")
+
+    def _writable_shard(self):
+        if self._shard_file is None or self._shard_file.tell() >= self.shard_limit:
+            shard = 0
+            if self._shard_file is not None:
+                shard = self._shard_number + 1
+                self._shard_file.close()
+            else:
+                existing = sorted(f for f in os.listdir(self.store_dir) if f.startswith("shard-"))
+                if existing:
+                    shard = int(existing[-1][len("shard-"):-len(".bin")])
+                    if os.path.getsize(self._shard_path(shard)) >= self.shard_limit:
+                        shard += 1
+            self._shard_number = shard
+            self._shard_file = open(self._shard_path(shard), "ab")
+        return self._shard_number, self._shard_file
+
+    def _append_index(self, entry):
+        if self._index_file is None:
+            self._index_file = open(self.index_path, "a", encoding="utf-8")
+        self._index_file.write(json.dumps(entry) + "\n")
+        self._index_file.flush()
+
+    def put(self, case_id, text):
+        record = zlib.compress(text.encode("utf-8"))
+        with self._lock:
+            shard, shard_file = self._writable_shard()
+            offset = shard_file.tell()
+            shard_file.write(record)
+            shard_file.flush()
+            self._append_index({"case_id": case_id, "shard": shard, "offset": offset, "length": len(record)})
+            self.index[case_id] = (shard, offset, len(record))
+        return f"{self._shard_path(shard)}@{offset}"
+
+    def delete(self, case_id):
+        with self._lock:
+            if self.index.pop(case_id, None) is not None:
+                self._append_index({"case_id": case_id, "deleted": True})
+
+    def fingerprint(self, case_id):
+        """Lokasi record di indeks; berubah setiap kali kasus ditulis ulang (record baru di-append)."""
+        shard, offset, length = self.index[case_id]
+        return f"{shard}:{offset}:{length}"
+
+    def get(self, case_id):
+        shard, offset, length = self.index[case_id]
+        with open(self._shard_path(shard), "rb") as f:
+            f.seek(offset)
+            return zlib.decompress(f.read(length)).decode("utf-8")
+
+    def iter_cases(self):
+        """
+        Pembaca massal: menghasilkan (case_id, teks) terurut berdasarkan case_id.
+        Setiap shard dibuka sekali; karena kasus ditulis berurutan, urutan id hampir
+        selalu sama dengan urutan offset sehingga pembacaan disk tetap sekuensial.
+        """
+        handles = {}
+        try:
+            for case_id in self.ids():
+                shard, offset, length = self.index[case_id]
+                handle = handles.get(shard)
+                if handle is None:
+                    handle = handles[shard] = open(self._shard_path(shard), "rb")
+                handle.seek(offset)
+                yield case_id, zlib.decompress(handle.read(length)).decode("utf-8")
+        finally:
+            for handle in handles.values():
+                handle.close()
+
+    def close(self):
+        if self._shard_file is not None:
+            self._shard_file.close()
+            self._shard_file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+RAW_STORE_KINDS = ("txt", "shards")
+
+def open_raw_store(kind="txt", path=None):
+    """Membuka backend raw store sesuai jenisnya ('txt' atau 'shards')."""
+    if kind == "txt":
+        return TxtRawStore(path or DATA_RAW_DIR)
+    if kind == "shards":
+        return ShardedRawStore(path or RAW_STORE_DIR)
+    raise ValueError(f"Jenis raw store tidak dikenal: {kind}. Gunakan salah satu dari {RAW_STORE_KINDS}.")
+
+def copy_cases(source, target):
+    """Menyalin seluruh kasus dari satu backend ke backend lain. Mengembalikan jumlah kasus."""
+    count = 0
+    for case_id, text in source.iter_cases():
+        target.put(case_id, text)
+        count += 1
+    return count
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Konversi antara layout data/raw (.txt) dan raw store ber-shard.")
+    parser.add_argument("action", choices=["import", "export"],
+                        help="import = .txt -> shard; export = shard -> .txt (layout lama yang kompatibel)")
+    parser.add_argument("--raw-dir", default=DATA_RAW_DIR)
+    parser.add_argument("--store-dir", default=RAW_STORE_DIR)
+    args = parser.parse_args()
+
+    with TxtRawStore(args.raw_dir) as txt_store, ShardedRawStore(args.store_dir) as shard_store:
+        if args.action == "import":
+            count = copy_cases(txt_store, shard_store)
+            print(f"[✓] {count} kasus diimpor dari {args.raw_dir} ke {args.store_dir}")
+        else:
+            count = copy_cases(shard_store, txt_store)
+            print(f"[✓] {count} kasus diekspor dari {args.store_dir} ke {args.raw_dir}")
@@ -0,0 +1,66 @@
+# representation_state.py
+# Status Tahap 2 per kasus untuk representasi inkremental: hash konten, penanda raw store,
+# status near-duplicate, dan cache signature MinHash.
+
+import json
+import os
+
+import numpy as np
+
+STATE_PATH = "../data/processed/representation_state.json"
+SIGNATURES_PATH = "../data/processed/minhash_signatures.npz"
+
+
+class RepresentationState:
+    """
+    Menyimpan, untuk setiap case_id yang sudah direpresentasikan:
+
+        fingerprint   : penanda murah dari raw store (mtime/ukuran file atau lokasi record shard)
+        content_hash  : sha256 teks mentah, dipakai jika fingerprint berubah
+        duplicate_of  : case_id kanonik jika kasus ditandai near-duplicate
+
+    serta pengaturan eksekusi terakhir (`settings`). Jika pengaturan berbeda, status tidak
+    berlaku dan Tahap 2 harus membangun ulang seluruh representasi.
+    """
+
+    def __init__(self, path=STATE_PATH, signatures_path=SIGNATURES_PATH):
+        self.path = path
+        self.signatures_path = signatures_path
+        self.settings = None
+        self.cases = {} # case_id -> {"fingerprint", "content_hash", "duplicate_of"}
+        if os.path.exists(path):
+            try:
+                with open(path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                self.settings = data.get("settings")
+                self.cases = data.get("cases", {})
+            except (json.JSONDecodeError, OSError):
+                print(f"Peringatan: Status representasi {path} rusak, representasi akan dibangun ulang.")
+                self.settings, self.cases = None, {}
+
+    def is_compatible(self, settings):
+        return self.settings is not None and self.settings == settings
+
+    def save(self, settings, cases):
+        """Menulis status baru secara atomik (file sementara lalu os.replace)."""
+        self.settings, self.cases = settings, cases
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "cases": cases}, f)
+        os.replace(tmp_path, self.path)
+
+    def load_signatures(self, params):
+        """Cache id -> signature MinHash; kosong jika belum ada atau dibuat dengan parameter lain."""
+        if not os.path.exists(self.signatures_path):
+            return {}
+        with np.load(self.signatures_path, allow_pickle=False) as data:
+            if json.loads(str(data["params"])) != params:
+                return {}
+            return dict(zip(data["ids"].tolist(), data["signatures"]))
+
+    def save_signatures(self, signatures, params):
+        ids = sorted(signatures)
+        matrix = np.array([signatures[i] for i in ids], dtype=np.uint64) if ids else np.empty((0, 0), dtype=np.uint64)
+        tmp_path = self.signatures_path + ".tmp.npz"
+        np.savez(tmp_path, ids=np.array(ids, dtype=str), signatures=matrix, params=json.dumps(params))
+        os.replace(tmp_path, self.signatures_path)
@@ -0,0 +1,480 @@
+# section_scanner.py
+# Pemindai bagian putusan satu kali jalan untuk Tahap 2 (dipakai extract_metadata).
+#
+#   python section_scanner.py --bench   -> throughput (MB/s) pada putusan sintetis berukuran besar
+
+import argparse
+import bisect
+import random
+import re
+import time
+from collections import defaultdict
+
+# Kata kunci yang dicari (huruf kecil). Satu kata bisa punya beberapa peran,
+# mis. 'terdakwa' adalah penutup amar sekaligus kata kunci fakta.
+JUDUL_KEY = 'judul:'
+FIELD_KEYS = {
+    'no_perkara': 'nomor:',
+    'tanggal': 'tanggal register:',
+    'jenis_perkara': 'jenis perkara:',
+    'pasal': 'pasal:',
+    'penggugat': 'penggugat:',
+    'tergugat': 'tergugat:',
+}
+AMAR_HEADERS = ('mengadili', 'memutuskan', 'menetapkan')
+AMAR_STOPS = ('tanggal musyawarah', 'tanggal dibacakan', 'kaidah', 'abstrak', 'putusan', 'penuntut umum', 'terdakwa')
+FACT_HEADERS = ('duduk perkara', 'fakta-fakta', 'tentang fakta-fakta')
+FACT_STOPS = ('menimbang',) + AMAR_HEADERS
+FACT_KEYWORDS = ('bahwa', 'terdakwa', 'bukti', 'kejadian', 'perbuatan', 'saksi', 'keterangan')
+MARKERS = {'m_judul': 'judul:', 'm_table': 'metadata table', 'm_body': 'main judgment body'}
+
+MAX_SOLUSI_WORDS = 200
+MAX_FAKTA_WORDS = 150
+
+DEFAULT_JUDUL = "Judul putusan tidak dapat diekstraksi."
+DEFAULT_FAKTA = "Ringkasan fakta tidak dapat diekstraksi secara spesifik."
+DEFAULT_ARGUMEN = "Argumen hukum utama tidak dapat diekstraksi secara spesifik."
+DEFAULT_SOLUSI = "Solusi tidak dapat diekstraksi secara spesifik."
+
+_ROLES = defaultdict(list) # kata kunci -> daftar peran
+_ROLES[JUDUL_KEY].append('judul')
+for _role, _word in FIELD_KEYS.items():
+    _ROLES[_word].append(_role)
+for _role, _words in (('amar', AMAR_HEADERS), ('amar_stop', AMAR_STOPS), ('fact', FACT_HEADERS),
+                      ('fact_stop', FACT_STOPS), ('fact_keyword', FACT_KEYWORDS)):
+    for _word in _words:
+        _ROLES[_word].append(_role)
+ROLES = ('judul',) + tuple(FIELD_KEYS) + ('amar', 'amar_stop', 'fact', 'fact_stop', 'fact_keyword') + tuple(MARKERS)
+
+def _trie_pattern(words):
+    """
+    Regex alternasi berbentuk trie (awalan yang sama digabung). Mesin regex Python mencoba setiap
+    cabang secara berurutan, jadi alternasi datar ~30 kata jauh lebih lambat daripada trie
+    yang hanya bercabang pada karakter pertama yang berbeda.
+    """
+    groups = defaultdict(list)
+    for word in words:
+        groups[word[0]].append(word[1:])
+    branches = []
+    for char in sorted(groups):
+        rest = [w for w in groups[char] if w]
+        branch = re.escape(char)
+        if rest:
+            sub = _trie_pattern(rest)
+            branch += f"(?:{sub})?" if len(rest) < len(groups[char]) else sub
+        branches.append(branch)
+    return branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+
+# Satu automaton untuk semua header bagian, kunci field, penutup bagian, dan kata kunci fakta
+_MARKER_PATTERN = r'===\s*(?:' + '|'.join(re.escape(m) for m in MARKERS.values()) + r')\s*==='
+_TOKEN_PATTERN = re.compile(_MARKER_PATTERN + '|' + _trie_pattern(sorted(_ROLES)))
+_WS = re.compile(r'\s*')
+
+# Pola lama memakai re.IGNORECASE. Pemindai mencocokkan salinan huruf kecil (jauh lebih cepat),
+# jadi karakter non-ASCII yang oleh re.IGNORECASE (tetapi tidak oleh str.lower) dianggap sama dengan
+# huruf ASCII pada kata kunci diganti dulu dengan padanannya. İ juga harus diganti karena lower()-nya
+# dua karakter; dengan begitu panjang teks tidak berubah dan offset tetap sama.
+_FOLD = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})
+_FOLD_CHARS = re.compile('[İıſ]')
+
+def _folded(text):
+    if not text.isascii() and _FOLD_CHARS.search(text):
+        text = text.translate(_FOLD)
+    return text.lower()
+
+def scan_tokens(text):
+    """
+    Satu kali pemindaian linear: mengembalikan dict peran -> daftar (awal, akhir) setiap kemunculan,
+    terurut menurut posisi. Kemunculan yang saling tumpang tindih (mis. 'fakta-fakta' di dalam
+    'tentang fakta-fakta', atau 'judul:' di dalam penanda === JUDUL: ===) tetap dicatat semua.
+    """
+    folded = _folded(text)
+    tokens = {role: [] for role in ROLES}
+    search = _TOKEN_PATTERN.search
+    match = search(folded)
+    while match:
+        start, end = match.span()
+        word = match.group()
+        if word[0] == '=':
+            role = next(role for role, marker in MARKERS.items() if marker in word)
+            tokens[role].append((start, end))
+        else:
+            for role in _ROLES[word]:
+                tokens[role].append((start, end))
+        match = search(folded, start + 1)
+    return tokens
+
+
+def _first(occurrences, start, end):
+    """Kemunculan pertama yang seluruhnya berada di [start, end), atau None."""
+    for i in range(bisect.bisect_left(occurrences, (start,)), len(occurrences)):
+        occurrence = occurrences[i]
+        if occurrence[0] >= end:
+            break
+        if occurrence[1] <= end:
+            return occurrence
+    return None
+
+def _skip_ws(text, pos, end):
+    return _WS.match(text, pos, end).end()
+
+def _strip_span(text, start, end):
+    """(awal, akhir) sehingga text[awal:akhir] == text[start:end].strip()."""
+    start = _skip_ws(text, start, end)
+    while end > start and text[end - 1].isspace():
+        end -= 1
+    return start, end
+
+def _ws_run_start(text, pos, floor):
+    while pos > floor and text[pos - 1].isspace():
+        pos -= 1
+    return pos
+
+def _first_break(text, stops, pos, end, to_end):
+    """
+    Posisi '\\n' pertama >= pos yang (setelah whitespace) diikuti salah satu `stops` yang selesai
+    sebelum `end`, atau, jika to_end, hanya diikuti whitespace sampai `end`. Setara dengan lookahead
+    (?=\\n\\s*(?:...|\\Z)) pada pola lama. None jika tidak ada.
+    """
+    for i in range(bisect.bisect_left(stops, (pos,)), len(stops)):
+        stop_start, stop_end = stops[i]
+        if stop_start >= end:
+            break
+        if stop_end > end:
+            continue
+        newline = text.find('\n', _ws_run_start(text, stop_start, pos), stop_start)
+        if newline != -1:
+            return newline
+    if to_end:
+        newline = text.find('\n', _ws_run_start(text, end, pos), end)
+        if newline != -1:
+            return newline
+    return None
+
+def _field_value(text, key, end):
+    """Nilai `kunci: ...` sampai akhir baris (setara r'kunci:\\s*([^\\n]+)' lalu strip)."""
+    value_start = _skip_ws(text, key[1], end)
+    if value_start < end:
+        line_end = text.find('\n', value_start, end)
+        return text[value_start:end if line_end == -1 else line_end].strip()
+    # Sisanya hanya whitespace: [^\n]+ masih menangkap spasi/tab (hasilnya kosong setelah strip)
+    if text.count('\n', key[1], end) < end - key[1]:
+        return ''
+    return None
+
+def _truncate(text, max_words):
+    words = text.split(None, max_words) # Cukup max_words + 1 bagian untuk tahu apakah perlu dipotong
+    if len(words) > max_words:
+        return ' '.join(words[:max_words]) + "..."
+    return text
+
+
+def scan_judgment(text, tokens=None):
+    """
+    Mengekstrak field putusan dari hasil satu kali pemindaian (`tokens`, dari scan_tokens jika None).
+    Hasilnya identik dengan rangkaian re.search lama (lihat legacy_extract_fields), ditambah
+    'sections': dict nama bagian -> (awal, akhir) offset karakter di `text`
+    (judul, metadata_table, main_body, solusi, ringkasan_fakta; hanya bagian yang ditemukan).
+    """
+    if tokens is None:
+        tokens = scan_tokens(text)
+    n = len(text)
+    fields = {
+        'no_perkara': None,
+        'tanggal': None,
+        'jenis_perkara': None,
+        'pasal': None,
+        'pihak': None,
+        'judul_putusan_bersih': DEFAULT_JUDUL,
+        'ringkasan_fakta': DEFAULT_FAKTA,
+        'argumen_hukum_utama': DEFAULT_ARGUMEN,
+        'solusi': DEFAULT_SOLUSI,
+    }
+    sections = {}
+    table = body = (0, 0)
+
+    if tokens['m_judul'] or tokens['m_table'] or tokens['m_body']:
+        judul = _first(tokens['judul'], 0, n)
+        if judul:
+            value_start = _skip_ws(text, judul[1], n)
+            line_end = text.find('\n', value_start)
+            sections['judul'] = _strip_span(text, value_start, n if line_end == -1 else line_end)
+            fields['judul_putusan_bersih'] = re.sub(r'\s+', ' ', text[slice(*sections['judul'])]).strip().lower()
+        if tokens['m_table']:
+            table_start = _skip_ws(text, tokens['m_table'][0][1], n)
+            table_end = _first_break(text, tokens['m_body'], table_start, n, to_end=False)
+            table = _strip_span(text, table_start, n if table_end is None else table_end)
+        if tokens['m_body']:
+            body = _strip_span(text, tokens['m_body'][0][1], n)
+    else: # Tanpa penanda bagian: seluruh teks adalah badan putusan, judul dari baris pertama
+        body = (0, n)
+        line_end = text.find('\n')
+        first_line = text[:n if line_end == -1 else line_end].strip()
+        if first_line.startswith('==='):
+            fields['judul_putusan_bersih'] = re.sub(r'^===\s*(.*?)\s*===.*', r'\1', first_line).strip().lower()
+        else:
+            fields['judul_putusan_bersih'] = first_line.lower()
+    if table[0] < table[1]:
+        sections['metadata_table'] = table
+    if body[0] < body[1]:
+        sections['main_body'] = body
+
+    # --- Field dari tabel metadata (atau badan putusan) ---
+    start, end = table if table[0] < table[1] else body
+    values = {}
+    for role in FIELD_KEYS:
+        key = _first(tokens[role], start, end)
+        values[role] = _field_value(text, key, end) if key else None
+    for role in ('no_perkara', 'tanggal', 'jenis_perkara', 'pasal'):
+        fields[role] = values[role]
+    if values['penggugat'] is not None and values['tergugat'] is not None:
+        fields['pihak'] = f"{values['penggugat']} vs. {values['tergugat']}"
+    elif values['penggugat'] is not None:
+        fields['pihak'] = values['penggugat']
+    elif values['tergugat'] is not None:
+        fields['pihak'] = values['tergugat']
+
+    # --- Amar putusan: dari MENGADILI/MEMUTUSKAN/MENETAPKAN sampai baris penutup ---
+    if body[0] < body[1]:
+        start, end = body
+    amar = _first(tokens['amar'], start, end)
+    if amar:
+        solusi_start = _skip_ws(text, amar[1], end)
+        if solusi_start < end and text[solusi_start] == ':':
+            solusi_start = _skip_ws(text, solusi_start + 1, end)
+        solusi_end = _first_break(text, tokens['amar_stop'], solusi_start, end, to_end=True)
+        sections['solusi'] = _strip_span(text, solusi_start, end if solusi_end is None else solusi_end)
+        fields['solusi'] = _truncate(text[slice(*sections['solusi'])], MAX_SOLUSI_WORDS)
+        fields['argumen_hukum_utama'] = fields['solusi']
+    if fields['solusi'] == DEFAULT_SOLUSI:
+        if fields['pasal']:
+            fields['solusi'] = f"Putusan terkait pasal: {fields['pasal']}"
+        elif fields['jenis_perkara']:
+            fields['solusi'] = f"Putusan terkait jenis perkara: {fields['jenis_perkara']}"
+
+    # --- Ringkasan fakta: bagian DUDUK PERKARA/FAKTA-FAKTA, atau baris berisi kata kunci fakta ---
+    fakta = _fact_section(text, tokens, start, end)
+    if fakta is not None:
+        sections['ringkasan_fakta'] = fakta
+        fields['ringkasan_fakta'] = _truncate(text[slice(*fakta)], MAX_FAKTA_WORDS)
+    else:
+        lines, first_line_start, last_line_end = _fact_lines(text, tokens['fact_keyword'], start, end)
+        if lines:
+            sections['ringkasan_fakta'] = (first_line_start, last_line_end)
+            fields['ringkasan_fakta'] = " ".join(lines)
+
+    fields['sections'] = sections
+    return fields
+
+def _fact_section(text, tokens, start, end):
+    """
+    Span isi bagian fakta, dengan semantik pola lama yang tidak punya alternatif '$': header yang
+    tidak diikuti baris penutup dilewati dan header berikutnya dicoba. None jika tidak ada.
+    """
+    stops = tokens['fact_stop']
+    no_break_from = None # Tidak ada baris penutup setelah posisi ini (berlaku untuk header berikutnya)
+    headers = tokens['fact']
+    for i in range(bisect.bisect_left(headers, (start,)), len(headers)):
+        header_start, header_end = headers[i]
+        if header_start >= end:
+            break
+        if header_end > end:
+            continue
+        content_start = _skip_ws(text, header_end, end)
+        if no_break_from is None or content_start < no_break_from:
+            content_end = _first_break(text, stops, content_start, end, to_end=True)
+            if content_end is not None:
+                return _strip_span(text, content_start, content_end)
+            no_break_from = content_start
+        # Backtracking \s* pada pola lama: '\n' di antara header dan isi menjadi penutup (isi kosong)
+        # jika isi langsung diawali kata penutup atau tidak ada isi sama sekali
+        stop = _first(stops, content_start, end)
+        if content_start == end or (stop and stop[0] == content_start):
+            newline = text.rfind('\n', header_end, content_start)
+            if newline != -1:
+                return (newline, newline)
+    return None
+
+def _fact_lines(text, keywords, start, end):
+    """Baris (dipotong whitespace-nya) yang memuat kata kunci fakta, sampai lebih dari MAX_FAKTA_WORDS kata."""
+    lines, words = [], 0
+    first_line_start = last_line_end = None
+    line_end = start # Akhir baris terakhir yang sudah diperiksa
+    for i in range(bisect.bisect_left(keywords, (start,)), len(keywords)):
+        keyword_start = keywords[i][0]
+        if keyword_start >= end:
+            break
+        if keyword_start < line_end:
+            continue # Baris ini sudah diperiksa
+        newline = text.rfind('\n', line_end, keyword_start)
+        line_start = line_end if newline == -1 else newline + 1
+        newline = text.find('\n', keyword_start, end)
+        line_end = end if newline == -1 else newline + 1
+        line = text[line_start:end if newline == -1 else newline]
+        # Pemeriksaan persis seperti implementasi lama (pemindai bisa memberi kandidat berlebih untuk
+        # karakter non-ASCII yang huruf kecilnya berbeda antara re.IGNORECASE dan str.lower)
+        if not any(keyword in line.lower() for keyword in FACT_KEYWORDS):
+            continue
+        lines.append(line.strip())
+        if first_line_start is None:
+            first_line_start = line_start
+        last_line_end = line_start + len(line)
+        words += len(lines[-1].split())
+        if words > MAX_FAKTA_WORDS:
+            break
+    return lines, first_line_start, last_line_end
+
+
+def legacy_extract_fields(text_content):
+    """
+    Implementasi lama extract_metadata (rangkaian re.search terpisah), tanpa case_id/text_full/
+    text_length. Hanya untuk pembanding di benchmark.
+    """
+    metadata = {
+        'no_perkara': None,
+        'tanggal': None,
+        'jenis_perkara': None,
+        'pasal': None,
+        'pihak': None,
+        'judul_putusan_bersih': DEFAULT_JUDUL,
+        'ringkasan_fakta': DEFAULT_FAKTA,
+        'argumen_hukum_utama': DEFAULT_ARGUMEN,
+        'solusi': DEFAULT_SOLUSI,
+    }
+    parts = re.split(r'===\s*(?:JUDUL:|METADATA TABLE|MAIN JUDGMENT BODY)\s*===', text_content, flags=re.IGNORECASE)
+    table_content_raw = ""
+    main_body_raw = ""
+    if len(parts) > 1:
+        judul_match = re.search(r'judul:\s*(.*?)(?=\n|$)', text_content, re.IGNORECASE | re.DOTALL)
+        if judul_match:
+            metadata['judul_putusan_bersih'] = re.sub(r'\s+', ' ', judul_match.group(1).strip()).strip().lower()
+        table_match = re.search(r'===\s*METADATA TABLE\s*===\s*(.*?)(?=\n\s*===\s*MAIN JUDGMENT BODY\s*===|\Z)', text_content, re.IGNORECASE | re.DOTALL)
+        if table_match:
+            table_content_raw = table_match.group(1).strip()
+        body_match = re.search(r'===\s*MAIN JUDGMENT BODY\s*===\s*(.*)', text_content, re.IGNORECASE | re.DOTALL)
+        if body_match:
+            main_body_raw = body_match.group(1).strip()
+    else:
+        main_body_raw = text_content
+        first_line = text_content.split('\n', 1)[0].strip()
+        if first_line.startswith('==='):
+            metadata['judul_putusan_bersih'] = re.sub(r'^===\s*(.*?)\s*===.*', r'\1', first_line).strip().lower()
+        else:
+            metadata['judul_putusan_bersih'] = first_line.lower()
+
+    source_for_metadata = table_content_raw if table_content_raw else main_body_raw
+    for column, key in (('no_perkara', 'nomor'), ('tanggal', 'tanggal register'),
+                        ('jenis_perkara', 'jenis perkara'), ('pasal', 'pasal')):
+        match = re.search(key + r':\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
+        if match: metadata[column] = match.group(1).strip()
+    penggugat_match = re.search(r'penggugat:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
+    tergugat_match = re.search(r'tergugat:\s*([^\n]+)', source_for_metadata, re.IGNORECASE)
+    if penggugat_match and tergugat_match:
+        metadata['pihak'] = f"{penggugat_match.group(1).strip()} vs. {tergugat_match.group(1).strip()}"
+    elif penggugat_match:
+        metadata['pihak'] = penggugat_match.group(1).strip()
+    elif tergugat_match:
+        metadata['pihak'] = tergugat_match.group(1).strip()
+
+    source_for_solusi_argumen = main_body_raw if main_body_raw else source_for_metadata
+    solusi_match = re.search(
+        r'(MENGADILI|MEMUTUSKAN|MENETAPKAN)\s*:?\s*(.*?)(?=\n\s*(?:tanggal musyawarah|tanggal dibacakan|kaidah|abstrak|putusan|penuntut umum|terdakwa|\Z)|$)',
+        source_for_solusi_argumen, re.IGNORECASE | re.DOTALL
+    )
+    if solusi_match:
+        extracted_solusi = solusi_match.group(2).strip()
+        if len(extracted_solusi.split()) > 200:
+            extracted_solusi = ' '.join(extracted_solusi.split()[:200]) + "..."
+        metadata['solusi'] = extracted_solusi
+        metadata['argumen_hukum_utama'] = extracted_solusi
+    if metadata['solusi'] == DEFAULT_SOLUSI:
+        if metadata['pasal']:
+            metadata['solusi'] = f"Putusan terkait pasal: {metadata['pasal']}"
+        elif metadata['jenis_perkara']:
+            metadata['solusi'] = f"Putusan terkait jenis perkara: {metadata['jenis_perkara']}"
+
+    source_for_facts = main_body_raw if main_body_raw else source_for_metadata
+    facts_section_match = re.search(
+        r'(DUDUK PERKARA|FAKTA-FAKTA|TENTANG FAKTA-FAKTA)\s*(.*?)(?=\n\s*(?:MENIMBANG|MENGADILI|MEMUTUSKAN|MENETAPKAN|\Z))',
+        source_for_facts, re.IGNORECASE | re.DOTALL
+    )
+    if facts_section_match:
+        metadata['ringkasan_fakta'] = facts_section_match.group(2).strip()
+        if len(metadata['ringkasan_fakta'].split()) > 150:
+            metadata['ringkasan_fakta'] = ' '.join(metadata['ringkasan_fakta'].split()[:150]) + "..."
+    else:
+        extracted_facts_lines = []
+        for line in source_for_facts.split('\n'):
+            if any(keyword in line.lower() for keyword in FACT_KEYWORDS):
+                extracted_facts_lines.append(line.strip())
+                if len(" ".join(extracted_facts_lines).split()) > 150:
+                    break
+        if extracted_facts_lines:
+            metadata['ringkasan_fakta'] = " ".join(extracted_facts_lines)
+    return metadata
+
+
+_FILLER = ("bahwa berdasarkan keterangan saksi dan barang bukti yang diajukan di persidangan terdakwa "
+           "telah melakukan perbuatan sebagaimana didakwakan oleh penuntut umum menimbang bahwa "
+           "berdasarkan fakta-fakta hukum tersebut majelis hakim mempertimbangkan unsur pasal dakwaan "
+           "dengan demikian unsur barang siapa telah terpenuhi menurut hukum serta tidak ditemukan "
+           "alasan pembenar maupun alasan pemaaf yang dapat menghapuskan pertanggungjawaban pidana "
+           "oleh karena itu majelis berpendapat dakwaan telah terbukti secara sah dan meyakinkan").split()
+
+def synthetic_judgment(size, rng, sectioned=True):
+    """
+    Putusan sintetis sekitar `size` karakter. sectioned=True: format berpenanda === ... === dengan
+    banyak baris (seperti keluaran scraper lama); False: satu baris huruf kecil seperti data/raw saat ini.
+    Kata 'fakta-fakta' dan 'putusan' sengaja sering muncul di tengah paragraf.
+    """
+    def paragraph(words):
+        return " ".join(rng.choice(_FILLER) for _ in range(words))
+    head = ("=== JUDUL: ===\nPutusan PN CONTOH Nomor 1/Pid.B/2024/PN Ctn\n"
+            "=== METADATA TABLE ===\nNomor: 1/Pid.B/2024/PN Ctn\nTanggal Register: 2 Januari 2024\n"
+            "Jenis Perkara: Pidana Umum\nPasal: 362 KUHP\nPenggugat: Penuntut Umum\nTergugat: Terdakwa\n"
+            "=== MAIN JUDGMENT BODY ===\nDUDUK PERKARA\n")
+    lines, length = [], len(head)
+    while length < size * 0.9:
+        line = ("Menimbang, " if rng.random() < 0.3 else "") + paragraph(rng.randint(20, 80))
+        lines.append(line)
+        length += len(line) + 1
+    amar = "MENGADILI:\n" + "\n".join(paragraph(30) for _ in range(5)) + "\nTanggal Musyawarah: 3 Maret 2024\n"
+    text = head + "\n".join(lines[:len(lines) // 2]) + "\n" + amar + "\n".join(lines[len(lines) // 2:])
+    if sectioned:
+        return text
+    return re.sub(r'\s+', ' ', re.sub(r'=+', '', text)).strip().lower()
+
+def bench(size_mb=1.0, documents=2, seed=0):
+    """
+    Membandingkan implementasi lama dan pemindai satu kali jalan pada putusan sintetis.
+    Catatan: pada format satu baris implementasi lama kuadratik (setiap 'fakta-fakta' tanpa baris
+    penutup memindai sampai akhir teks), jadi ukuran besar di format itu bisa memakan waktu lama.
+    """
+    rng = random.Random(seed)
+    print(f"[+] Benchmark ekstraksi field pada {documents} putusan sintetis ~{size_mb:g} MB per format\n")
+    print(f"{'format':<14}{'varian':<20}{'ms':>10}{'MB/s':>10}  hasil")
+    for label, sectioned in (("berpenanda", True), ("satu baris", False)):
+        texts = [synthetic_judgment(int(size_mb * 1024 * 1024), rng, sectioned) for _ in range(documents)]
+        megabytes = sum(len(t.encode("utf-8")) for t in texts) / 1024 / 1024
+        expected = None
+        for name, func in (("lama (re.search)", legacy_extract_fields), ("satu kali jalan", scan_judgment)):
+            start = time.perf_counter()
+            output = [func(t) for t in texts]
+            elapsed = time.perf_counter() - start
+            for fields in output:
+                fields.pop('sections', None)
+            expected = expected or output
+            same = sum(a == b for a, b in zip(output, expected))
+            print(f"{label:<14}{name:<20}{elapsed * 1000:>10.1f}{megabytes / elapsed:>10.2f}  {same}/{len(texts)} identik")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pemindai bagian putusan; --bench untuk mengukur throughput.")
+    parser.add_argument("--bench", action="store_true", help="Ukur throughput pada putusan sintetis berukuran besar")
+    parser.add_argument("--size-mb", type=float, default=1.0, help="Ukuran tiap putusan sintetis (MB)")
+    parser.add_argument("--documents", type=int, default=2, help="Jumlah putusan sintetis per format")
+    args = parser.parse_args()
+
+    if args.bench:
+        bench(args.size_mb, args.documents)
+    else:
+        parser.print_help()
@@ -0,0 +1,136 @@
+# text_normalizer.py
+# Normalisasi teks bersama untuk semua tahap: clean_text (Tahap 1) dan clean_text_for_query (Tahap 3).
+#
+#   python text_normalizer.py --bench   -> throughput (MB/s) pada kolom text_full case base Tahap 2
+
+import argparse
+import hashlib
+import re
+import time
+from collections import OrderedDict
+
+CACHE_MAX_CHARS = 64 * 1024 * 1024 # Total panjang hasil yang disimpan memo sebelum entri lama dibuang
+
+# Satu pola untuk satu kali pemindaian. Hasilnya sama dengan pembersihan lama
+#   re.sub(r'\s+', ' ', text) lalu re.sub(r'[^\w\s.,:()–-]', '', text)
+# karena karakter yang dihapus bukan whitespace, sehingga kedua langkah tidak saling memengaruhi:
+# setiap deret whitespace menjadi satu spasi dan setiap deret karakter terlarang dihapus.
+# Hanya bagian yang benar-benar berubah yang dicocokkan (spasi tunggal dilewati), jadi
+# fungsi pengganti jarang dipanggil pada teks yang sudah hampir bersih.
+_PATTERN = re.compile(r'[^\S ]\s*| \s+|[^\w\s.,:()–-]+')
+
+def _replace(match):
+    return ' ' if match.group()[0].isspace() else ''
+
+def normalize_uncached(text):
+    """
+    Normalisasi satu teks tanpa memo: whitespace -> satu spasi, hapus karakter non-alfanumerik
+    kecuali yang penting untuk teks hukum (.,:()–-), strip, lalu huruf kecil.
+    (Semicolon di akhir sudah ikut terhapus oleh pola di atas.)
+    """
+    return _PATTERN.sub(_replace, text).strip().lower()
+
+def content_hash(text):
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+class TextNormalizer:
+    """
+    Normalizer dengan memo berdasarkan hash konten: teks yang sama (misalnya text_full yang
+    dibersihkan ulang di Tahap 3, atau query yang berulang) hanya diproses sekali per proses.
+    Memo dibatasi total `max_chars` karakter hasil (LRU).
+    """
+
+    def __init__(self, max_chars=CACHE_MAX_CHARS):
+        self.max_chars = max_chars
+        self.hits = 0
+        self.misses = 0
+        self._memo = OrderedDict() # hash konten -> teks hasil normalisasi
+        self._chars = 0
+
+    def normalize(self, text):
+        key = content_hash(text)
+        result = self._memo.get(key)
+        if result is not None:
+            self.hits += 1
+            self._memo.move_to_end(key)
+            return result
+        self.misses += 1
+        result = normalize_uncached(text)
+        self._memo[key] = result
+        self._chars += len(result)
+        while self._chars > self.max_chars and len(self._memo) > 1:
+            _, evicted = self._memo.popitem(last=False)
+            self._chars -= len(evicted)
+        return result
+
+    def normalize_many(self, texts):
+        """
+        API batch: menormalisasi seluruh kolom/korpus (iterable apa pun, termasuk pandas Series)
+        dan mengembalikan list dengan urutan yang sama. Nilai non-string diubah dengan str().
+        """
+        return [self.normalize(text if isinstance(text, str) else str(text)) for text in texts]
+
+    def clear(self):
+        self._memo.clear()
+        self._chars = 0
+
+
+_default = TextNormalizer()
+
+def normalize(text):
+    """Normalisasi satu teks dengan memo bersama modul."""
+    return _default.normalize(text)
+
+def normalize_many(texts):
+    """Normalisasi batch dengan memo bersama modul (lihat TextNormalizer.normalize_many)."""
+    return _default.normalize_many(texts)
+
+
+def legacy_clean_text(text):
+    """Implementasi lama (dua kali re.sub + strip/lower), hanya untuk pembanding di benchmark."""
+    text = re.sub(r'\s+', ' ', text)
+    text = re.sub(r'[^\w\s.,:()–-]', '', text)
+    text = text.strip().lower()
+    if text.endswith(';'):
+        text = text[:-1]
+    return text
+
+def bench(texts, repeat=5):
+    """Mencetak throughput (MB/s) implementasi lama, single-pass, dan batch dengan memo dingin/hangat."""
+    corpus = texts * repeat
+    expected = [legacy_clean_text(t) for t in texts]
+
+    def run(label, func, data):
+        megabytes = sum(len(t.encode("utf-8")) for t in data) / 1024 / 1024
+        start = time.perf_counter()
+        output = func(data)
+        elapsed = time.perf_counter() - start
+        same = sum(a == b for a, b in zip(output, expected * repeat))
+        print(f"{label:<24}{len(data):>8}{elapsed * 1000:>10.1f}{megabytes / elapsed:>10.1f}  {same}/{len(data)} identik")
+
+    print(f"[+] Benchmark normalisasi pada {len(texts)} dokumen (diulang {repeat}x)\n")
+    print(f"{'varian':<24}{'dokumen':>8}{'ms':>10}{'MB/s':>10}  hasil")
+    run("lama (2x re.sub)", lambda c: [legacy_clean_text(t) for t in c], corpus)
+    run("single-pass", lambda c: [normalize_uncached(t) for t in c], corpus)
+    normalizer = TextNormalizer()
+    run("batch, memo dingin", normalizer.normalize_many, texts)
+    run("batch, memo hangat", normalizer.normalize_many, corpus)
+    print(f"\n[=] Memo: {normalizer.hits} hit, {normalizer.misses} miss")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Normalisasi teks bersama; --bench untuk mengukur throughput.")
+    parser.add_argument("--bench", action="store_true", help="Ukur throughput pada kolom text_full case base")
+    parser.add_argument("--repeat", type=int, default=5, help="Berapa kali korpus diulang saat benchmark")
+    args = parser.parse_args()
+
+    if args.bench:
+        from case_store import load_cases
+        try:
+            texts = load_cases(['text_full'])['text_full'].fillna('').astype(str).tolist()
+        except FileNotFoundError:
+            print("Error: Case base Tahap 2 tidak ditemukan. Pastikan Tahap 2 sudah dijalankan.")
+        else:
+            bench(texts, args.repeat)
+    else:
+        parser.print_help()
@@ -0,0 +1,151 @@
+# throttle.py
+# Utilitas pengatur laju (politeness) untuk scraper Tahap 1.
+
+import asyncio
+import random
+import time
+from urllib.parse import urlsplit
+
+
+class HostRateLimiter:
+    """
+    Pembatas laju global per host untuk mode crawl asyncio.
+    Semua worker berbagi satu objek ini, sehingga jumlah request ke satu host
+    tidak pernah melebihi `rate_per_host` request per detik, berapa pun jumlah worker.
+    Menggantikan `time.sleep(4)` tetap setelah setiap kasus.
+    """
+
+    def __init__(self, rate_per_host=0.25):
+        self.interval = 1.0 / rate_per_host if rate_per_host and rate_per_host > 0 else 0.0
+        self._next_slot = {} # host -> waktu (monotonic) slot berikutnya yang masih kosong
+
+    async def acquire(self, url):
+        """Menunggu sampai slot request berikutnya untuk host dari `url` tersedia."""
+        host = urlsplit(url).netloc
+        now = time.monotonic()
+        # Tidak ada await di antara baca dan tulis _next_slot, jadi aman tanpa lock
+        # (event loop hanya berjalan di satu thread).
+        slot = max(now, self._next_slot.get(host, now))
+        self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+# Status HTTP yang menandakan server kewalahan atau membatasi kita.
+RETRYABLE_STATUSES = {429, 500, 502, 503, 504}
+
+def is_retryable_status(status_code):
+    return status_code in RETRYABLE_STATUSES
+
+
+class AdaptiveConcurrency:
+    """
+    Pengendali konkurensi adaptif (AIMD, seperti kontrol kongesti TCP).
+
+    - Slow start: batas naik 1 per respons sehat sampai sinyal throttle pertama.
+    - Congestion avoidance: setelah itu naik 1 per `limit` respons sehat.
+    - Respons 429/5xx/timeout memotong batas menjadi setengahnya (paling sering sekali per jendela).
+    - Respons yang jauh lebih lambat dari latensi dasar (`latency_tolerance` x) tidak menaikkan batas.
+
+    Dipakai sebagai `async with controller:` di sekitar setiap request; panggil on_success /
+    on_throttle di dalam blok tersebut agar worker yang menunggu langsung melihat batas baru
+    saat slot dilepas.
+    """
+
+    def __init__(self, max_limit, min_limit=1, initial=1, latency_tolerance=2.0):
+        self.max_limit = max(1, max_limit)
+        self.min_limit = max(1, min(min_limit, self.max_limit))
+        self.limit = float(max(self.min_limit, min(initial, self.max_limit)))
+        self.latency_tolerance = latency_tolerance
+        self.slow_start = True
+        self.peak_limit = self.limit
+        self.throttle_events = 0
+        self._baseline_latency = None # latensi terbaik (EWMA) yang pernah terlihat
+        self._smoothed_latency = None
+        self._in_flight = 0
+        self._last_decrease = 0.0
+        self._condition = None
+
+    def _cond(self):
+        if self._condition is None:
+            self._condition = asyncio.Condition()
+        return self._condition
+
+    async def __aenter__(self):
+        cond = self._cond()
+        async with cond:
+            await cond.wait_for(lambda: self._in_flight < int(self.limit))
+            self._in_flight += 1
+        return self
+
+    async def __aexit__(self, *exc):
+        cond = self._cond()
+        async with cond:
+            self._in_flight -= 1
+            cond.notify_all()
+
+    def on_success(self, latency):
+        """Dipanggil untuk respons sehat; `latency` dalam detik."""
+        if self._smoothed_latency is None:
+            self._smoothed_latency = latency
+        else:
+            self._smoothed_latency = 0.8 * self._smoothed_latency + 0.2 * latency
+        if self._baseline_latency is None or self._smoothed_latency < self._baseline_latency:
+            self._baseline_latency = self._smoothed_latency
+
+        if latency > self.latency_tolerance * self._baseline_latency:
+            return # Server mulai melambat: tahan, jangan naikkan konkurensi
+        step = 1.0 if self.slow_start else 1.0 / self.limit
+        self._set_limit(self.limit + step)
+
+    def on_throttle(self):
+        """Dipanggil untuk 429/5xx/timeout."""
+        self.throttle_events += 1
+        self.slow_start = False
+        now = time.monotonic()
+        # Banyak request yang sedang berjalan bisa gagal bersamaan; cukup potong sekali
+        # per perkiraan satu jendela (latensi dasar) agar batas tidak langsung jatuh ke minimum.
+        window = self._smoothed_latency or 0.0
+        if now - self._last_decrease >= window:
+            self._last_decrease = now
+            self._set_limit(self.limit / 2)
+
+    def _set_limit(self, value):
+        self.limit = max(self.min_limit, min(self.max_limit, value))
+        self.peak_limit = max(self.peak_limit, self.limit)
+
+
+class RetryBudget:
+    """
+    Anggaran retry: jumlah retry dibatasi `ratio` x jumlah request + `min_retries`,
+    sehingga saat server benar-benar bermasalah crawler tidak melipatgandakan beban dengan retry.
+    """
+
+    def __init__(self, ratio=0.2, min_retries=10):
+        self.ratio = ratio
+        self.balance = float(min_retries)
+        self.used = 0
+
+    def deposit(self):
+        self.balance += self.ratio
+
+    def try_withdraw(self):
+        if self.balance >= 1.0:
+            self.balance -= 1.0
+            self.used += 1
+            return True
+        return False
+
+
+def backoff_delay(attempt, base=1.0, cap=60.0, retry_after=None):
+    """
+    Jeda sebelum retry ke-`attempt` (mulai 0): exponential backoff dengan full jitter.
+    Header Retry-After dari server (dalam detik) dihormati jika ada.
+    """
+    delay = random.uniform(0, min(cap, base * (2 ** attempt)))
+    if retry_after:
+        try:
+            delay = max(delay, float(retry_after))
+        except ValueError:
+            pass # Retry-After berbentuk tanggal HTTP diabaikan
+    return delay